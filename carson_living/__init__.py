@@ -7,7 +7,21 @@ entities and expose their functionality.
 
 from carson_living.auth import CarsonAuth
 from carson_living.carson import Carson
+from carson_living.util import (create_http_session,
+                                UpdateDiff)
+from carson_living.cache import SnapshotCache
+from carson_living.singleflight import SingleFlight
+from carson_living.conditional import ConditionalCache
+from carson_living.renewal import RenewalThread
+from carson_living.refresh import (RefreshPolicy,
+                                   RefreshScheduler)
+from carson_living.poller import (SnapshotFrame,
+                                  SnapshotPoller,
+                                  SnapshotPollStats)
+from carson_living.store import (CredentialStore,
+                                 FileCredentialStore)
 from carson_living.error import (CarsonAuthenticationError,
+                                 CarsonAggregateError,
                                  CarsonAPIError,
                                  CarsonError,
                                  CarsonCommunicationError,
@@ -15,6 +29,9 @@ from carson_living.error import (CarsonAuthenticationError,
 
 from carson_living.eagleeye import EagleEye
 from carson_living.eagleeye_entities import EagleEyeCamera
+from carson_living.assets import (EagleEyeAssetIndex,
+                                  EagleEyeImageAsset,
+                                  EagleEyeVideoAsset)
 from carson_living.carson_entities import (CarsonDoor,
                                            CarsonBuilding,
                                            CarsonUser)
@@ -32,13 +49,30 @@ from carson_living.const import (EEN_ASSET_REF_ASSET,
 
 __all__ = ['CarsonAuth',
            'Carson',
+           'create_http_session',
+           'UpdateDiff',
+           'SnapshotCache',
+           'SingleFlight',
+           'ConditionalCache',
+           'RenewalThread',
+           'RefreshPolicy',
+           'RefreshScheduler',
+           'SnapshotFrame',
+           'SnapshotPoller',
+           'SnapshotPollStats',
+           'CredentialStore',
+           'FileCredentialStore',
            'CarsonAuthenticationError',
+           'CarsonAggregateError',
            'CarsonAPIError',
            'CarsonError',
            'CarsonCommunicationError',
            'CarsonTokenError',
            'EagleEye',
            'EagleEyeCamera',
+           'EagleEyeAssetIndex',
+           'EagleEyeImageAsset',
+           'EagleEyeVideoAsset',
            'CarsonDoor',
            'CarsonBuilding',
            'CarsonUser',
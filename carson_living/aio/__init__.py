@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""Asynchronous (asyncio) interface to Carson Living
+
+Mirrors the synchronous API, but performs all queries via aiohttp. The
+entity classes derive from their synchronous counterparts, so the payload
+mapping is shared between both interfaces.
+
+Requires the optional aiohttp dependency
+(``pip install carson_living[async]``).
+"""
+
+from carson_living.aio.auth import AsyncCarsonAuth
+from carson_living.aio.carson import AsyncCarson
+from carson_living.aio.eagleeye import AsyncEagleEye
+from carson_living.aio.eagleeye_entities import AsyncEagleEyeCamera
+from carson_living.aio.carson_entities import (AsyncCarsonBuilding,
+                                               AsyncCarsonDoor)
+from carson_living.aio.poller import AsyncSnapshotPoller
+from carson_living.aio.renewal import AsyncRenewalTask
+from carson_living.aio.util import create_async_http_session
+
+
+__all__ = ['AsyncCarsonAuth',
+           'AsyncCarson',
+           'AsyncEagleEye',
+           'AsyncEagleEyeCamera',
+           'AsyncCarsonBuilding',
+           'AsyncCarsonDoor',
+           'AsyncSnapshotPoller',
+           'AsyncRenewalTask',
+           'create_async_http_session']
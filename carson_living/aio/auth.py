@@ -0,0 +1,165 @@
+# coding: utf-8
+"""Carson Living Asynchronous Authentication Module"""
+
+import asyncio
+import logging
+
+from carson_living.auth import CarsonAuth
+from carson_living.const import (BASE_HEADERS,
+                                 C_API_URI,
+                                 C_AUTH_ENDPOINT,
+                                 RETRY_TOKEN)
+from carson_living.error import (CarsonAPIError,
+                                 CarsonAuthenticationError)
+from carson_living.aio.renewal import AsyncRenewalTask
+from carson_living.aio.util import (async_carson_response_handler,
+                                    create_async_http_session)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AsyncCarsonAuth(CarsonAuth):
+    """Asynchronous Authentication Class for Carson Living.
+
+    Shares the JWT token handling with CarsonAuth, but queries the API
+    via an aiohttp session. If no session is injected, a session is
+    created on first use (aiohttp requires a running event loop) and
+    released again in close().
+
+    Attributes:
+        _owns_http_session:
+            True if the http session was created (and must be closed)
+            by this object.
+        _async_token_lock:
+            serializes logins, so that concurrent coroutines trigger a
+            single login per expiry. Created on first use from within
+            the event loop.
+    """
+
+    def __init__(self, username, password,
+                 initial_token=None, token_update_cb=None,
+                 http_session=None):
+        self._owns_http_session = http_session is None
+        self._async_token_lock = None
+        super(AsyncCarsonAuth, self).__init__(username, password,
+                                              initial_token,
+                                              token_update_cb,
+                                              http_session)
+
+    @staticmethod
+    def _create_http_session():
+        # Created lazily from within the event loop, see _get_http_session
+        return None
+
+    def _get_http_session(self):
+        if self._http_session is None:
+            self._http_session = create_async_http_session()
+        return self._http_session
+
+    @staticmethod
+    def _create_renewal(renew, next_delay, name):
+        return AsyncRenewalTask(renew, next_delay, name)
+
+    async def close(self):
+        """Close the http session, if it is owned by this object"""
+        self.stop_token_renewal()
+        if self._owns_http_session and self._http_session is not None:
+            await self._http_session.close()
+            self._http_session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def update_token(self):
+        """Authenticate user against Carson Living API.
+
+        Raises:
+            CarsonAuthenticationError: On authentication error.
+
+        """
+        _LOGGER.info('Getting new access token for %s', self._username)
+
+        async with self._get_http_session().request(
+                'post',
+                C_API_URI + C_AUTH_ENDPOINT,
+                json={
+                    'username': self._username,
+                    'password': self._password,
+                },
+                headers=BASE_HEADERS) as response:
+            try:
+                data = await async_carson_response_handler(response)
+            except CarsonAPIError as error:
+                _LOGGER.warning('Authentication for %s failed',
+                                self._username)
+                raise CarsonAuthenticationError(error)
+
+        self.token = data.get('token')
+        return self.token
+
+    def _get_async_token_lock(self):
+        if self._async_token_lock is None:
+            self._async_token_lock = asyncio.Lock()
+        return self._async_token_lock
+
+    async def _valid_token_or_update(self):
+        if self.valid_token():
+            return self._token
+
+        async with self._get_async_token_lock():
+            # another coroutine may have updated the token in the meantime
+            if self.valid_token():
+                return self._token
+            return await self.update_token()
+
+    async def _renew_token_if_due(self, margin):
+        async with self._get_async_token_lock():
+            # the token may have been renewed by a query in the meantime
+            if self._token_renewal_delay(margin) > 0:
+                return
+            await self.update_token()
+
+    async def authenticated_query(
+            self, url, method='get', params=None, json=None,
+            retry_auth=RETRY_TOKEN,
+            response_handler=async_carson_response_handler):
+        """Perform an authenticated Query against Carson Living
+
+        Args:
+            url: the url to query
+            method: the http method to use
+            params: the http params to use
+            json: the json payload to submit
+            retry_auth: number of query and reauthentication retries
+            response_handler: dynamic async response handler for api
+
+        Returns:
+            The unwrapped data dict of the Carson Living response.
+
+        Raises:
+            CarsonCommunicationError: Response was not received or
+                not in the expected format.
+            CarsonAPIError: Response indicated an client-side API
+                error.
+        """
+        token = await self._valid_token_or_update()
+
+        headers = {'Authorization': 'JWT {}'.format(token)}
+        headers.update(BASE_HEADERS)
+
+        async with self._get_http_session().request(
+                method, url,
+                headers=headers,
+                params=params,
+                json=json) as response:
+            if response.status != 401 or retry_auth <= 0:
+                return await response_handler(response)
+
+        # special case, clear token and retry. (Recursion)
+        self._invalidate_token(token)
+        return await self.authenticated_query(
+            url, method, params, json, retry_auth - 1,
+            response_handler)
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""Carson Living Asynchronous API Module."""
+import asyncio
+import logging
+from collections import OrderedDict
+
+from carson_living.carson import Carson
+from carson_living.const import (C_API_URI,
+                                 C_ME_ENDPOINT)
+from carson_living.error import CarsonAggregateError
+from carson_living.util import attach_update_diff
+from carson_living.aio.auth import AsyncCarsonAuth
+from carson_living.aio.carson_entities import AsyncCarsonBuilding
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AsyncCarson(Carson, AsyncCarsonAuth):
+    """Asynchronous Python Abstraction object to the Carson Living API.
+
+    Unlike Carson, the object does not query the API during
+    initialization. Await update() before accessing the entities, or
+    use the object as an async context manager:
+
+        async with AsyncCarson(username, password) as carson:
+            print(carson.user)
+
+    """
+    def __init__(self, username, password,
+                 initial_token=None, token_update_cb=None,
+                 http_session=None):
+        # Entities are constructed without I/O, the Eagle Eye updates
+        # are gathered concurrently in update()
+        super(AsyncCarson, self).__init__(username, password,
+                                          initial_token, token_update_cb,
+                                          http_session)
+
+    def _initial_update(self):
+        # update() must be awaited from within the event loop
+        pass
+
+    async def __aenter__(self):
+        await self.update()
+        return self
+
+    async def update(self):
+        """Update entity list and individual entity parameters associated with the API
+
+        Only added and changed buildings query their Eagle Eye cameras,
+        as well as buildings whose camera update failed before.
+
+        Returns:
+            UpdateDiff of the user, buildings, doors and cameras that
+            were added, removed or changed
+
+        Raises:
+            CarsonAggregateError:
+                If the cameras of buildings failed to update. All other
+                buildings are updated nevertheless.
+            CarsonError:
+                If a building failed to update, see Carson.update.
+
+        """
+        _LOGGER.debug('Updating Carson Living API and associated entities')
+        url = C_API_URI + C_ME_ENDPOINT
+        me_payload = await self.authenticated_query(url)
+
+        diff = self._update_user(me_payload)
+        try:
+            diff = diff.merge(self._update_buildings(me_payload))
+        except Exception as error:
+            attach_update_diff(error, diff)
+            raise
+
+        errors = OrderedDict()
+        diff = await self._update_stale_cameras(diff, errors)
+        if errors:
+            raise CarsonAggregateError(errors, diff)
+        return diff
+
+    async def _update_stale_cameras(self, diff, errors):
+        buildings = OrderedDict(
+            (k, b) for k, b in self._buildings.items() if b.cameras_stale)
+        outcomes = await asyncio.gather(
+            *[b.async_update_cameras() for b in buildings.values()],
+            return_exceptions=True)
+
+        for building_id, outcome in zip(buildings, outcomes):
+            if isinstance(outcome, Exception):
+                errors[building_id] = outcome
+            else:
+                diff = diff.merge(outcome)
+        return diff
+
+    async def update_building(self, building_id):
+        """Update a single building
+
+        See Carson.update_building.
+
+        """
+        me_payload = await self.authenticated_query(
+            C_API_URI + C_ME_ENDPOINT)
+        diff = self._update_building(
+            building_id, self.map_building_payloads(me_payload))
+
+        building = self._buildings.get(building_id)
+        if building is not None and building.cameras_stale:
+            diff = diff.merge(await building.async_update_cameras())
+        return diff
+
+    def _create_building(self, entity_payload):
+        return AsyncCarsonBuilding(self, entity_payload)
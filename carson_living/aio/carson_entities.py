@@ -0,0 +1,104 @@
+"""Asynchronous Carson Living Entities"""
+
+from carson_living.carson_entities import (CarsonBuilding,
+                                           CarsonDoor)
+from carson_living.const import (BULK_MAX_WORKERS,
+                                 C_API_URI,
+                                 C_DOOR_OPEN_ENDPOINT,
+                                 EEN_ASSET_CLS_PRE,
+                                 EEN_ASSET_REF_PREV)
+from carson_living.util import UpdateDiff
+from carson_living.aio.eagleeye import AsyncEagleEye
+
+
+class AsyncCarsonBuilding(CarsonBuilding):
+    """Asynchronous Carson Living Building Entity
+
+    Payload updates are applied synchronously, the Eagle Eye camera
+    list is queried via async_update_cameras().
+
+    Attributes:
+        _cameras_stale:
+            True until async_update_cameras() succeeded for the current
+            entity payload.
+
+    """
+
+    def __init__(self, api, entity_payload, lazy_cameras=False):
+        self._cameras_stale = True
+        super(AsyncCarsonBuilding, self).__init__(
+            api, entity_payload, lazy_cameras=lazy_cameras)
+
+    def _create_eagleeye_api(self, api, building_id):
+        async def _session_callback():
+            session = await api.authenticated_query(
+                self.eagleeye_session_url(building_id))
+            return self.map_eagleeye_session(session)
+
+        return AsyncEagleEye(_session_callback,
+                             http_session=api.http_session)
+
+    def _update_cameras(self):
+        # Eagle Eye is queried in async_update_cameras()
+        self._cameras_stale = True
+        self._map_cameras()
+        return UpdateDiff()
+
+    @property
+    def cameras_stale(self):
+        """True if the cameras were not updated for the current payload"""
+        return self._cameras_stale
+
+    async def async_update_cameras(self):
+        """Update the Eagle Eye cameras of the building
+
+        Returns:
+            UpdateDiff of the Eagle Eye cameras
+
+        """
+        diff = await self._eagleeye.update()
+        self._map_cameras()
+        self._cameras_stale = False
+        return diff
+
+    async def update_camera(self, camera_id):
+        """Update (or add) a single Eagle Eye camera of the building
+
+        See CarsonBuilding.update_camera.
+
+        """
+        diff = await self._eagleeye.update_camera(camera_id)
+        self._map_cameras()
+        return diff
+
+    async def get_images(self, files,
+                         utc_dt=None,
+                         asset_ref=EEN_ASSET_REF_PREV,
+                         asset_class=EEN_ASSET_CLS_PRE,
+                         max_workers=BULK_MAX_WORKERS):
+        """Get binary JPEG images of the building cameras concurrently
+
+        See CarsonBuilding.get_images.
+
+        """
+        errors = await self._eagleeye.get_images(
+            self._own_camera_files(files),
+            utc_dt, asset_ref, asset_class, max_workers)
+
+        return self._merge_camera_errors(files, errors)
+
+    def _create_door(self, entity_payload):
+        return AsyncCarsonDoor(self._api, entity_payload=entity_payload)
+
+
+class AsyncCarsonDoor(CarsonDoor):
+    """Asynchronous Carson Living Door Entity
+
+    """
+
+    async def open(self):
+        """Unlock the door
+
+        """
+        url = C_API_URI + C_DOOR_OPEN_ENDPOINT.format(self.entity_id)
+        await self._api.authenticated_query(url, method='post')
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""Asynchronous resumable downloads of Eagle Eye assets"""
+import logging
+
+from aiohttp import ClientConnectionError, ClientPayloadError
+
+from carson_living.const import STREAM_CHUNK_SIZE
+from carson_living.download import (IncompleteDownloadError,
+                                    ResumableDownload,
+                                    check_buffer_size)
+from carson_living.error import CarsonError
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def read_response_into(response, buffer):
+    """Response handler that reads the body into a preallocated buffer
+
+    aiohttp hands out the body in chunks, which are copied into buffer.
+    See carson_living.download.read_response_into.
+
+    Returns:
+        number of bytes written to the start of buffer
+
+    Raises:
+        CarsonError: The body does not fit into buffer.
+    """
+    view = memoryview(buffer)
+    try:
+        check_buffer_size(response.headers.get('Content-Length'),
+                          len(view))
+        filled = 0
+        while True:
+            chunk = await response.content.readany()
+            if not chunk:
+                return filled
+            if filled + len(chunk) > len(view):
+                raise CarsonError(
+                    'Buffer of {} bytes is too small for the '
+                    'response'.format(len(view)))
+            view[filled:filled + len(chunk)] = chunk
+            filled += len(chunk)
+    finally:
+        view.release()
+
+
+class AsyncResumableDownload(ResumableDownload):
+    """Asynchronous response handler that resumes interrupted downloads
+
+    See ResumableDownload.
+    """
+
+    async def __call__(self, response):
+        skip = self._start(response.status,
+                           response.headers.get('Content-Range'),
+                           response.headers.get('Content-Length'))
+        try:
+            async for chunk in response.content.iter_chunked(
+                    STREAM_CHUNK_SIZE):
+                skip = self._write(chunk, skip)
+        except (ClientPayloadError, ClientConnectionError) as error:
+            raise IncompleteDownloadError(
+                'Download interrupted after {} bytes: {}'.format(
+                    self.bytes_written, error))
+        self._finish()
+
+
+async def resumable_download(api, url, params, file, retries):
+    """Download an asset into file, resuming after connection drops
+
+    See carson_living.download.resumable_download.
+    """
+    download = AsyncResumableDownload(file)
+    attempt = 0
+    while True:
+        try:
+            await api.authenticated_query(
+                url, params=params,
+                headers=download.request_headers(),
+                response_handler=download)
+            return download
+        except (IncompleteDownloadError, ClientConnectionError) as error:
+            if attempt >= retries:
+                if isinstance(error, IncompleteDownloadError):
+                    raise
+                raise IncompleteDownloadError(
+                    'Download interrupted after {} bytes: {}'.format(
+                        download.bytes_written, error))
+            attempt += 1
+            _LOGGER.info(
+                'Download of %s interrupted after %d bytes, '
+                'resuming ... (%d left)',
+                url, download.bytes_written, retries - attempt + 1)
@@ -0,0 +1,296 @@
+"""Asynchronous Eagle Eye API Module"""
+import asyncio
+import logging
+from collections import OrderedDict
+
+from aiohttp import ClientResponseError
+
+from carson_living.eagleeye import EagleEye
+from carson_living.error import (CarsonError,
+                                 CarsonAPIError)
+from carson_living.util import update_dictionary
+from carson_living.const import (BASE_HEADERS,
+                                 BULK_MAX_WORKERS,
+                                 EEN_ASSET_CLS_PRE,
+                                 EEN_ASSET_REF_PREV,
+                                 EEN_API_URI,
+                                 EEN_DEVICE_LIST_ENDPOINT,
+                                 EEN_IS_AUTH_ENDPOINT)
+from carson_living.aio.eagleeye_entities import AsyncEagleEyeCamera
+from carson_living.aio.renewal import AsyncRenewalTask
+from carson_living.aio.util import (create_async_http_session,
+                                    create_bounded_semaphore)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def _default_response_handler(response):
+    return await response.json(content_type=None)
+
+
+class AsyncEagleEye(EagleEye):
+    """Asynchronous Eagle Eye API class
+
+    Args:
+        session_callback:
+            coroutine function that returns a new
+            (auth_key, brand_subdomain) tuple
+        http_session:
+            optional (shared) aiohttp session
+    """
+
+    def __init__(self, session_callback, http_session=None):
+        self._owns_http_session = http_session is None
+        super(AsyncEagleEye, self).__init__(session_callback, http_session)
+
+    @staticmethod
+    def _create_http_session():
+        # Created lazily from within the event loop, see _get_http_session
+        return None
+
+    def _get_http_session(self):
+        if self._http_session is None:
+            self._http_session = create_async_http_session()
+        return self._http_session
+
+    @staticmethod
+    def _create_renewal(renew, next_delay, name):
+        return AsyncRenewalTask(renew, next_delay, name)
+
+    async def close(self):
+        """Close the http session, if it is owned by this object"""
+        self.stop_session_renewal()
+        if self._owns_http_session and self._http_session is not None:
+            await self._http_session.close()
+            self._http_session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def get_images(self, files,
+                         utc_dt=None,
+                         asset_ref=EEN_ASSET_REF_PREV,
+                         asset_class=EEN_ASSET_CLS_PRE,
+                         max_workers=BULK_MAX_WORKERS):
+        """Get binary JPEG images of many cameras concurrently
+
+        See EagleEye.get_images, max_workers bounds the number of
+        concurrent downloads.
+
+        Returns:
+            OrderedDict of camera id to the raised exception for every
+            camera that failed (empty if all images were written).
+
+        """
+        if files and (not self._session_auth_key
+                      or not self._session_brand_subdomain):
+            await self.update_session_auth_key()
+
+        semaphore = create_bounded_semaphore(max_workers)
+
+        async def _get_image(camera_id):
+            camera = self.get_camera(camera_id)
+            if camera is None:
+                raise CarsonError(
+                    'Unknown Eagle Eye camera {}'.format(camera_id))
+            async with semaphore:
+                await camera.get_image(files[camera_id], utc_dt,
+                                       asset_ref, asset_class)
+
+        camera_ids = list(files)
+        outcomes = await asyncio.gather(
+            *[_get_image(k) for k in camera_ids], return_exceptions=True)
+
+        return OrderedDict((k, o) for k, o in zip(camera_ids, outcomes)
+                           if isinstance(o, Exception))
+
+    async def get_image_urls(self, camera_ids, start_utc_dt, end_utc_dt,
+                             step, asset_ref=EEN_ASSET_REF_PREV,
+                             asset_class=EEN_ASSET_CLS_PRE,
+                             check_auth=True):
+        """Get JPEG image URLs of many cameras over a time range
+
+        See EagleEye.get_image_urls, only the auth check performs I/O.
+        """
+        if check_auth and not await self.check_auth():
+            return None
+
+        return super(AsyncEagleEye, self).get_image_urls(
+            camera_ids, start_utc_dt, end_utc_dt, step,
+            asset_ref, asset_class, check_auth=False)
+
+    async def update_session_auth_key(self):
+        """Updates the internal session state via session_callback
+
+        Raises:
+            CarsonError: If callback returns empty value.
+
+        """
+        _LOGGER.debug(
+            'Trying to update the session auth key for the Eagle Eye API.')
+        self._set_session(*(await self._session_callback()))
+
+    async def check_auth(self, refresh=True):
+        """Check if the current auth_key is still valid
+
+        Args:
+            refresh:
+                automatically update auth_key if not valid
+
+        Returns: True if a valid auth_key exists.
+
+        """
+        if not refresh and not self._session_auth_key:
+            return False
+
+        if self._trust_session():
+            return True
+
+        retry_auth = 1 if refresh else 0
+
+        try:
+            await self.authenticated_query(
+                EEN_API_URI + EEN_IS_AUTH_ENDPOINT,
+                retry_auth=retry_auth
+            )
+        except CarsonAPIError:
+            return False
+
+        return True
+
+    async def authenticated_query(self, url, method='get', params=None,
+                                  json=None, retry_auth=1,
+                                  response_handler=_default_response_handler,
+                                  headers=None):
+        """Perform an authenticated Query against Eagle Eye
+
+        Args:
+            url:
+                the url to query, can contain a branded subdomain
+                to substitute
+            method: the http method to use
+            params: the http params to use
+            json: the json payload to submit
+            retry_auth: number of query and reauthentication retries
+            response_handler:
+                optional async handler to consume the raw response
+            headers: optional additional http headers (e.g. Range)
+
+        Returns:
+            The json response object, or the result of the
+            response_handler.
+
+        Raises:
+            CarsonAPIError: Response indicated an client or
+            server-side API error.
+        """
+        if not self._session_auth_key \
+                or not self._session_brand_subdomain:
+            await self.update_session_auth_key()
+
+        request_headers = {
+            'Cookie': 'auth_key={}'.format(self._session_auth_key)}
+        request_headers.update(BASE_HEADERS)
+        request_headers.update(headers or {})
+
+        async with self._get_http_session().request(
+                method,
+                url.format(self._session_brand_subdomain),
+                headers=request_headers,
+                params=params,
+                json=json) as response:
+            if response.status == 401:
+                self.invalidate_session_verification()
+            if response.status != 401 or retry_auth <= 0:
+                try:
+                    response.raise_for_status()
+                except ClientResponseError as error:
+                    raise CarsonAPIError(error)
+                self._mark_session_verified()
+                return await response_handler(response)
+
+        # special case, clear token and retry. (Recursion)
+        _LOGGER.info(
+            'Eagle Eye request %s returned 401, retrying ... (%d left)',
+            url, retry_auth)
+        self._session_auth_key = None
+        return await self.authenticated_query(
+            url, method, params, json, retry_auth - 1,
+            response_handler, headers)
+
+    async def update(self):
+        """Update internal state
+
+        Update entity list and individual entity parameters associated with the
+        Eagle Eye API
+
+        Returns:
+            UpdateDiff of the cameras
+
+        """
+        _LOGGER.debug('Updating Eagle Eye API and associated entities')
+        return await self._update_cameras()
+
+    async def _update_cameras(self):
+        device_list = await self.authenticated_query(
+            EEN_API_URI + EEN_DEVICE_LIST_ENDPOINT
+        )
+
+        return update_dictionary(
+            self._cameras,
+            self._merged_camera_payloads(self.map_device_list(device_list)),
+            self._create_camera)
+
+    async def update_camera(self, camera_id):
+        """Update (or add) a single camera with its device payload
+
+        See EagleEye.update_camera.
+
+        """
+        payload = await AsyncEagleEyeCamera.get_payload(self, camera_id)
+        return self._merge_camera_payloads({camera_id: payload})
+
+    async def update_camera_details(self, camera_ids=None,
+                                    max_workers=BULK_MAX_WORKERS):
+        """Update many cameras with their full device payload concurrently
+
+        See EagleEye.update_camera_details, max_workers bounds the number
+        of concurrent requests.
+
+        Returns:
+            (tuple): tuple containing:
+
+                diff(UpdateDiff): the added and changed cameras
+                errors(OrderedDict): camera id to the raised exception
+                    for every camera that failed
+
+        """
+        camera_ids = list(self._cameras if camera_ids is None
+                          else camera_ids)
+        if camera_ids and (not self._session_auth_key
+                           or not self._session_brand_subdomain):
+            await self.update_session_auth_key()
+
+        semaphore = create_bounded_semaphore(max_workers)
+
+        async def _get_payload(camera_id):
+            async with semaphore:
+                return await AsyncEagleEyeCamera.get_payload(self, camera_id)
+
+        outcomes = await asyncio.gather(
+            *[_get_payload(k) for k in camera_ids], return_exceptions=True)
+
+        payloads = OrderedDict()
+        errors = OrderedDict()
+        for camera_id, outcome in zip(camera_ids, outcomes):
+            if isinstance(outcome, Exception):
+                errors[camera_id] = outcome
+            else:
+                payloads[camera_id] = outcome
+        return self._merge_camera_payloads(payloads), errors
+
+    def _create_camera(self, entity_payload):
+        return AsyncEagleEyeCamera(self, entity_payload)
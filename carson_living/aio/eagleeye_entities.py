@@ -0,0 +1,357 @@
+"""Asynchronous Eagle Eye API Entities"""
+import asyncio
+import logging
+import os
+from collections import deque, OrderedDict
+from datetime import timedelta
+
+from aiohttp import ClientError
+
+from carson_living.assets import EagleEyeAssetIndex
+from carson_living.aio.download import (read_response_into,
+                                        resumable_download)
+from carson_living.aio.stream import AsyncVideoStream
+from carson_living.aio.util import create_bounded_semaphore
+from carson_living.download import IncompleteDownloadError
+from carson_living.eagleeye_entities import (EagleEyeCamera,
+                                             _AssetPager)
+from carson_living.error import (CarsonAggregateError,
+                                 CarsonAPIError,
+                                 CarsonError)
+from carson_living.timestamp import format_een_timestamp
+from carson_living.util import replace_file
+from carson_living.const import (EEN_API_URI,
+                                 EEN_DEVICE_ENDPOINT,
+                                 EEN_ASSET_LIST_PAGE_SIZE,
+                                 EEN_EXPORT_SEGMENT_LENGTH,
+                                 EEN_EXPORT_SEGMENT_RETRIES,
+                                 EEN_EXPORT_RETRY_DELAY,
+                                 BULK_MAX_WORKERS,
+                                 EEN_ASSET_CLS_ALL,
+                                 EEN_ASSET_CLS_PRE,
+                                 EEN_ASSET_REF_PREV,
+                                 EEN_VIDEO_FORMAT_FLV,
+                                 STREAM_CHUNK_SIZE)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _response_file_handler(file):
+    async def _handler(response):
+        async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+            file.write(chunk)
+    return _handler
+
+
+class _AsyncAssetIterator(object):
+    """Asynchronous iterator that pages lazily through an asset list"""
+
+    def __init__(self, camera, endpoint, start_utc_dt, end_utc_dt,
+                 page_size, mapper, asset_class=None):
+        self._camera = camera
+        self._endpoint = endpoint
+        self._pager = _AssetPager(format_een_timestamp(start_utc_dt),
+                                  page_size)
+        self._end_ts = format_een_timestamp(end_utc_dt)
+        self._page_size = page_size
+        self._mapper = mapper
+        self._asset_class = asset_class
+        self._assets = deque()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        # pylint: disable=protected-access
+        while not self._assets:
+            if self._pager.start_ts is None:
+                raise StopAsyncIteration
+            url, params = self._camera._asset_list_request(
+                self._endpoint, self._pager.start_ts, self._end_ts,
+                self._page_size, self._asset_class)
+            page = await self._camera._api.authenticated_query(
+                url, params=params)
+            self._assets.extend(
+                self._mapper(p) for p in self._pager.add_page(page))
+        return self._assets.popleft()
+
+
+class AsyncEagleEyeCamera(EagleEyeCamera):
+    """Asynchronous Eagle Eye Camera Entity
+
+    Shares the payload mapping with EagleEyeCamera. Since the entity
+    cannot update itself synchronously, use async_update() to refresh
+    the payload from the API.
+
+    """
+    def __init__(self, api, entity_payload):
+        # pylint: disable=bad-super-call
+        # Skip the synchronous update callback of EagleEyeCamera
+        super(EagleEyeCamera, self).__init__(
+            api,
+            entity_payload=entity_payload
+        )
+
+    def _list_assets(self, endpoint, start_utc_dt, end_utc_dt, page_size,
+                     mapper, asset_class=None):
+        # list_images() and list_videos() return an asynchronous iterator
+        return _AsyncAssetIterator(self, endpoint, start_utc_dt, end_utc_dt,
+                                   page_size, mapper, asset_class)
+
+    async def build_asset_index(self, start_utc_dt, end_utc_dt,
+                                asset_class=EEN_ASSET_CLS_ALL,
+                                page_size=EEN_ASSET_LIST_PAGE_SIZE):
+        """List the recorded images of a time range into an index
+
+        See EagleEyeCamera.build_asset_index.
+        """
+        index = EagleEyeAssetIndex()
+        page = []
+        async for asset in self.list_images(start_utc_dt, end_utc_dt,
+                                            asset_class, page_size):
+            page.append(asset)
+            if len(page) >= page_size:
+                index.extend(page)
+                page = []
+        index.extend(page)
+        return index
+
+    @classmethod
+    async def from_api(cls, api, camera_id):
+        """Init Camera from API call
+
+        Args:
+            api: Asynchronous Eagle Eye API
+            camera_id: Eagle Eye Camera ID
+
+        Returns:
+            Initialized AsyncEagleEyeCamera
+
+        """
+        entity_payload = await cls.get_payload(api, camera_id)
+        return cls(api, entity_payload)
+
+    @staticmethod
+    async def get_payload(api, camera_id):
+        """Get entity payload from API
+
+        Args:
+            api: Asynchronous Eagle Eye API
+            camera_id: Eagle Eye Camera ID
+
+        Returns:
+            Eagle eye entity payload
+
+        """
+        url = EEN_API_URI + EEN_DEVICE_ENDPOINT
+        return await api.authenticated_query(
+            url, params={'id': camera_id})
+
+    async def async_update(self):
+        """Update the entity payload from the API"""
+        self.update(self.merged_payload(
+            await self.get_payload(self._api, self.entity_id)))
+
+    async def _stream_to(self, file, url, params, retries):
+        """Stream an asset into file, resuming interrupted downloads"""
+        if retries:
+            await resumable_download(self._api, url, params, file, retries)
+            return
+
+        await self._api.authenticated_query(
+            url, params=params,
+            response_handler=_response_file_handler(file))
+
+    async def get_image(self, file,
+                        utc_dt=None,
+                        asset_ref=EEN_ASSET_REF_PREV,
+                        asset_class=EEN_ASSET_CLS_PRE,
+                        retries=0):
+        """Get binary JPEG image from the camera
+
+        Args:
+            file:
+                file handler that is written to.
+            utc_dt:
+                Datetime object in UTC
+            asset_ref:
+                prev: previous image to time stamp
+                next: next image to timestamp (blocks)
+                asset: image at timestamp
+            asset_class:
+                all, pre, thumb
+            retries:
+                number of times an interrupted download is resumed
+
+        """
+        url, params = self._image_request(utc_dt, asset_ref, asset_class)
+        await self._stream_to(file, url, params, retries)
+
+    async def get_image_into(self, buffer,
+                             utc_dt=None,
+                             asset_ref=EEN_ASSET_REF_PREV,
+                             asset_class=EEN_ASSET_CLS_PRE):
+        """Read a binary JPEG image into a preallocated buffer
+
+        See EagleEyeCamera.get_image_into, the received chunks are
+        copied into buffer.
+
+        Returns:
+            Size of the image, it was written to buffer[:size]
+        """
+        url, params = self._image_request(utc_dt, asset_ref, asset_class)
+        return await self._api.authenticated_query(
+            url, params=params,
+            response_handler=lambda r: read_response_into(r, buffer))
+
+    async def get_image_url(self, utc_dt=None,
+                            asset_ref=EEN_ASSET_REF_PREV,
+                            asset_class=EEN_ASSET_CLS_PRE,
+                            check_auth=True):
+        """Get JPEG image URL from the camera
+
+        Args:
+            utc_dt:
+                Datetime object in UTC
+            asset_ref:
+                prev: previous image to time stamp
+                next: next image to timestamp (blocks)
+                asset: image at timestamp
+            asset_class:
+                all, pre, thumb
+            check_auth:
+                Check auth token and refresh
+
+        Returns:
+            JPEG Image URL or None if not valid Auth exists
+        """
+        if check_auth and not await self._api.check_auth():
+            return None
+
+        return self._signed_url(
+            *self._image_request(utc_dt, asset_ref, asset_class))
+
+    async def get_video(self, file, length, utc_dt=None,
+                        video_format=EEN_VIDEO_FORMAT_FLV, retries=0):
+        """Get a (live) video stream from the camera
+
+        Args:
+            file: file handler for the response
+            length: of the stream in timedelta
+            video_format: flv or mp4
+            utc_dt: utc timestamp for video, live for None
+            retries:
+                number of times an interrupted download of a recorded
+                video is resumed, live videos cannot be resumed.
+
+        """
+        if retries and utc_dt is None:
+            raise CarsonAPIError('Live video streams cannot be resumed')
+
+        url, params = self._video_request(length, utc_dt, video_format)
+        await self._stream_to(file, url, params, retries)
+
+    def stream_video(self, length, utc_dt=None,
+                     video_format=EEN_VIDEO_FORMAT_FLV,
+                     chunk_size=STREAM_CHUNK_SIZE, align_tags=False,
+                     max_buffered_chunks=2):
+        """Stream a (live) video from the camera in chunks
+
+        See EagleEyeCamera.stream_video. The request is sent on the first
+        iteration, max_buffered_chunks bounds the chunks that are read
+        ahead of the consumer.
+
+        Returns:
+            AsyncVideoStream asynchronous iterator of bytes chunks, close
+            it with aclose() to cancel the stream early.
+        """
+        url, params = self._stream_video_request(
+            length, utc_dt, video_format, align_tags)
+        return AsyncVideoStream(self._api, url, params, chunk_size,
+                                align_tags, max_buffered_chunks)
+
+    async def get_video_url(self, length, utc_dt=None,
+                            video_format=EEN_VIDEO_FORMAT_FLV,
+                            check_auth=True):
+        """Get a (live) video stream url from the camera
+
+        Args:
+            length: of the stream in timedelta
+            video_format: flv or mp4
+            utc_dt: utc timestamp for video, live for None
+            check_auth: Check auth token and refresh
+
+        Returns:
+            Video url or None if not valid Auth exists
+        """
+        if check_auth and not await self._api.check_auth():
+            return None
+
+        return self._signed_url(
+            *self._video_request(length, utc_dt, video_format))
+
+    async def _download_export_segment(self, segment, retries, retry_delay):
+        """Download a segment into its part file
+
+        See EagleEyeCamera._download_export_segment, timeouts and client
+        errors of aiohttp download the segment again.
+        """
+        part, seg_start, seg_length = segment
+        if os.path.exists(part):
+            _LOGGER.debug('Resuming export with existing part %s', part)
+            return
+
+        url, params = self._video_request(
+            seg_length, seg_start, EEN_VIDEO_FORMAT_FLV)
+        tmp_part = part + '.tmp'
+        attempt = 0
+        while True:
+            try:
+                with open(tmp_part, 'wb') as file:
+                    await resumable_download(
+                        self._api, url, params, file, retries)
+                replace_file(tmp_part, part)
+                return
+            except (CarsonError, IOError, ClientError,
+                    asyncio.TimeoutError) as error:
+                # resumable_download used up the retries of a dropped
+                # connection already
+                if attempt >= retries or isinstance(
+                        error, IncompleteDownloadError):
+                    if os.path.exists(tmp_part):
+                        os.remove(tmp_part)
+                    raise
+                attempt += 1
+                _LOGGER.info(
+                    'Export segment %s failed, retrying ... (%d left): %s',
+                    part, retries - attempt + 1, error)
+                await asyncio.sleep(retry_delay * attempt)
+
+    async def export_video(self, path, start_utc_dt, length,
+                           segment_length=timedelta(
+                               seconds=EEN_EXPORT_SEGMENT_LENGTH),
+                           max_workers=BULK_MAX_WORKERS,
+                           retries=EEN_EXPORT_SEGMENT_RETRIES,
+                           retry_delay=EEN_EXPORT_RETRY_DELAY):
+        """Export a recorded video range into a single FLV file
+
+        See EagleEyeCamera.export_video, max_workers bounds the number of
+        concurrent segment downloads.
+        """
+        segments = self._export_segments(
+            path, start_utc_dt, length, segment_length)
+        semaphore = create_bounded_semaphore(max_workers)
+
+        async def _download(segment):
+            async with semaphore:
+                await self._download_export_segment(
+                    segment, retries, retry_delay)
+
+        outcomes = await asyncio.gather(
+            *[_download(s) for s in segments], return_exceptions=True)
+        errors = OrderedDict((s[1], o) for s, o in zip(segments, outcomes)
+                             if isinstance(o, Exception))
+        if errors:
+            raise CarsonAggregateError(errors)
+
+        self._join_export_segments(path, start_utc_dt, segments)
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""Asynchronous scheduled polling of live camera snapshots"""
+import asyncio
+import io
+import logging
+import time
+
+from carson_living.poller import (SnapshotFrame,
+                                  SnapshotPoller)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AsyncSnapshotPoller(SnapshotPoller):
+    """Poll the live images of asynchronous cameras at per camera intervals
+
+    Asynchronous counterpart of SnapshotPoller, the polls run as asyncio
+    tasks and a semaphore bounds them to max_workers. callback may be
+    a coroutine function, frame_queue an asyncio.Queue. Must be started
+    from within a running event loop.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(AsyncSnapshotPoller, self).__init__(*args, **kwargs)
+        self._task = None
+        self._wakeup = None
+        self._poll_tasks = set()
+
+    def add_camera(self, camera, interval=None):
+        super(AsyncSnapshotPoller, self).add_camera(camera, interval)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    @property
+    def running(self):
+        """True if the poller is running"""
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start polling in the running event loop"""
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.ensure_future(self._run_async())
+
+    def stop(self, timeout=None):  # pylint: disable=unused-argument
+        """Cancel polling, including the polls in flight
+
+        Args:
+            timeout: unused, for compatibility with SnapshotPoller
+        """
+        for task in [self._task] + list(self._poll_tasks):
+            if task is not None:
+                task.cancel()
+        self._task = None
+        self._poll_tasks.clear()
+        with self._condition:
+            self._in_flight.clear()
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.stop()
+
+    async def _run_async(self):
+        semaphore = asyncio.Semaphore(self._max_workers)
+        while True:
+            now = time.monotonic()
+            next_due = None
+            with self._condition:
+                for camera_id, poll in list(self._polls.items()):
+                    if camera_id in self._in_flight:
+                        continue
+                    if poll.due > now:
+                        next_due = poll.due if next_due is None \
+                            else min(next_due, poll.due)
+                        continue
+                    self._in_flight.add(camera_id)
+                    task = asyncio.ensure_future(
+                        self._poll_async(camera_id, poll, semaphore))
+                    self._poll_tasks.add(task)
+                    task.add_done_callback(self._poll_tasks.discard)
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(),
+                    None if next_due is None else max(next_due - now, 0))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll_async(self, camera_id, poll, semaphore):
+        buffer = io.BytesIO()
+        try:
+            async with semaphore:
+                await poll.camera.get_image(
+                    buffer, asset_class=self._asset_class)
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:  # pylint: disable=broad-except
+            with self._condition:
+                poll.record_error(time.monotonic(), error)
+                self._in_flight.discard(camera_id)
+            self._wakeup.set()
+            _LOGGER.warning(
+                'Polling camera %s failed, backing off %.1fs: %s',
+                camera_id, poll.backoff, error)
+            return
+
+        with self._condition:
+            lag = poll.record_frame(time.monotonic())
+            self._in_flight.discard(camera_id)
+        self._wakeup.set()
+
+        await self._deliver_async(poll, SnapshotFrame(
+            camera_id, time.time(), lag, buffer.getvalue()))
+
+    async def _deliver_async(self, poll, frame):
+        if self._frame_queue is not None:
+            try:
+                self._frame_queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                with self._condition:
+                    poll.dropped += 1
+
+        if self._callback is not None:
+            try:
+                result = self._callback(frame)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.warning('Snapshot callback failed for camera %s',
+                                frame.camera_id, exc_info=True)
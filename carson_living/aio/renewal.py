@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""Asynchronous background renewal of authentication credentials"""
+
+import asyncio
+import logging
+
+from carson_living.const import (RENEWAL_MIN_INTERVAL,
+                                 RENEWAL_RETRY_INTERVAL)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AsyncRenewalTask(object):
+    """asyncio task that renews credentials ahead of their expiry
+
+    Asynchronous counterpart of RenewalThread, renew is a coroutine
+    function. Must be started from within a running event loop.
+
+    Args:
+        renew: coroutine function that renews the credentials
+        next_delay: callable that returns the seconds until the next
+            renewal is due
+        name: name of the renewal (used for logging)
+        retry_interval: seconds to wait after a failed renewal
+        min_interval: minimum seconds between two successful renewals
+
+    Attributes:
+        renewals: number of successful renewals
+        failures: number of failed renewals
+    """
+
+    def __init__(self, renew, next_delay, name,
+                 retry_interval=RENEWAL_RETRY_INTERVAL,
+                 min_interval=RENEWAL_MIN_INTERVAL):
+        self._renew = renew
+        self._next_delay = next_delay
+        self._name = name
+        self._retry_interval = retry_interval
+        self._min_interval = min_interval
+        self._task = None
+
+        self.renewals = 0
+        self.failures = 0
+
+    @property
+    def running(self):
+        """True if the renewal task is running"""
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the renewal task"""
+        if self.running:
+            return
+        self._task = asyncio.ensure_future(self._run())
+
+    def stop(self, timeout=None):  # pylint: disable=unused-argument
+        """Cancel the renewal task
+
+        Args:
+            timeout: unused, for compatibility with RenewalThread
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        delay = self._next_delay()
+        while True:
+            await asyncio.sleep(max(delay, 0))
+            try:
+                await self._renew()
+                self.renewals += 1
+                delay = max(self._next_delay(), self._min_interval)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.warning('%s failed, retrying in %ss',
+                                self._name, self._retry_interval,
+                                exc_info=True)
+                self.failures += 1
+                delay = self._retry_interval
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""Asynchronous chunked streaming of Eagle Eye videos"""
+import asyncio
+
+from carson_living.flv import FlvChunker
+
+
+class AsyncVideoStream(object):
+    """Asynchronous iterator over the chunks of a streaming video
+
+    The request is sent on the first iteration. A background task reads
+    the response into a queue of at most max_buffered_chunks chunks. If
+    the consumer falls behind, the task stops reading from the
+    connection until the consumer catches up. aclose() (or leaving the
+    async context) cancels the task, which releases the connection.
+
+    Args:
+        api: Asynchronous Eagle Eye API
+        url: the video url, can contain a branded subdomain
+        params: the http params to use
+        chunk_size: target size of the chunks in bytes
+        align_tags: cut chunks on FLV tag boundaries, see FlvChunker
+        max_buffered_chunks: number of chunks read ahead of the consumer
+
+    Attributes:
+        bytes_received: number of bytes yielded so far
+        chunks_received: number of chunks yielded so far
+    """
+
+    def __init__(self, api, url, params, chunk_size, align_tags=False,
+                 max_buffered_chunks=2):
+        self._api = api
+        self._url = url
+        self._params = params
+        self._chunk_size = chunk_size
+        self._chunker = FlvChunker(chunk_size, align_tags)
+        self._max_buffered_chunks = max_buffered_chunks
+        self._queue = None
+        self._task = None
+        self._closed = False
+        self.bytes_received = 0
+        self.chunks_received = 0
+
+    async def _read_response(self, response):
+        async for data in response.content.iter_chunked(self._chunk_size):
+            for chunk in self._chunker.feed(data):
+                await self._queue.put(chunk)
+        for chunk in self._chunker.flush():
+            await self._queue.put(chunk)
+
+    async def _produce(self):
+        await self._api.authenticated_query(
+            self._url, params=self._params,
+            response_handler=self._read_response)
+
+    @property
+    def closed(self):
+        """True once the stream ended or was closed"""
+        return self._closed
+
+    async def aclose(self):
+        """Cancel the stream and release the connection"""
+        self._closed = True
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._closed:
+            raise StopAsyncIteration
+        if self._task is None:
+            self._queue = asyncio.Queue(self._max_buffered_chunks)
+            self._task = asyncio.ensure_future(self._produce())
+
+        if self._queue.empty() and not self._task.done():
+            get = asyncio.ensure_future(self._queue.get())
+            await asyncio.wait([get, self._task],
+                               return_when=asyncio.FIRST_COMPLETED)
+            if get.done():
+                return self._received(get.result())
+            get.cancel()
+
+        if not self._queue.empty():
+            return self._received(self._queue.get_nowait())
+
+        # the response was read completely (or failed)
+        self._closed = True
+        self._task.result()
+        raise StopAsyncIteration
+
+    def _received(self, chunk):
+        self.bytes_received += len(chunk)
+        self.chunks_received += 1
+        return chunk
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Collection of asynchronous util functions"""
+
+import asyncio
+
+import aiohttp
+
+from carson_living.error import CarsonCommunicationError
+from carson_living.const import (HTTP_POOL_CONNECTIONS,
+                                 HTTP_POOL_MAXSIZE)
+from carson_living.util import unwrap_carson_response
+
+
+async def async_carson_response_handler(response):
+    """Safely handle asynchronous Carson API responses
+
+    Args:
+        response: An aiohttp response object.
+
+    Returns:
+        The unwrapped data dict of the Carson Living response.
+
+    Raises:
+        CarsonCommunicationError: Response was not received or
+            not in the expected format.
+        CarsonAPIError: Response indicated an client-side API
+            error.
+    """
+    try:
+        r_json = await response.json(content_type=None)
+    except ValueError:
+        raise CarsonCommunicationError(
+            'Unable to handle response payload for {} to {}'.format(
+                response.method, response.url))
+
+    return unwrap_carson_response(r_json)
+
+
+def create_async_http_session(pool_connections=HTTP_POOL_CONNECTIONS,
+                              pool_maxsize=HTTP_POOL_MAXSIZE):
+    """Create a keep-alive, connection pooled aiohttp session
+
+    Must be called from within a running event loop.
+
+    Args:
+        pool_connections: number of hosts to keep connections for
+        pool_maxsize: number of connections to keep alive per host
+
+    Returns:
+        A configured aiohttp.ClientSession object.
+
+    """
+    connector = aiohttp.TCPConnector(
+        limit=pool_connections * pool_maxsize,
+        limit_per_host=pool_maxsize)
+    return aiohttp.ClientSession(connector=connector)
+
+
+def create_bounded_semaphore(max_workers):
+    """Create a semaphore that bounds concurrent coroutines
+
+    Mirrors concurrent_map, None or 1 run the coroutines serially.
+
+    Args:
+        max_workers: maximum number of concurrent coroutines
+
+    Returns:
+        asyncio.Semaphore with at least one slot
+
+    """
+    return asyncio.Semaphore(max(max_workers or 1, 1))
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""Records and compact, array backed indexes of Eagle Eye assets"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from datetime import datetime
+
+from carson_living.const import (EEN_ASSET_REF_ASSET,
+                                 EEN_ASSET_REF_PREV,
+                                 EEN_ASSET_REF_NEXT,
+                                 EEN_ASSET_REF_AFTER)
+from carson_living.error import CarsonError
+from carson_living.timestamp import (een_timestamps_to_millis,
+                                     millis_to_een_timestamps,
+                                     utc_to_millis)
+
+# pylint: disable=invalid-name
+EagleEyeImageAsset = namedtuple('EagleEyeImageAsset',
+                                ['timestamp', 'asset_type'])
+EagleEyeImageAsset.__doc__ = """Recorded image of an Eagle Eye camera
+
+Attributes:
+    timestamp: EEN timestamp of the image
+    asset_type: EEN asset type (e.g. PRFR for preview, THUMB)
+"""
+
+EagleEyeVideoAsset = namedtuple('EagleEyeVideoAsset',
+                                ['start_timestamp', 'end_timestamp'])
+EagleEyeVideoAsset.__doc__ = """Recorded video of an Eagle Eye camera
+
+Attributes:
+    start_timestamp: EEN timestamp of the video start
+    end_timestamp: EEN timestamp of the video end
+"""
+
+# int64 arrays are not available in Python 2, doubles represent epoch
+# millis exactly as well.
+try:
+    _MILLIS_TYPECODE = 'q'
+    array(_MILLIS_TYPECODE)
+except ValueError:
+    _MILLIS_TYPECODE = 'd'
+
+
+def _to_millis(value):
+    if isinstance(value, datetime):
+        return utc_to_millis(value)
+    return int(value)
+
+
+# pylint: disable=useless-object-inheritance
+class EagleEyeAssetIndex(object):
+    """Array backed index of the recorded images of a camera
+
+    Keeps the image timestamps as sorted epoch millis in an int64 array
+    and the asset types as one byte codes into a list of interned type
+    strings, which needs a fraction of the memory of a list of asset
+    records. Images at a point in time are looked up locally in
+    O(log n) with the asset_ref semantics of the image endpoint.
+    """
+
+    def __init__(self, assets=None):
+        self._millis = array(_MILLIS_TYPECODE)
+        self._codes = array('B')
+        self._asset_types = []
+        self._asset_type_codes = {}
+        # asset type -> millis array of that type, built on demand
+        self._type_millis = {}
+
+        if assets is not None:
+            self.extend(assets)
+
+    def __len__(self):
+        return len(self._millis)
+
+    def __iter__(self):
+        return self._assets(0, len(self._millis))
+
+    @property
+    def asset_types(self):
+        """The distinct asset types in the index"""
+        return list(self._asset_types)
+
+    def _code(self, asset_type):
+        code = self._asset_type_codes.get(asset_type)
+        if code is None:
+            if len(self._asset_types) >= 256:
+                raise CarsonError('Too many distinct asset types.')
+            code = len(self._asset_types)
+            self._asset_types.append(asset_type)
+            self._asset_type_codes[asset_type] = code
+        return code
+
+    def extend(self, assets):
+        """Add image assets to the index
+
+        Args:
+            assets: iterable of EagleEyeImageAsset, e.g. the
+                generator of EagleEyeCamera.list_images()
+
+        Raises:
+            CarsonError: an asset has an invalid timestamp.
+        """
+        assets = list(assets)
+        if not assets:
+            return
+
+        millis = een_timestamps_to_millis(a.timestamp for a in assets)
+        codes = [self._code(a.asset_type) for a in assets]
+        in_order = all(millis[i] <= millis[i + 1]
+                       for i in range(len(millis) - 1))
+        if in_order and (not self._millis
+                         or self._millis[-1] <= millis[0]):
+            self._millis.extend(millis)
+            self._codes.extend(codes)
+        else:
+            entries = sorted(zip(list(self._millis) + millis,
+                                 list(self._codes) + codes))
+            self._millis = array(_MILLIS_TYPECODE, [e[0] for e in entries])
+            self._codes = array('B', [e[1] for e in entries])
+        self._type_millis = {}
+
+    def _asset(self, position):
+        return next(self._assets(position, position + 1))
+
+    def _assets(self, start, stop):
+        timestamps = millis_to_een_timestamps(
+            int(m) for m in self._millis[start:stop])
+        asset_types = self._asset_types
+        for timestamp, code in zip(timestamps, self._codes[start:stop]):
+            yield EagleEyeImageAsset(timestamp, asset_types[code])
+
+    def _positions(self, asset_type):
+        """Sorted millis and their positions for an asset type filter"""
+        if asset_type is None:
+            return self._millis, None
+        entry = self._type_millis.get(asset_type)
+        if entry is None:
+            code = self._asset_type_codes.get(asset_type)
+            positions = array('l', [i for i, c in enumerate(self._codes)
+                                    if c == code])
+            entry = (array(_MILLIS_TYPECODE,
+                           [self._millis[i] for i in positions]),
+                     positions)
+            self._type_millis[asset_type] = entry
+        return entry
+
+    def find(self, utc_dt, asset_ref=EEN_ASSET_REF_PREV, asset_type=None):
+        """Find the image for a point in time
+
+        Args:
+            utc_dt:
+                Datetime object in UTC or epoch millis
+            asset_ref:
+                prev: latest image at or before utc_dt
+                next: earliest image at or after utc_dt
+                after: earliest image after utc_dt
+                asset: image exactly at utc_dt
+            asset_type:
+                only consider images of this asset type (e.g. PRFR)
+
+        Returns:
+            EagleEyeImageAsset or None if no image matches.
+
+        Raises:
+            CarsonError: unknown asset_ref
+        """
+        millis = _to_millis(utc_dt)
+        sorted_millis, positions = self._positions(asset_type)
+
+        if asset_ref == EEN_ASSET_REF_PREV:
+            index = bisect_right(sorted_millis, millis) - 1
+        elif asset_ref == EEN_ASSET_REF_NEXT:
+            index = bisect_left(sorted_millis, millis)
+        elif asset_ref == EEN_ASSET_REF_AFTER:
+            index = bisect_right(sorted_millis, millis)
+        elif asset_ref == EEN_ASSET_REF_ASSET:
+            index = bisect_left(sorted_millis, millis)
+            if index < len(sorted_millis) \
+                    and sorted_millis[index] != millis:
+                return None
+        else:
+            raise CarsonError('Unknown asset_ref {}'.format(asset_ref))
+
+        if not 0 <= index < len(sorted_millis):
+            return None
+        return self._asset(index if positions is None
+                           else positions[index])
+
+    def between(self, start_utc_dt, end_utc_dt):
+        """Images within a time range
+
+        Args:
+            start_utc_dt: Datetime object in UTC or epoch millis
+            end_utc_dt: Datetime object in UTC or epoch millis, the
+                range excludes end_utc_dt
+
+        Returns:
+            Iterator of EagleEyeImageAsset in chronological order
+        """
+        return self._assets(
+            bisect_left(self._millis, _to_millis(start_utc_dt)),
+            bisect_left(self._millis, _to_millis(end_utc_dt)))
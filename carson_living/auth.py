@@ -2,8 +2,8 @@
 """Carson Living Authentication Module"""
 
 import logging
+import threading
 import time
-import requests
 import jwt
 from jwt import InvalidTokenError
 
@@ -11,8 +11,11 @@ from jwt import InvalidTokenError
 from carson_living.const import (BASE_HEADERS,
                                  C_API_URI,
                                  C_AUTH_ENDPOINT,
-                                 RETRY_TOKEN)
-from carson_living.util import default_carson_response_handler
+                                 RETRY_TOKEN,
+                                 TOKEN_RENEWAL_MARGIN)
+from carson_living.renewal import RenewalThread
+from carson_living.util import (default_carson_response_handler,
+                                create_http_session)
 from carson_living.error import (CarsonAPIError,
                                  CarsonAuthenticationError,
                                  CarsonTokenError)
@@ -36,16 +39,27 @@ class CarsonAuth(object):
         _token_update_cb:
             gets executed whenever the token gets update to a
             non-None value.
+        _http_session:
+            connection pooled requests session used for all queries.
+        _token_lock:
+            serializes token updates, so that concurrent queries from
+            several threads trigger a single login per expiry.
+        _token_renewal:
+            background renewal of the token, see start_token_renewal().
     """
 
     def __init__(self, username, password,
-                 initial_token=None, token_update_cb=None):
+                 initial_token=None, token_update_cb=None,
+                 http_session=None):
         self._username = username
         self._password = password
+        self._http_session = http_session or self._create_http_session()
+        self._token_lock = threading.RLock()
         self._token = None
         self._token_payload = None
         self._token_expiration_time = None
         self._token_update_cb = None
+        self._token_renewal = None
 
         # Set and init token values
         self.token = initial_token
@@ -63,6 +77,21 @@ class CarsonAuth(object):
         """
         return self._username
 
+    @staticmethod
+    def _create_http_session():
+        """Create the default http session, if none was injected"""
+        return create_http_session()
+
+    @property
+    def http_session(self):
+        """HTTP Session
+
+        Returns:
+            the requests session that is used to query the API
+
+        """
+        return self._http_session
+
     @property
     def token(self):
         """
@@ -98,23 +127,26 @@ class CarsonAuth(object):
             CarsonTokenError: JWT token format is invalid.
         """
         if token is None:
-            self._token = None
-            self._token_payload = None
-            self._token_expiration_time = None
+            with self._token_lock:
+                self._token = None
+                self._token_payload = None
+                self._token_expiration_time = None
             return
         try:
-            self._token_payload = jwt.decode(token, verify=False)
-            self._token_expiration_time = self._token_payload.get('exp')
+            token_payload = jwt.decode(token, verify=False)
+        except InvalidTokenError:
+            raise CarsonTokenError('Cannot decode invalid token {}'
+                                   .format(token))
 
+        with self._token_lock:
+            self._token_payload = token_payload
+            self._token_expiration_time = token_payload.get('exp')
             self._token = token
 
             if self._token_update_cb is not None:
                 self._token_update_cb(token)
-            _LOGGER.info('Set access Token for %s',
-                         self._token_payload.get('email', '<no e-mail found>'))
-        except InvalidTokenError:
-            raise CarsonTokenError('Cannot decode invalid token {}'
-                                   .format(token))
+        _LOGGER.info('Set access Token for %s',
+                     token_payload.get('email', '<no e-mail found>'))
 
     def update_token(self):
         """Authenticate user against Carson Living API.
@@ -125,7 +157,7 @@ class CarsonAuth(object):
         """
         _LOGGER.info('Getting new access token for %s', self._username)
 
-        response = requests.post(
+        response = self._http_session.post(
             (C_API_URI + C_AUTH_ENDPOINT),
             json={
                 'username': self._username,
@@ -152,9 +184,82 @@ class CarsonAuth(object):
 
         return self._token_expiration_time > int(time.time())
 
+    def _valid_token_or_update(self):
+        """Get a valid token, logging in at most once across threads
+
+        Returns:
+            A valid token.
+
+        Raises:
+            CarsonAuthenticationError: On authentication error.
+        """
+        if self.valid_token():
+            return self._token
+
+        with self._token_lock:
+            # another thread may have updated the token in the meantime
+            if self.valid_token():
+                return self._token
+            return self.update_token()
+
+    def _invalidate_token(self, token):
+        """Clear the current token, if it is still the given token
+
+        Args:
+            token: the token that was rejected by the API
+        """
+        with self._token_lock:
+            if self._token == token:
+                self.token = None
+
+    @staticmethod
+    def _create_renewal(renew, next_delay, name):
+        """Create the background renewal, see RenewalThread"""
+        return RenewalThread(renew, next_delay, name)
+
+    def start_token_renewal(self, margin=TOKEN_RENEWAL_MARGIN):
+        """Renew the JWT token in the background before it expires
+
+        Queries then never have to wait for a login. Without a token,
+        the login is performed right away.
+
+        Args:
+            margin: seconds before the token expiration date at which
+                the token is renewed.
+
+        Returns:
+            The started renewal (see RenewalThread).
+        """
+        self.stop_token_renewal()
+        self._token_renewal = self._create_renewal(
+            lambda: self._renew_token_if_due(margin),
+            lambda: self._token_renewal_delay(margin),
+            'Carson token renewal')
+        self._token_renewal.start()
+        return self._token_renewal
+
+    def stop_token_renewal(self):
+        """Stop the background token renewal, if it is running"""
+        if self._token_renewal is not None:
+            self._token_renewal.stop()
+            self._token_renewal = None
+
+    def _token_renewal_delay(self, margin):
+        if self._token is None or self._token_expiration_time is None:
+            return 0
+        return self._token_expiration_time - margin - time.time()
+
+    def _renew_token_if_due(self, margin):
+        with self._token_lock:
+            # the token may have been renewed by a query in the meantime
+            if self._token_renewal_delay(margin) > 0:
+                return
+            self.update_token()
+
     def authenticated_query(self, url, method='get', params=None,
                             json=None, retry_auth=RETRY_TOKEN,
-                            response_handler=default_carson_response_handler):
+                            response_handler=default_carson_response_handler,
+                            headers=None):
         """Perform an authenticated Query against Carson Living
 
         Args:
@@ -164,6 +269,7 @@ class CarsonAuth(object):
             json: the json payload to submit
             retry_auth: number of query and reauthentication retries
             response_handler: dynamic response handler for api
+            headers: optional additional http headers
 
         Returns:
             The unwrapped data dict of the Carson Living response.
@@ -175,22 +281,22 @@ class CarsonAuth(object):
                 error.
         """
 
-        if not self.valid_token():
-            self.update_token()
+        token = self._valid_token_or_update()
 
-        headers = {'Authorization': 'JWT {}'.format(self.token)}
-        headers.update(BASE_HEADERS)
+        request_headers = {'Authorization': 'JWT {}'.format(token)}
+        request_headers.update(BASE_HEADERS)
+        request_headers.update(headers or {})
 
-        response = requests.request(method, url,
-                                    headers=headers,
-                                    params=params,
-                                    json=json)
+        response = self._http_session.request(method, url,
+                                              headers=request_headers,
+                                              params=params,
+                                              json=json)
 
         # special case, clear token and retry. (Recursion)
         if response.status_code == 401 and retry_auth > 0:
-            self.token = None
+            self._invalidate_token(token)
             return self.authenticated_query(
                 url, method, params, json, retry_auth - 1,
-                response_handler)
+                response_handler, headers)
 
         return response_handler(response)
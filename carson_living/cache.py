@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""In-memory snapshot cache for Eagle Eye camera images"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from carson_living.const import (SNAPSHOT_CACHE_LIVE_TTL,
+                                 SNAPSHOT_CACHE_MAX_BYTES)
+
+
+# pylint: disable=useless-object-inheritance
+class SnapshotCache(object):
+    """Thread-safe, byte-size bounded LRU cache for camera images
+
+    Entries are keyed by (camera id, EEN timestamp, asset_ref,
+    asset_class). Live images (timestamp 'now') expire after live_ttl
+    seconds, historic images never change and are kept until they are
+    evicted as least recently used.
+
+    Attributes:
+        hits: number of cache hits
+        misses: number of cache misses (including expired entries)
+        evictions: number of entries evicted to stay within max_bytes
+    """
+
+    def __init__(self, max_bytes=SNAPSHOT_CACHE_MAX_BYTES,
+                 live_ttl=SNAPSHOT_CACHE_LIVE_TTL):
+        self._max_bytes = max_bytes
+        self._live_ttl = live_ttl
+        # key -> (expiration time or None, image bytes)
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(camera_id, timestamp, asset_ref, asset_class):
+        """Cache key of an image request
+
+        Args:
+            camera_id: Eagle Eye camera id
+            timestamp: EEN timestamp string or 'now'
+            asset_ref: prev, next, asset, after
+            asset_class: all, pre, thumb
+
+        Returns: hashable cache key
+
+        """
+        return camera_id, timestamp, asset_ref, asset_class
+
+    @property
+    def max_bytes(self):
+        """Maximum size of all cached images in bytes"""
+        return self._max_bytes
+
+    @property
+    def size(self):
+        """Current size of all cached images in bytes"""
+        return self._size
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Get a cached image
+
+        Args:
+            key: cache key, see SnapshotCache.key()
+
+        Returns: The image bytes or None on a cache miss.
+
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None \
+                    and entry[0] <= time.time():
+                self._remove(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            # mark as most recently used
+            self._entries[key] = self._entries.pop(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, data):
+        """Cache an image
+
+        Images that are larger than max_bytes are not cached.
+
+        Args:
+            key: cache key, see SnapshotCache.key()
+            data: image bytes
+
+        """
+        if len(data) > self._max_bytes:
+            return
+
+        expiration = None
+        if key[1] == 'now':
+            expiration = time.time() + self._live_ttl
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (expiration, data)
+            self._size += len(data)
+
+            while self._size > self._max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        """Remove all cached images"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        """Cache statistics
+
+        Returns:
+            dict with keys hits, misses, evictions, entries and size
+
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'size': self._size,
+            }
+
+    def _remove(self, key):
+        _, data = self._entries.pop(key)
+        self._size -= len(data)
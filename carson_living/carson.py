@@ -6,9 +6,17 @@ from carson_living.auth import CarsonAuth
 
 from carson_living.carson_entities import (CarsonUser,
                                            CarsonBuilding)
+from carson_living.conditional import (ConditionalCache,
+                                       NOT_MODIFIED)
 from carson_living.const import (C_API_URI,
                                  C_ME_ENDPOINT)
-from carson_living.util import update_dictionary
+from carson_living.error import CarsonError
+from carson_living.refresh import RefreshScheduler
+from carson_living.util import (attach_update_diff,
+                                default_carson_response_handler,
+                                update_dictionary,
+                                update_entity,
+                                UpdateDiff)
 
 
 _LOGGER = logging.getLogger(__name__)
@@ -23,15 +31,59 @@ class Carson(CarsonAuth):
             _buildings:
                 The building properties that are associated with
                 the current user
+            _max_workers:
+                Number of buildings that are initialized and
+                updated concurrently (None for serial updates).
+            _lazy_cameras:
+                Defer the Eagle Eye camera discovery of buildings
+                until their cameras are accessed.
+            _snapshot_cache:
+                Optional SnapshotCache that is shared by the cameras
+                of all buildings.
+            _coalesce_requests:
+                Deduplicate concurrent identical Eagle Eye requests
+                (see EagleEye.single_flight).
+            _credential_store:
+                Optional CredentialStore that provides the token and
+                the Eagle Eye sessions at startup and persists their
+                updates.
+            _session_trust_window:
+                Seconds for which verified Eagle Eye sessions are
+                trusted without an auth check (see EagleEye).
+            _conditional_cache:
+                Optional ConditionalCache of the /me/ query, also
+                enables conditional device list queries of the
+                buildings.
     """
     def __init__(self, username, password,
-                 initial_token=None, token_update_cb=None):
+                 initial_token=None, token_update_cb=None,
+                 http_session=None, max_workers=None,
+                 lazy_cameras=False, snapshot_cache=None,
+                 coalesce_requests=False, credential_store=None,
+                 session_trust_window=0, conditional_requests=False):
+        self._credential_store = credential_store
+        if credential_store is not None:
+            initial_token = initial_token or credential_store.load_token()
+            token_update_cb = self._store_token_cb(credential_store,
+                                                   token_update_cb)
+
         super(Carson, self).__init__(username, password,
-                                     initial_token, token_update_cb)
+                                     initial_token, token_update_cb,
+                                     http_session)
 
         self._user = None
         self._buildings = {}
+        self._max_workers = max_workers
+        self._lazy_cameras = lazy_cameras
+        self._snapshot_cache = snapshot_cache
+        self._coalesce_requests = coalesce_requests
+        self._session_trust_window = session_trust_window
+        self._conditional_cache = \
+            ConditionalCache() if conditional_requests else None
+
+        self._initial_update()
 
+    def _initial_update(self):
         self.update()
 
     @property
@@ -44,37 +96,231 @@ class Carson(CarsonAuth):
         """Convenience Function to return first building in account"""
         return next(iter(self.buildings))
 
+    @property
+    def snapshot_cache(self):
+        """The SnapshotCache shared by all cameras or None if disabled"""
+        return self._snapshot_cache
+
+    @property
+    def coalesce_requests(self):
+        """True if concurrent identical Eagle Eye requests are coalesced"""
+        return self._coalesce_requests
+
+    @property
+    def session_trust_window(self):
+        """Seconds for which verified Eagle Eye sessions are trusted"""
+        return self._session_trust_window
+
+    @property
+    def conditional_requests(self):
+        """True if polled payloads are queried conditionally"""
+        return self._conditional_cache is not None
+
+    @property
+    def conditional_cache(self):
+        """The ConditionalCache of the /me/ query or None if disabled
+
+        Its counters report the responses that were not modified and
+        the bytes and parse time that were saved.
+        """
+        return self._conditional_cache
+
+    def create_refresh_scheduler(self, policy=None, callback=None):
+        """Create a scheduler that refreshes the entities per policy
+
+        Args:
+            policy: RefreshPolicy, RefreshPolicy() defaults if None
+            callback: optional callable that receives non-empty diffs
+
+        Returns: RefreshScheduler, see RefreshScheduler.start()
+
+        """
+        return RefreshScheduler(self, policy, callback)
+
+    @property
+    def credential_store(self):
+        """The CredentialStore of the account or None if disabled"""
+        return self._credential_store
+
+    @staticmethod
+    def _store_token_cb(credential_store, token_update_cb):
+        def _token_update_cb(token):
+            credential_store.save_token(token)
+            if token_update_cb is not None:
+                token_update_cb(token)
+        return _token_update_cb
+
     @property
     def user(self):
         """The current authenticated user"""
         return self._user
 
-    def update(self):
+    def update(self, user=True, buildings=True, doors=True):
         """Update entity list and individual entity parameters associated with the API
 
+        Entities with an unchanged payload are skipped, in particular
+        unchanged buildings do not query Eagle Eye again. With
+        conditional requests, an unchanged /me/ response is not even
+        parsed.
+
+        All parts are taken from the same /me/ query, the flags select
+        the parts that are applied (see RefreshScheduler).
+
+        Args:
+            user: apply the user payload
+            buildings:
+                apply the building payloads, including their doors and
+                (if their payload changed) their cameras
+            doors:
+                apply the door payloads of the known buildings, even if
+                buildings is False
+
+        Returns:
+            UpdateDiff of the user, buildings, doors and cameras that
+            were added, removed or changed
+
+        Raises:
+            CarsonAggregateError:
+                If buildings failed to update in concurrent mode
+                (max_workers). All other buildings are updated
+                nevertheless.
+            CarsonError:
+                Serially, the error of the first failing building
+                (e.g. CarsonAPIError) is raised as is.
+
+            In both cases the UpdateDiff of the parts that were applied
+            is the diff attribute of the error.
+
         """
         _LOGGER.debug('Updating Carson Living API and associated entities')
         url = C_API_URI + C_ME_ENDPOINT
-        me_payload = self.authenticated_query(url)
+        me_payload = self._conditional_query(url)
+        if me_payload is NOT_MODIFIED:
+            _LOGGER.debug('Carson Living /me/ payload did not change')
+            return UpdateDiff()
+
+        diff = self._update_user(me_payload) if user else UpdateDiff()
+        try:
+            if buildings:
+                diff = diff.merge(self._update_buildings(me_payload))
+            elif doors:
+                diff = diff.merge(self._update_doors(me_payload))
+        except Exception as error:
+            # the applied parts are skipped as unchanged next time
+            attach_update_diff(error, diff)
+            raise
+
+        # partially applied payloads are queried in full next time
+        if self._conditional_cache is not None \
+                and user and buildings:
+            self._conditional_cache.commit(url)
+        return diff
+
+    def _conditional_query(self, url):
+        if self._conditional_cache is None:
+            return self.authenticated_query(url)
+
+        return self.authenticated_query(
+            url,
+            headers=self._conditional_cache.request_headers(url),
+            response_handler=self._conditional_cache.response_handler(
+                url, default_carson_response_handler))
+
+    def update_building(self, building_id):
+        """Update a single building
+
+        Carson Living has no endpoint for single buildings, so /me/ is
+        still queried, but only the payload of building_id is applied.
+        The user and all other buildings are not touched, in particular
+        they do not query Eagle Eye.
+
+        Args:
+            building_id: Carson Living building id
+
+        Returns:
+            UpdateDiff of the building, its doors and cameras. A building
+            that is no longer part of the account is removed.
+
+        Raises:
+            CarsonError: The building is neither known nor part of /me/.
+
+        """
+        me_payload = self.authenticated_query(C_API_URI + C_ME_ENDPOINT)
+        return self._update_building(
+            building_id, self.map_building_payloads(me_payload))
 
-        self._update_user(me_payload)
-        self._update_buildings(me_payload)
+    def _update_building(self, building_id, building_payloads):
+        building = self._buildings.get(building_id)
+        payload = building_payloads.get(building_id)
+        if payload is None:
+            if building is None:
+                raise CarsonError(
+                    'Unknown building {}'.format(building_id))
+            del self._buildings[building_id]
+            return UpdateDiff(removed=[building.unique_entity_id])
+
+        building, diff = update_entity(building, payload,
+                                       self._create_building)
+        self._buildings[building_id] = building
+        if diff:
+            diff = diff.merge(building.update_diff)
+        return diff
 
     def _update_user(self, payload):
-        if self._user is None:
-            self._user = CarsonUser(entity_payload=payload)
-        else:
-            self._user.update(payload)
+        self._user, diff = update_entity(
+            self._user, payload,
+            lambda p: CarsonUser(entity_payload=p))
+        return diff
 
-    def _update_buildings(self, payload):
+    @staticmethod
+    def map_building_payloads(payload):
+        """Map the /me/ payload to building payloads
+
+        Args:
+            payload: Carson Living /me/ payload
+
+        Returns:
+            dict of building id to building entity payload
+
+        """
         # Not 100% if propertyLevel condition is playing it overly safe.
-        update_buildings = {p['id']: p
-                            for p in payload.get('properties')
-                            if p['propertyLevel'] == 'building'}
-
-        update_dictionary(
-            self._buildings,
-            update_buildings,
-            lambda p: CarsonBuilding(
-                self,
-                p))
+        return {p['id']: p
+                for p in payload.get('properties')
+                if p['propertyLevel'] == 'building'}
+
+    def _update_buildings(self, payload):
+        try:
+            diff = update_dictionary(
+                self._buildings,
+                self.map_building_payloads(payload),
+                self._create_building,
+                self._max_workers)
+        except Exception as error:
+            error.diff = self._merge_building_diffs(
+                getattr(error, 'diff', None) or UpdateDiff())
+            raise
+        return self._merge_building_diffs(diff)
+
+    def _merge_building_diffs(self, diff):
+        # Doors and cameras only change with their building payload
+        for building in self._updated_buildings(diff):
+            diff = diff.merge(building.update_diff)
+        return diff
+
+    def _update_doors(self, payload):
+        diff = UpdateDiff()
+        building_payloads = self.map_building_payloads(payload)
+        for building_id, building in self._buildings.items():
+            if building_id in building_payloads:
+                diff = diff.merge(building.update_doors(
+                    building_payloads[building_id]))
+        return diff
+
+    def _updated_buildings(self, diff):
+        return [b for b in self._buildings.values()
+                if b.unique_entity_id in diff.added
+                or b.unique_entity_id in diff.changed]
+
+    def _create_building(self, entity_payload):
+        return CarsonBuilding(self, entity_payload,
+                              lazy_cameras=self._lazy_cameras)
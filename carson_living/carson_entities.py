@@ -1,15 +1,21 @@
 """Carson Living Entities"""
+from collections import OrderedDict
 
 from carson_living.entities import (_AbstractEntity,
                                     _AbstractAPIEntity)
 
 from carson_living.eagleeye import EagleEye
 
-from carson_living.const import (C_API_URI,
+from carson_living.const import (BULK_MAX_WORKERS,
+                                 C_API_URI,
                                  C_EEN_SESSION_ENDPOINT,
-                                 C_DOOR_OPEN_ENDPOINT)
+                                 C_DOOR_OPEN_ENDPOINT,
+                                 EEN_ASSET_CLS_PRE,
+                                 EEN_ASSET_REF_PREV)
+from carson_living.error import CarsonError
 
-from carson_living.util import update_dictionary
+from carson_living.util import (UpdateDiff,
+                                update_dictionary)
 
 
 class CarsonBuilding(_AbstractAPIEntity):
@@ -25,18 +31,29 @@ class CarsonBuilding(_AbstractAPIEntity):
         _eagleeye:
             Eagle Eye API object that carries a building-specific
             authorization callback.
+        _lazy_cameras:
+            If True, Eagle Eye cameras are only discovered on first
+            access of cameras / eagleeye_api (or via update_cameras)
+            instead of on every entity update.
+        _cameras_loaded:
+            True if the cameras reflect the current entity payload.
+        _update_diff:
+            UpdateDiff of the doors and cameras of the last applied
+            entity payload.
 
 
     """
 
-    def __init__(self, api, entity_payload):
+    def __init__(self, api, entity_payload, lazy_cameras=False):
         self._cameras = {}
         self._doors = {}
+        self._lazy_cameras = lazy_cameras
+        self._cameras_loaded = False
+        self._update_diff = UpdateDiff()
         # Beware, entity building id must be injected early, since it is
         # required during object __init__
-        self._eagleeye = EagleEye(
-            lambda: self._get_eagleeye_session(api, entity_payload.get('id'))
-        )
+        self._eagleeye = self._create_eagleeye_api(
+            api, entity_payload.get('id'))
 
         super(CarsonBuilding, self).__init__(api,
                                              entity_payload=entity_payload)
@@ -58,6 +75,28 @@ pmc: {pmc_name}"""
             pmc_name=self.pmc_name
         )
 
+    def _create_eagleeye_api(self, api, building_id):
+        initial_session = None
+        session_update_cb = None
+        store = api.credential_store
+        if store is not None:
+            initial_session = store.load_eagleeye_session(building_id)
+
+            def session_update_cb(auth_key, brand_subdomain):
+                store.save_eagleeye_session(
+                    building_id, auth_key, brand_subdomain)
+
+        return EagleEye(
+            lambda: self._get_eagleeye_session(api, building_id),
+            http_session=api.http_session,
+            snapshot_cache=api.snapshot_cache,
+            coalesce_requests=api.coalesce_requests,
+            initial_session=initial_session,
+            session_update_cb=session_update_cb,
+            session_trust_window=api.session_trust_window,
+            conditional_requests=api.conditional_requests
+        )
+
     @staticmethod
     def _get_eagleeye_session(carson_api, building_id):
         """Retrieve a new eagle eye auth key and subdomain information
@@ -73,8 +112,33 @@ pmc: {pmc_name}"""
                 subdomain(str): Eagle Eye subdomain to use with account
 
         """
-        url = C_API_URI + C_EEN_SESSION_ENDPOINT.format(building_id)
-        session = carson_api.authenticated_query(url)
+        session = carson_api.authenticated_query(
+            CarsonBuilding.eagleeye_session_url(building_id))
+        return CarsonBuilding.map_eagleeye_session(session)
+
+    @staticmethod
+    def eagleeye_session_url(building_id):
+        """Carson Living endpoint that issues Eagle Eye sessions
+
+        Args:
+            building_id: The building id of the Carson property
+
+        Returns: The url of the Eagle Eye session endpoint
+
+        """
+        return C_API_URI + C_EEN_SESSION_ENDPOINT.format(building_id)
+
+    @staticmethod
+    def map_eagleeye_session(session):
+        """Map the Eagle Eye session payload
+
+        Args:
+            session: Carson Living Eagle Eye session payload
+
+        Returns:
+            (tuple): tuple containing sessionid(str) and subdomain(str)
+
+        """
         return session.get('sessionId'), session.get('activeBrandSubdomain')
 
     @property
@@ -86,35 +150,161 @@ pmc: {pmc_name}"""
         return 'carson_building_{}'.format(self.entity_id)
 
     def _internal_update(self):
+        diff = UpdateDiff()
         # Update Cameras from _entity_payload
-        self._update_cameras()
+        if self._lazy_cameras:
+            # Defer Eagle Eye discovery until the cameras are accessed
+            self._cameras_loaded = False
+        else:
+            diff = self._update_cameras()
 
         # Update Doors from _entity_payload
-        self._update_doors()
+        self._update_diff = diff.merge(self._update_doors())
 
     def _update_cameras(self):
         # Only Support Eagle_Eye right now
         # Update existing via Eagle Eye.
-        self._eagleeye.update()
+        diff = self._eagleeye.update()
+
+        self._map_cameras()
+        return diff
+
+    def _ensure_cameras(self):
+        if not self._cameras_loaded:
+            self._update_cameras()
+
+    @property
+    def cameras_loaded(self):
+        """True if the cameras were discovered for the current payload
+
+        False until the first access in lazy mode (see lazy_cameras).
+        """
+        return self._cameras_loaded
+
+    def update_cameras(self):
+        """Discover the Eagle Eye cameras of the building
+
+        Queries the Eagle Eye session and device list. Only needs to be
+        called explicitly in lazy mode, e.g. to discover the cameras
+        ahead of the first access.
+
+        Returns:
+            UpdateDiff of the Eagle Eye cameras
+
+        """
+        return self._update_cameras()
 
+    def update_camera(self, camera_id):
+        """Update (or add) a single Eagle Eye camera of the building
+
+        Only queries the device payload of the camera, not the device
+        list. Note, cameras are only part of cameras if the building
+        payload lists them (see Carson.update_building).
+
+        Args:
+            camera_id: Eagle Eye camera id
+
+        Returns:
+            UpdateDiff of the camera
+
+        """
+        self._ensure_cameras()
+        diff = self._eagleeye.update_camera(camera_id)
+        self._map_cameras()
+        return diff
+
+    def get_images(self, files,
+                   utc_dt=None,
+                   asset_ref=EEN_ASSET_REF_PREV,
+                   asset_class=EEN_ASSET_CLS_PRE,
+                   max_workers=BULK_MAX_WORKERS):
+        """Get binary JPEG images of the building cameras concurrently
+
+        Args:
+            files:
+                dict of camera entity id to file handler that is
+                written to, e.g.
+                {c.entity_id: io.BytesIO() for c in building.cameras}
+            utc_dt:
+                Datetime object in UTC
+            asset_ref:
+                prev: previous image to time stamp
+                next: next image to timestamp (blocks)
+                asset: image at timestamp
+            asset_class:
+                all, pre, thumb
+            max_workers:
+                maximum number of concurrent downloads
+
+        Returns:
+            OrderedDict of camera id to the raised exception for every
+            camera that failed (empty if all images were written).
+
+        """
+        self._ensure_cameras()
+        errors = self._eagleeye.get_images(
+            self._own_camera_files(files),
+            utc_dt, asset_ref, asset_class, max_workers)
+
+        return self._merge_camera_errors(files, errors)
+
+    def _own_camera_files(self, files):
+        return {k: f for k, f in files.items() if k in self._cameras}
+
+    def _merge_camera_errors(self, files, errors):
+        return OrderedDict(
+            (k, errors.get(k) or CarsonError(
+                'Camera {} does not belong to {}'.format(
+                    k, self.unique_entity_id)))
+            for k in files if k in errors or k not in self._cameras)
+
+    def _map_cameras(self):
         # Cameras are managed by Eagle Eye API and
         # Carson Living only contains filter view of
         # Eagle Eye API
-        self._cameras = {
+        cameras = {
             c['liveViewId']: self._eagleeye.get_camera(c['liveViewId'])
             for c in self.entity_payload.get('cameras')
             if c['provider'] == 'eagle_eye'
         }
+        # Skip cameras that are (not yet) known to Eagle Eye
+        self._cameras = {k: v for k, v in cameras.items() if v is not None}
+        self._cameras_loaded = True
+
+    def update_doors(self, entity_payload=None):
+        """Update the doors of the building
+
+        Args:
+            entity_payload:
+                optional newer building payload to take the doors from,
+                the building itself is not updated
+
+        Returns:
+            UpdateDiff of the doors
 
-    def _update_doors(self):
-        update_doors = {d['id']: d for d in self.entity_payload.get('doors')}
+        """
+        return self._update_doors(entity_payload)
 
-        update_dictionary(
+    def _update_doors(self, entity_payload=None):
+        payload = entity_payload or self.entity_payload
+        update_doors = {d['id']: d for d in payload.get('doors')}
+
+        return update_dictionary(
             self._doors,
             update_doors,
-            lambda p: CarsonDoor(
-                self._api,
-                entity_payload=p))
+            self._create_door)
+
+    def _create_door(self, entity_payload):
+        return CarsonDoor(self._api, entity_payload=entity_payload)
+
+    @property
+    def update_diff(self):
+        """Doors and cameras that changed with the last applied payload
+
+        Returns: UpdateDiff, unchanged payloads do not reset it
+
+        """
+        return self._update_diff
 
     @property
     def eagleeye_api(self):
@@ -123,6 +313,7 @@ pmc: {pmc_name}"""
         Returns: Eagle Eye API associated with that building.
 
         """
+        self._ensure_cameras()
         return self._eagleeye
 
     @property
@@ -150,6 +341,7 @@ pmc: {pmc_name}"""
         Returns: All camera entities associated with the building
 
         """
+        self._ensure_cameras()
         return self._cameras.values()
 
     @property
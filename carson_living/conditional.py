@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""Conditional requests for polled API endpoints"""
+
+import hashlib
+import threading
+import time
+from collections import namedtuple
+
+from carson_living.error import CarsonCommunicationError
+
+# returned instead of the payload if a response did not change
+NOT_MODIFIED = object()
+
+_perf_counter = getattr(time, 'perf_counter', time.time)
+
+# pylint: disable=invalid-name
+_Validators = namedtuple('_Validators', ['etag', 'last_modified',
+                                         'body_hash', 'size', 'parse_time'])
+
+
+def body_hash(body):
+    """Hash of a response body
+
+    Args:
+        body: response body bytes
+
+    Returns: hex digest of the body
+
+    """
+    return hashlib.sha1(body).hexdigest()
+
+
+# pylint: disable=useless-object-inheritance
+class ConditionalCache(object):
+    """Validators and body hashes of polled responses
+
+    Remembers the ETag, Last-Modified and a hash of the body of the last
+    applied response per key (e.g. the url). Follow up requests send
+    If-None-Match / If-Modified-Since, responses that are 304 Not
+    Modified or have the very same body are not parsed again, the
+    caller receives NOT_MODIFIED instead of the payload.
+
+    Validators only take effect once the caller commit()s them after
+    the payload was applied successfully. A failed update is therefore
+    repeated with the full payload.
+
+    Attributes:
+        requests: number of responses handled
+        not_modified: number of 304 Not Modified responses
+        unchanged: number of responses with an unchanged body
+        bytes_saved: body bytes that were not transferred (304)
+        parse_time_saved:
+            seconds of parsing that were skipped, estimated from the
+            last parse of the same key
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._validators = {}
+        self._pending = {}
+        self.requests = 0
+        self.not_modified = 0
+        self.unchanged = 0
+        self.bytes_saved = 0
+        self.parse_time_saved = 0.0
+
+    def request_headers(self, key):
+        """Conditional http headers of the next request
+
+        Args:
+            key: hashable key of the polled resource
+
+        Returns: dict of headers, empty if nothing was committed yet
+
+        """
+        with self._lock:
+            validators = self._validators.get(key)
+        headers = {}
+        if validators is not None:
+            if validators.etag:
+                headers['If-None-Match'] = validators.etag
+            if validators.last_modified:
+                headers['If-Modified-Since'] = validators.last_modified
+        return headers
+
+    def response_handler(self, key, parse):
+        """Response handler that skips unchanged responses
+
+        Args:
+            key: hashable key of the polled resource
+            parse: response handler that parses changed responses
+
+        Returns:
+            response handler, which returns the parsed payload or
+            NOT_MODIFIED
+
+        """
+        def _handler(response):
+            if response.status_code == 304:
+                if self.check(key, response.headers) is None:
+                    raise CarsonCommunicationError(
+                        'Unexpected 304 Not Modified response for {}'
+                        .format(response.url))
+                return NOT_MODIFIED
+
+            body = response.content
+            digest = body_hash(body)
+            if self.check(key, response.headers, digest) is NOT_MODIFIED:
+                return NOT_MODIFIED
+
+            start = _perf_counter()
+            payload = parse(response)
+            self.store(key, response.headers, digest, len(body),
+                       _perf_counter() - start)
+            return payload
+
+        return _handler
+
+    def check(self, key, headers, digest=None):
+        """Count a response and check whether it changed
+
+        Args:
+            key: hashable key of the polled resource
+            headers: response headers
+            digest: body_hash() of the body, None for 304 Not Modified
+
+        Returns:
+            NOT_MODIFIED if the response did not change, else None
+
+        """
+        with self._lock:
+            self.requests += 1
+            validators = self._validators.get(key)
+            if validators is None:
+                return None
+
+            if digest is None:
+                self.not_modified += 1
+                self.bytes_saved += validators.size
+            elif digest == validators.body_hash:
+                self.unchanged += 1
+                # the server may have issued new validators
+                self._validators[key] = validators._replace(
+                    etag=headers.get('ETag') or validators.etag,
+                    last_modified=headers.get('Last-Modified')
+                    or validators.last_modified)
+            else:
+                return None
+
+            self.parse_time_saved += validators.parse_time
+            return NOT_MODIFIED
+
+    def store(self, key, headers, digest, size, parse_time):
+        """Remember the validators of a changed response until commit()
+
+        The previous validators are dropped, so that until the commit,
+        requests receive the full payload again.
+
+        Args:
+            key: hashable key of the polled resource
+            headers: response headers
+            digest: body_hash() of the body
+            size: body size in bytes
+            parse_time: seconds it took to parse the body
+
+        """
+        with self._lock:
+            self._validators.pop(key, None)
+            self._pending[key] = _Validators(
+                headers.get('ETag'), headers.get('Last-Modified'),
+                digest, size, parse_time)
+
+    def commit(self, key):
+        """Use the stored validators for the next requests
+
+        Args:
+            key: hashable key of the polled resource
+
+        """
+        with self._lock:
+            validators = self._pending.pop(key, None)
+            if validators is not None:
+                self._validators[key] = validators
+
+    def invalidate(self, key=None):
+        """Forget validators, the next request receives the full payload
+
+        Args:
+            key: key of the resource, None to forget all resources
+
+        """
+        with self._lock:
+            if key is None:
+                self._validators.clear()
+                self._pending.clear()
+            else:
+                self._validators.pop(key, None)
+                self._pending.pop(key, None)
+
+    def stats(self):
+        """Conditional request statistics
+
+        Returns:
+            dict with keys requests, not_modified, unchanged,
+            bytes_saved and parse_time_saved
+
+        """
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'not_modified': self.not_modified,
+                'unchanged': self.unchanged,
+                'bytes_saved': self.bytes_saved,
+                'parse_time_saved': self.parse_time_saved,
+            }
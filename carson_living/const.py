@@ -17,6 +17,42 @@ BASE_HEADERS = {
 # number of attempts to refresh token
 RETRY_TOKEN = 1
 
+# HTTP connection pooling (keep-alive) defaults
+# number of distinct host pools that are cached
+HTTP_POOL_CONNECTIONS = 10
+# number of connections that are kept alive per host
+HTTP_POOL_MAXSIZE = 10
+
+# chunk size when streaming binary assets
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# number of concurrent queries of bulk operations
+BULK_MAX_WORKERS = 8
+
+# number of assets requested per asset list page
+EEN_ASSET_LIST_PAGE_SIZE = 1000
+
+# chunked video export defaults
+# seconds of video downloaded per segment request
+EEN_EXPORT_SEGMENT_LENGTH = 5 * 60
+# retries of a failed segment before the export fails
+EEN_EXPORT_SEGMENT_RETRIES = 3
+# seconds to wait before the first retry, grows linearly per retry
+EEN_EXPORT_RETRY_DELAY = 1.0
+
+# snapshot polling defaults
+# seconds between two polls of a camera
+SNAPSHOT_POLL_INTERVAL = 1.0
+# poll times vary randomly by +/- this fraction of the interval
+SNAPSHOT_POLL_JITTER = 0.1
+# upper bound of the error backoff in seconds
+SNAPSHOT_POLL_MAX_BACKOFF = 60.0
+
+# snapshot cache defaults
+SNAPSHOT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+# seconds a live ('now') image is served from cache
+SNAPSHOT_CACHE_LIVE_TTL = 1.0
+
 # Carson API endpoints
 # Beware URLs end in '/', otherwise it returns a
 # HTTP/1.1 301 Moved Permanently to the correct version.
@@ -37,6 +73,8 @@ EEN_DEVICE_LIST_ENDPOINT = '/g/device/list'
 EEN_GET_IMAGE_ENDPOINT = '/asset/{}/image.jpeg'
 EEN_GET_VIDEO_ENDPOINT = '/asset/play/video.{}'
 EEN_IS_AUTH_ENDPOINT = '/g/aaa/isauth'
+EEN_LIST_IMAGE_ENDPOINT = '/asset/list/image'
+EEN_LIST_VIDEO_ENDPOINT = '/asset/list/video'
 
 # Eagle Eye Network Interface options
 EEN_ASSET_REF_ASSET = 'asset'
@@ -50,3 +88,21 @@ EEN_ASSET_CLS_THUMB = 'thumb'
 
 EEN_VIDEO_FORMAT_FLV = 'flv'
 EEN_VIDEO_FORMAT_MP4 = 'mp4'
+
+# background renewal of credentials (seconds)
+# renew the Carson JWT this long before it expires
+TOKEN_RENEWAL_MARGIN = 5 * 60
+# re-fetch the Eagle Eye session in this interval
+EEN_SESSION_RENEWAL_INTERVAL = 15 * 60
+# delay before retrying a failed renewal
+RENEWAL_RETRY_INTERVAL = 30
+# lower bound between two successful renewals
+RENEWAL_MIN_INTERVAL = 10
+
+# default refresh policy intervals (seconds), see RefreshPolicy
+REFRESH_USER_INTERVAL = 60 * 60
+REFRESH_BUILDINGS_INTERVAL = 60 * 60
+REFRESH_DOORS_INTERVAL = 60 * 60
+REFRESH_CAMERA_LISTS_INTERVAL = 7 * 24 * 60 * 60
+REFRESH_CAMERAS_INTERVAL = 24 * 60 * 60
+REFRESH_SESSIONS_INTERVAL = EEN_SESSION_RENEWAL_INTERVAL
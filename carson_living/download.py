@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""Resumable downloads of Eagle Eye assets"""
+
+import logging
+import re
+
+from requests.exceptions import (ChunkedEncodingError,
+                                 ConnectionError as RequestsConnectionError)
+
+from carson_living.const import STREAM_CHUNK_SIZE
+from carson_living.error import (CarsonCommunicationError,
+                                 CarsonError)
+
+_LOGGER = logging.getLogger(__name__)
+
+_CONTENT_RANGE = re.compile(r'bytes (\d+)-\d+/(\d+|\*)')
+
+
+class IncompleteDownloadError(CarsonCommunicationError):
+    """The connection closed before the asset was received completely"""
+
+
+def check_buffer_size(content_length, buffer_size):
+    """Raise if a response body cannot fit into a buffer
+
+    Args:
+        content_length: Content-Length header value or None
+        buffer_size: size of the buffer in bytes
+
+    Raises:
+        CarsonError: content_length exceeds buffer_size
+    """
+    if content_length is not None and int(content_length) > buffer_size:
+        raise CarsonError(
+            'Buffer of {} bytes is too small for {} bytes'.format(
+                buffer_size, content_length))
+
+
+def _response_reader(raw, encoded):
+    """File-like object to readinto() the (decoded) body from
+
+    Unencoded bodies are read with readinto() of the http.client
+    response underneath the raw (urllib3) response, which fills the
+    buffer directly. readinto() of urllib3 1.26 reads into a temporary
+    bytes object of the requested size per call instead, it is only
+    used for encoded bodies, which urllib3 has to decode.
+    """
+    # pylint: disable=protected-access
+    reader = getattr(raw, '_fp', None)
+    if not encoded and hasattr(reader, 'readinto'):
+        return reader
+    if hasattr(raw, 'readinto'):
+        return raw
+    raise CarsonError('Raw response stream does not support readinto')
+
+
+def _release_connection(raw, reader):
+    """Return the connection of a completely read response to the pool"""
+    if reader is raw:
+        # reads the (empty) rest, which releases the connection
+        raw.read()
+    elif getattr(reader, 'isclosed', lambda: False)():
+        # http.client closed the body after its last byte, otherwise
+        # closing the response closes the connection
+        raw.release_conn()
+
+
+def read_response_into(response, buffer):
+    """Response handler that reads the body into a preallocated buffer
+
+    The body is read with readinto() into the buffer, see
+    _response_reader(). The connection is returned to the pool
+    afterwards.
+
+    Args:
+        response: streaming requests response
+        buffer: writable bytes-like object, e.g. bytearray or memoryview
+
+    Returns:
+        number of bytes written to the start of buffer
+
+    Raises:
+        CarsonError: The body does not fit into buffer.
+    """
+    raw = response.raw
+    view = memoryview(buffer)
+    try:
+        check_buffer_size(response.headers.get('Content-Length'),
+                          len(view))
+
+        raw.decode_content = True
+        reader = _response_reader(
+            raw, response.headers.get('Content-Encoding', 'identity')
+            != 'identity')
+
+        filled = 0
+        while filled < len(view):
+            count = reader.readinto(view[filled:])
+            if not count:
+                break
+            filled += count
+
+        if filled == len(view) and reader.read(1):
+            raise CarsonError(
+                'Buffer of {} bytes is too small for the response'.format(
+                    len(view)))
+
+        _release_connection(raw, reader)
+        return filled
+    finally:
+        view.release()
+        response.close()
+
+
+# pylint: disable=useless-object-inheritance
+class ResumableDownload(object):
+    """Response handler that resumes interrupted downloads
+
+    Tracks the number of bytes written to file. Follow up requests ask
+    for the missing bytes with a Range header. If the server ignores
+    the Range header, the asset is requested completely again and the
+    bytes that were already written are skipped, so the file never
+    receives duplicate data.
+
+    Content encoding is disabled, so that byte offsets refer to the
+    asset itself.
+
+    Attributes:
+        bytes_written: number of bytes written to file
+        requests: number of requests that returned a response
+        range_requests: number of responses that honored the Range header
+        full_requests:
+            number of responses to a resume request that repeated the
+            complete asset
+    """
+
+    def __init__(self, file):
+        self._file = file
+        self._total = None
+        self.bytes_written = 0
+        self.requests = 0
+        self.range_requests = 0
+        self.full_requests = 0
+
+    @property
+    def complete(self):
+        """True if the complete asset was written"""
+        return self._total is not None and self.bytes_written >= self._total
+
+    def request_headers(self):
+        """Http headers of the next request
+
+        Returns: dict of headers
+        """
+        headers = {'Accept-Encoding': 'identity'}
+        if self.bytes_written:
+            headers['Range'] = 'bytes={}-'.format(self.bytes_written)
+        return headers
+
+    def _start(self, status, content_range, content_length):
+        """Evaluate response headers
+
+        Returns: number of leading response bytes to skip
+        """
+        self.requests += 1
+        start = 0
+        match = _CONTENT_RANGE.match(content_range or '')
+        if status == 206 and match:
+            start = int(match.group(1))
+            if match.group(2) != '*':
+                self._total = int(match.group(2))
+            self.range_requests += 1
+        else:
+            if self.bytes_written:
+                self.full_requests += 1
+            if content_length is not None:
+                self._total = int(content_length)
+
+        if start > self.bytes_written:
+            raise CarsonCommunicationError(
+                'Server resumed the download at byte {}, expected {}'.format(
+                    start, self.bytes_written))
+        return self.bytes_written - start
+
+    def _write(self, chunk, skip):
+        """Write chunk without its first skip bytes
+
+        Returns: remaining number of bytes to skip
+        """
+        if skip >= len(chunk):
+            return skip - len(chunk)
+        self._file.write(chunk[skip:] if skip else chunk)
+        self.bytes_written += len(chunk) - skip
+        return 0
+
+    def _finish(self):
+        if self._total is not None and self.bytes_written < self._total:
+            raise IncompleteDownloadError(
+                'Download interrupted after {} of {} bytes'.format(
+                    self.bytes_written, self._total))
+
+    def __call__(self, response):
+        skip = self._start(response.status_code,
+                           response.headers.get('Content-Range'),
+                           response.headers.get('Content-Length'))
+        try:
+            for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+                skip = self._write(chunk, skip)
+        except (ChunkedEncodingError, RequestsConnectionError) as error:
+            raise IncompleteDownloadError(
+                'Download interrupted after {} bytes: {}'.format(
+                    self.bytes_written, error))
+        finally:
+            response.close()
+        self._finish()
+
+
+def resumable_download(api, url, params, file, retries):
+    """Download an asset into file, resuming after connection drops
+
+    Args:
+        api: Eagle Eye API
+        url: the asset url, can contain a branded subdomain
+        params: the http params to use
+        file: file handler that is written to
+        retries: number of resume requests after interruptions
+
+    Returns:
+        ResumableDownload of the finished download
+
+    Raises:
+        IncompleteDownloadError:
+            The download was still interrupted after all retries.
+    """
+    download = ResumableDownload(file)
+    attempt = 0
+    while True:
+        try:
+            api.authenticated_query(
+                url, params=params,
+                stream=True,
+                headers=download.request_headers(),
+                response_handler=download)
+            return download
+        except (IncompleteDownloadError, RequestsConnectionError) as error:
+            if attempt >= retries:
+                if isinstance(error, IncompleteDownloadError):
+                    raise
+                raise IncompleteDownloadError(
+                    'Download interrupted after {} bytes: {}'.format(
+                        download.bytes_written, error))
+            attempt += 1
+            _LOGGER.info(
+                'Download of %s interrupted after %d bytes, '
+                'resuming ... (%d left)',
+                url, download.bytes_written, retries - attempt + 1)
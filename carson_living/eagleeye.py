@@ -1,22 +1,45 @@
 """Basic Eagle Eye API Module"""
 import logging
+import time
+from collections import OrderedDict
 
-import requests
-from requests import HTTPError
+from requests import HTTPError, Request
+from requests.compat import urlencode
+from requests.utils import requote_uri
 
+from carson_living.conditional import (ConditionalCache,
+                                       NOT_MODIFIED)
 from carson_living.error import (CarsonError,
                                  CarsonAPIError)
 from carson_living.eagleeye_entities import EagleEyeCamera
-
-from carson_living.util import update_dictionary
+from carson_living.renewal import RenewalThread
+from carson_living.singleflight import SingleFlight
+from carson_living.timestamp import (millis_to_een_timestamps,
+                                     utc_to_millis)
+
+from carson_living.util import (update_dictionary,
+                                concurrent_map,
+                                create_http_session,
+                                timedelta_to_micro_time,
+                                update_entity,
+                                UpdateDiff)
 from carson_living.const import (BASE_HEADERS,
+                                 BULK_MAX_WORKERS,
+                                 EEN_ASSET_CLS_PRE,
+                                 EEN_ASSET_REF_PREV,
                                  EEN_API_URI,
                                  EEN_DEVICE_LIST_ENDPOINT,
-                                 EEN_IS_AUTH_ENDPOINT)
+                                 EEN_GET_IMAGE_ENDPOINT,
+                                 EEN_IS_AUTH_ENDPOINT,
+                                 EEN_SESSION_RENEWAL_INTERVAL)
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _json_response_handler(response):
+    return response.json()
+
+
 # pylint: disable=useless-object-inheritance
 class EagleEye(object):
     """Eagle Eye API class for interfacing with the endpoints
@@ -26,14 +49,62 @@ class EagleEye(object):
     API does not update it's state during initialization, but is updated
     externally. Carson Living update automatically triggers an update call
     to Eagle Eye.
+
+    Args:
+        session_callback:
+            callable that returns a new (auth_key, brand_subdomain) tuple
+        http_session:
+            optional (shared) connection pooled requests session
+        snapshot_cache:
+            optional (shared) SnapshotCache for camera images
+        coalesce_requests:
+            deduplicate identical GET queries and image downloads that
+            are in flight concurrently (e.g. from several threads).
+        initial_session:
+            optional (auth_key, brand_subdomain) tuple of a previously
+            stored session, which avoids fetching a new session.
+        session_update_cb:
+            gets executed with (auth_key, brand_subdomain) whenever
+            a new session was fetched.
+        session_trust_window:
+            seconds for which a session that was verified (by a
+            successful query or a freshly fetched session) is trusted
+            by check_auth() without querying the API. 0 disables it.
+        conditional_requests:
+            query the device list conditionally, unchanged device
+            lists are neither parsed nor applied to the cameras.
+
+    Attributes:
+        auth_checks: number of auth checks that queried the API
+        auth_checks_avoided: number of auth checks that were answered
+            within the session trust window.
     """
 
-    def __init__(self, session_callback):
+    def __init__(self, session_callback, http_session=None,
+                 snapshot_cache=None, coalesce_requests=False,
+                 initial_session=None, session_update_cb=None,
+                 session_trust_window=0, conditional_requests=False):
         self._session_callback = session_callback
+        self._session_update_cb = session_update_cb
+        self._http_session = http_session or self._create_http_session()
+        self._snapshot_cache = snapshot_cache
+        self._single_flight = SingleFlight() if coalesce_requests else None
+        self._conditional_cache = \
+            ConditionalCache() if conditional_requests else None
         self._session_auth_key = None
         self._session_brand_subdomain = None
+        self._session_renewal = None
+        self._session_trust_window = session_trust_window
+        self._session_verified_at = None
         self._cameras = {}
 
+        self.auth_checks = 0
+        self.auth_checks_avoided = 0
+
+        if initial_session:
+            self._session_auth_key, self._session_brand_subdomain = \
+                initial_session
+
     @property
     def session_auth_key(self):
         """Current Auth Key"""
@@ -44,6 +115,35 @@ class EagleEye(object):
         """Current Brand Subdomain"""
         return self._session_brand_subdomain
 
+    @staticmethod
+    def _create_http_session():
+        """Create the default http session, if none was injected"""
+        return create_http_session()
+
+    @property
+    def http_session(self):
+        """The requests session used to query the API"""
+        return self._http_session
+
+    @property
+    def snapshot_cache(self):
+        """The SnapshotCache for camera images or None if disabled"""
+        return self._snapshot_cache
+
+    @property
+    def single_flight(self):
+        """The SingleFlight request coalescer or None if disabled
+
+        Its executed / coalesced counters report how many requests
+        were sent and how many were served by an in-flight request.
+        """
+        return self._single_flight
+
+    @property
+    def conditional_cache(self):
+        """The ConditionalCache of the device list or None if disabled"""
+        return self._conditional_cache
+
     @property
     def cameras(self):
         """Get all cameras returned directly by the API"""
@@ -61,6 +161,120 @@ class EagleEye(object):
         """
         return self._cameras.get(ee_id)
 
+    def get_images(self, files,
+                   utc_dt=None,
+                   asset_ref=EEN_ASSET_REF_PREV,
+                   asset_class=EEN_ASSET_CLS_PRE,
+                   max_workers=BULK_MAX_WORKERS):
+        """Get binary JPEG images of many cameras concurrently
+
+        The session auth key is verified once upfront, the images are
+        then downloaded in a bounded thread pool via the shared http
+        session. A failing camera does not abort the others.
+
+        Args:
+            files:
+                dict of camera id to file handler that is written to
+                (e.g. an open file or an io.BytesIO buffer).
+            utc_dt:
+                Datetime object in UTC
+            asset_ref:
+                prev: previous image to time stamp
+                next: next image to timestamp (blocks)
+                asset: image at timestamp
+            asset_class:
+                all, pre, thumb
+            max_workers:
+                maximum number of concurrent downloads
+
+        Returns:
+            OrderedDict of camera id to the raised exception for every
+            camera that failed (empty if all images were written).
+
+        """
+        if files and (not self._session_auth_key
+                      or not self._session_brand_subdomain):
+            self.update_session_auth_key()
+
+        def _get_image(camera_id):
+            camera = self.get_camera(camera_id)
+            if camera is None:
+                raise CarsonError(
+                    'Unknown Eagle Eye camera {}'.format(camera_id))
+            camera.get_image(files[camera_id], utc_dt,
+                             asset_ref, asset_class)
+
+        _, errors = concurrent_map(_get_image, files, max_workers)
+        return errors
+
+    def get_image_urls(self, camera_ids, start_utc_dt, end_utc_dt, step,
+                       asset_ref=EEN_ASSET_REF_PREV,
+                       asset_class=EEN_ASSET_CLS_PRE,
+                       check_auth=True):
+        """Get JPEG image URLs of many cameras over a time range
+
+        Generates the same URLs as EagleEyeCamera.get_image_url(), but
+        checks the auth key at most once, formats every timestamp only
+        once for all cameras and builds the URLs from pre-encoded parts
+        instead of preparing a request per URL.
+
+        Args:
+            camera_ids:
+                iterable of Eagle Eye camera ids
+            start_utc_dt:
+                Datetime object in UTC of the first image
+            end_utc_dt:
+                Datetime object in UTC, the range excludes end_utc_dt
+            step:
+                timedelta between two images
+            asset_ref:
+                prev: previous image to time stamp
+                next: next image to timestamp (blocks)
+                asset: image at timestamp
+            asset_class:
+                all, pre, thumb
+            check_auth:
+                Check auth token and refresh
+
+        Returns:
+            OrderedDict of camera id to the list of JPEG image URLs at
+            start_utc_dt, start_utc_dt + step, ... or None if no valid
+            auth exists.
+
+        Raises:
+            CarsonError: step is not positive.
+        """
+        if step.total_seconds() <= 0:
+            raise CarsonError('Image url step must be positive.')
+
+        if check_auth and not self.check_auth():
+            return None
+
+        # offsets in microseconds keep the truncation of get_image_url
+        start_millis = utc_to_millis(start_utc_dt)
+        start_micros = start_utc_dt.microsecond % 1000
+        step_micros = timedelta_to_micro_time(step)
+        count = -(-timedelta_to_micro_time(end_utc_dt - start_utc_dt)
+                  // step_micros)
+        timestamps = millis_to_een_timestamps(
+            start_millis + (start_micros + i * step_micros) // 1000
+            for i in range(max(count, 0)))
+
+        base_url = Request(
+            url=(EEN_API_URI + EEN_GET_IMAGE_ENDPOINT.format(asset_ref))
+            .format(self._session_brand_subdomain)).prepare().url
+        suffix = '&' + requote_uri(urlencode([
+            ('asset_class', asset_class),
+            ('A', self._session_auth_key)]))
+
+        urls = OrderedDict()
+        for camera_id in camera_ids:
+            prefix = '{}?{}&timestamp='.format(
+                base_url, requote_uri(urlencode([('id', camera_id)])))
+            urls[camera_id] = [prefix + timestamp + suffix
+                               for timestamp in timestamps]
+        return urls
+
     def update_session_auth_key(self):
         """Updates the internal session state via session_callback
 
@@ -70,18 +284,85 @@ class EagleEye(object):
         """
         _LOGGER.debug(
             'Trying to update the session auth key for the Eagle Eye API.')
-        auth_key, brand_subdomain = self._session_callback()
+        self._set_session(*self._session_callback())
 
+    def _set_session(self, auth_key, brand_subdomain):
         if not auth_key or not brand_subdomain:
             raise CarsonError(
                 'Eagle Eye authentication callback returned empty values.')
 
         self._session_auth_key = auth_key
         self._session_brand_subdomain = brand_subdomain
+        self._mark_session_verified()
+
+        if self._session_update_cb is not None:
+            self._session_update_cb(auth_key, brand_subdomain)
+
+    @staticmethod
+    def _create_renewal(renew, next_delay, name):
+        """Create the background renewal, see RenewalThread"""
+        return RenewalThread(renew, next_delay, name)
+
+    def start_session_renewal(self, interval=EEN_SESSION_RENEWAL_INTERVAL):
+        """Re-fetch the session auth key in the background
+
+        The Eagle Eye session does not expose its expiration, so it is
+        renewed in a fixed interval. Without a session, it is fetched
+        right away.
+
+        Args:
+            interval: seconds between two session renewals
+
+        Returns:
+            The started renewal (see RenewalThread).
+        """
+        self.stop_session_renewal()
+        self._session_renewal = self._create_renewal(
+            self.update_session_auth_key,
+            lambda: interval if self._session_auth_key else 0,
+            'Eagle Eye session renewal')
+        self._session_renewal.start()
+        return self._session_renewal
+
+    def stop_session_renewal(self):
+        """Stop the background session renewal, if it is running"""
+        if self._session_renewal is not None:
+            self._session_renewal.stop()
+            self._session_renewal = None
+
+    @property
+    def session_verified(self):
+        """True if the session is within its trust window"""
+        return bool(self._session_auth_key) \
+            and self._session_verified_at is not None \
+            and time.time() - self._session_verified_at \
+            < self._session_trust_window
+
+    def _mark_session_verified(self):
+        self._session_verified_at = time.time()
+
+    def invalidate_session_verification(self):
+        """Stop trusting the session without querying the API
+
+        Call this if a generated url was rejected, the next auth check
+        then queries the API again. Any 401 does this automatically.
+        """
+        self._session_verified_at = None
+
+    def _trust_session(self):
+        """Count and answer an auth check from the trust window"""
+        if self.session_verified:
+            self.auth_checks_avoided += 1
+            return True
+        self.auth_checks += 1
+        return False
 
     def check_auth(self, refresh=True):
         """Check if the current auth_key is still valid
 
+        Within the session trust window, the check is answered without
+        querying the API.
+
         Args:
             refresh:
                 automatically update auth_key if not valid
@@ -92,6 +373,9 @@ class EagleEye(object):
         if not refresh and not self._session_auth_key:
             return False
 
+        if self._trust_session():
+            return True
+
         retry_auth = 1 if refresh else 0
 
         try:
@@ -106,9 +390,13 @@ class EagleEye(object):
 
     def authenticated_query(self, url, method='get', params=None,
                             json=None, retry_auth=1, stream=None,
-                            response_handler=lambda r: r.json()):
+                            response_handler=_json_response_handler,
+                            headers=None):
         """Perform an authenticated Query against Eagle Eye
 
+        If request coalescing is enabled, identical json GET queries that
+        are in flight concurrently are only sent once.
+
         Args:
             url:
                 the url to query, can contain a branded subdomain
@@ -119,6 +407,7 @@ class EagleEye(object):
             retry_auth: number of query and reauthentication retries
             stream: Stream the content
             response_handler: optional file handler to stream the raw content
+            headers: optional additional http headers (e.g. Range)
 
         Returns:
             The json response object, or the file handler that was passed
@@ -128,19 +417,41 @@ class EagleEye(object):
             CarsonAPIError: Response indicated an client or
             server-side API error.
         """
+        if self._single_flight is not None and method == 'get' \
+                and json is None and headers is None \
+                and response_handler is _json_response_handler:
+            key = (url, tuple(sorted((params or {}).items())))
+            return self._single_flight.do(
+                key,
+                lambda: self._authenticated_query(
+                    url, method, params, json, retry_auth,
+                    stream, response_handler, headers))
+
+        return self._authenticated_query(
+            url, method, params, json, retry_auth,
+            stream, response_handler, headers)
+
+    def _authenticated_query(self, url, method, params, json, retry_auth,
+                             stream, response_handler, headers):
         if not self._session_auth_key \
                 or not self._session_brand_subdomain:
             self.update_session_auth_key()
 
-        headers = {'Cookie': 'auth_key={}'.format(self._session_auth_key)}
-        headers.update(BASE_HEADERS)
+        request_headers = {
+            'Cookie': 'auth_key={}'.format(self._session_auth_key)}
+        request_headers.update(BASE_HEADERS)
+        request_headers.update(headers or {})
+
+        response = self._http_session.request(
+            method,
+            url.format(self._session_brand_subdomain),
+            headers=request_headers,
+            params=params,
+            json=json,
+            stream=stream)
 
-        response = requests.request(method,
-                                    url.format(self._session_brand_subdomain),
-                                    headers=headers,
-                                    params=params,
-                                    json=json,
-                                    stream=stream)
+        if response.status_code == 401:
+            self.invalidate_session_verification()
 
         # special case, clear token and retry. (Recursion)
         if response.status_code == 401 and retry_auth > 0:
@@ -148,12 +459,13 @@ class EagleEye(object):
                 'Eagle Eye request %s returned 401, retrying ... (%d left)',
                 url, retry_auth)
             self._session_auth_key = None
-            return self.authenticated_query(
+            return self._authenticated_query(
                 url, method, params, json, retry_auth - 1,
-                stream, response_handler)
+                stream, response_handler, headers)
 
         try:
             response.raise_for_status()
+            self._mark_session_verified()
             return response_handler(response)
 
         except HTTPError as error:
@@ -165,22 +477,124 @@ class EagleEye(object):
         Update entity list and individual entity parameters associated with the
         Eagle Eye API
 
+        Returns:
+            UpdateDiff of the cameras
+
         """
         _LOGGER.debug('Updating Eagle Eye API and associated entities')
-        self._update_cameras()
+        return self._update_cameras()
 
     def _update_cameras(self):
         # Query List
-        device_list = self.authenticated_query(
-            EEN_API_URI + EEN_DEVICE_LIST_ENDPOINT
-        )
+        url = EEN_API_URI + EEN_DEVICE_LIST_ENDPOINT
+        device_list = self._conditional_query(url)
+        if device_list is NOT_MODIFIED:
+            _LOGGER.debug('Eagle Eye device list did not change')
+            return UpdateDiff()
+
+        diff = update_dictionary(
+            self._cameras,
+            self._merged_camera_payloads(self.map_device_list(device_list)),
+            self._create_camera)
+
+        if self._conditional_cache is not None:
+            self._conditional_cache.commit(url)
+        return diff
+
+    def _conditional_query(self, url):
+        if self._conditional_cache is None:
+            return self.authenticated_query(url)
+
+        return self.authenticated_query(
+            url,
+            headers=self._conditional_cache.request_headers(url),
+            response_handler=self._conditional_cache.response_handler(
+                url, _json_response_handler))
+
+    def update_camera(self, camera_id):
+        """Update (or add) a single camera with its device payload
+
+        Only queries the device payload of the camera (see
+        EagleEyeCamera.get_payload), the other cameras are not touched.
+
+        Args:
+            camera_id: Eagle Eye camera id
 
-        update_cameras = {
+        Returns:
+            UpdateDiff of the camera
+
+        """
+        payload = EagleEyeCamera.get_payload(self, camera_id)
+        return self._merge_camera_payloads({camera_id: payload})
+
+    def update_camera_details(self, camera_ids=None,
+                              max_workers=BULK_MAX_WORKERS):
+        """Update many cameras with their full device payload concurrently
+
+        The device list only contains a subset of the camera fields,
+        the full payload requires one /device/ request per camera. The
+        requests are sent in a bounded thread pool via the shared http
+        session, the payloads are merged into the cameras afterwards in
+        the calling thread. A failing camera does not abort the others.
+
+        Args:
+            camera_ids:
+                Eagle Eye camera ids, None to update all known cameras.
+                Unknown ids are added.
+            max_workers:
+                maximum number of concurrent requests
+
+        Returns:
+            (tuple): tuple containing:
+
+                diff(UpdateDiff): the added and changed cameras
+                errors(OrderedDict): camera id to the raised exception
+                    for every camera that failed
+
+        """
+        if camera_ids is None:
+            camera_ids = list(self._cameras)
+        if camera_ids and (not self._session_auth_key
+                           or not self._session_brand_subdomain):
+            self.update_session_auth_key()
+
+        payloads, errors = concurrent_map(
+            lambda k: EagleEyeCamera.get_payload(self, k),
+            camera_ids, max_workers)
+        return self._merge_camera_payloads(payloads), errors
+
+    def _merged_camera_payloads(self, payloads):
+        # list payloads must not strip the device payload fields
+        return OrderedDict(
+            (k, self._cameras[k].merged_payload(p)
+             if k in self._cameras else p)
+            for k, p in payloads.items())
+
+    def _merge_camera_payloads(self, payloads):
+        diff = UpdateDiff()
+        for camera_id, payload in self._merged_camera_payloads(
+                payloads).items():
+            camera, camera_diff = update_entity(
+                self._cameras.get(camera_id), payload, self._create_camera)
+            self._cameras[camera_id] = camera
+            diff = diff.merge(camera_diff)
+        return diff
+
+    def _create_camera(self, entity_payload):
+        return EagleEyeCamera(self, entity_payload)
+
+    @staticmethod
+    def map_device_list(device_list):
+        """Map the device/list payload to camera entity payloads
+
+        Args:
+            device_list: Eagle Eye /g/device/list payload
+
+        Returns:
+            dict of camera id to camera entity payload
+
+        """
+        return {
             c[1]: EagleEyeCamera.map_list_to_entity_payload(c)
             for c in device_list if c[3] == 'camera'
         }
-
-        update_dictionary(
-            self._cameras,
-            update_cameras,
-            lambda c: EagleEyeCamera(self, c))
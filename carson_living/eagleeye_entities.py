@@ -1,22 +1,124 @@
 """Eagle Eye API Entities"""
+import io
+import logging
+import os
 import shutil
+import time
+from collections import OrderedDict
+from datetime import timedelta
 
 from requests import Request
 
+from carson_living.assets import (EagleEyeAssetIndex,
+                                  EagleEyeImageAsset,
+                                  EagleEyeVideoAsset)
+from carson_living.cache import SnapshotCache
+from carson_living.download import (check_buffer_size,
+                                     IncompleteDownloadError,
+                                     read_response_into,
+                                     resumable_download)
 from carson_living.entities import _AbstractAPIEntity
+from carson_living.flv import concat_flv
+from carson_living.stream import VideoStream
 
 from carson_living.const import (EEN_API_URI,
                                  EEN_DEVICE_ENDPOINT,
                                  EEN_GET_IMAGE_ENDPOINT,
                                  EEN_GET_VIDEO_ENDPOINT,
+                                 EEN_LIST_IMAGE_ENDPOINT,
+                                 EEN_LIST_VIDEO_ENDPOINT,
+                                 EEN_ASSET_LIST_PAGE_SIZE,
+                                 EEN_EXPORT_SEGMENT_LENGTH,
+                                 EEN_EXPORT_SEGMENT_RETRIES,
+                                 EEN_EXPORT_RETRY_DELAY,
+                                 BULK_MAX_WORKERS,
+                                 EEN_ASSET_CLS_ALL,
                                  EEN_ASSET_CLS_PRE,
                                  EEN_ASSET_REF_PREV,
-                                 EEN_VIDEO_FORMAT_FLV)
+                                 EEN_VIDEO_FORMAT_FLV,
+                                 STREAM_CHUNK_SIZE)
+
+from carson_living.error import (CarsonAggregateError,
+                                 CarsonAPIError,
+                                 CarsonError)
+from carson_living.timestamp import (format_een_timestamp,
+                                     een_timestamp_to_millis,
+                                     millis_to_een_timestamp)
+
+from carson_living.util import (concurrent_map,
+                                current_milli_time,
+                                replace_file,
+                                timedelta_to_milli_time)
 
-from carson_living.error import CarsonAPIError
+_LOGGER = logging.getLogger(__name__)
+
+
+def _copy_response_to(file):
+    """Response handler that streams the raw content to file"""
+    def _response_file_handler(response):
+        response.raw.decode_content = True
+        shutil.copyfileobj(response.raw, file)
+    return _response_file_handler
+
+
+def _keep_response(response):
+    """Response handler that hands out the open (streaming) response"""
+    return response
+
+
+def _asset_key(list_payload):
+    """Identity of an asset list entry: timestamp and asset class"""
+    return list_payload['s'], list_payload.get('t')
 
-from carson_living.util import (current_milli_time,
-                                timedelta_to_milli_time)
+
+# pylint: disable=useless-object-inheritance
+class _AssetPager(object):
+    """Paging state of an asset list
+
+    Several assets (e.g. a PRFR and a THUMB image) can share the same
+    millisecond, so the next page starts at the timestamp of the last
+    asset of the previous page instead of after it. Assets of that
+    millisecond that were listed already are skipped.
+
+    Attributes:
+        start_ts: start timestamp of the next page, None after the last
+    """
+
+    def __init__(self, start_ts, page_size):
+        self.start_ts = start_ts
+        self._page_size = page_size
+        # keys of the listed assets at start_ts
+        self._listed = set()
+
+    def add_page(self, page):
+        """Advance to the next page
+
+        Args:
+            page: asset list payloads of the page requested at start_ts
+
+        Returns:
+            list of the asset list payloads that were not listed before
+        """
+        new = [p for p in page if _asset_key(p) not in self._listed]
+        if len(page) < self._page_size:
+            self.start_ts = None
+            return new
+
+        last_ts = page[-1]['s']
+        if not new:
+            # a full page of a single millisecond, more assets of it
+            # cannot be requested, continue after it
+            self.start_ts = millis_to_een_timestamp(
+                een_timestamp_to_millis(last_ts) + 1)
+            self._listed = set()
+            return new
+
+        if last_ts != self.start_ts:
+            self._listed = set()
+        self.start_ts = last_ts
+        self._listed.update(_asset_key(p) for p in page
+                            if p['s'] == last_ts)
+        return new
 
 
 class EagleEyeCamera(_AbstractAPIEntity):
@@ -90,8 +192,25 @@ class EagleEyeCamera(_AbstractAPIEntity):
             "account_id": list_entity_payload[0]
         }
 
+    def merged_payload(self, entity_payload):
+        """Merge a (partial) payload into the current entity payload
+
+        The device list only contains a subset of the device fields,
+        list and device payloads therefore update the fields they
+        contain instead of replacing the payload.
+
+        Args:
+            entity_payload: list or device payload of the camera
+
+        Returns:
+            New entity payload with the fields of entity_payload
+
+        """
+        return dict(self._entity_payload or {}, **entity_payload)
+
     def _get_payload_internal(self):
-        return self.get_payload(self._api, self.entity_id)
+        return self.merged_payload(
+            self.get_payload(self._api, self.entity_id))
 
     @staticmethod
     def get_payload(api, camera_id):
@@ -227,33 +346,170 @@ tags: {tags}"""
         Returns: EEN timestamp format
 
         """
-        return utc_dt.strftime('%Y%m%d%H%M%S.%f')[:-3]
+        return format_een_timestamp(utc_dt)
 
     @staticmethod
     def _get_video_timestamps(length, utc_dt, video_format):
-        # default are download parameters
-        time_millies = current_milli_time()
-        length_millies = timedelta_to_milli_time(length)
-
-        # Live case
-        start_ts = 'stream_{}'.format(time_millies)
-        end_ts = '+{}'.format(length_millies)
-
         if utc_dt is None:
+            # Live case
             if video_format != EEN_VIDEO_FORMAT_FLV:
                 raise CarsonAPIError(
                     'Live video streaming is only possible with .flv')
-        else:
-            # Not live
-            start_ts = EagleEyeCamera.utc_to_een_timestamp(utc_dt)
-            end_ts = EagleEyeCamera.utc_to_een_timestamp(utc_dt + length)
+            return ('stream_{}'.format(current_milli_time()),
+                    '+{}'.format(timedelta_to_milli_time(length)))
+
+        # Not live
+        return (format_een_timestamp(utc_dt),
+                format_een_timestamp(utc_dt + length))
+
+    def _image_request(self, utc_dt, asset_ref, asset_class):
+        """Url template and params of an image request"""
+        timestamp = 'now'
+        if utc_dt is not None:
+            timestamp = self.utc_to_een_timestamp(utc_dt)
+
+        url = EEN_API_URI + EEN_GET_IMAGE_ENDPOINT.format(
+            asset_ref)
+        return url, {'id': self.entity_id,
+                     'timestamp': timestamp,
+                     'asset_class': asset_class}
+
+    def _video_request(self, length, utc_dt, video_format):
+        """Url template and params of a video request"""
+        start_ts, end_ts = self._get_video_timestamps(
+            length, utc_dt, video_format)
+
+        url = EEN_API_URI + EEN_GET_VIDEO_ENDPOINT.format(
+            video_format)
+        return url, {'id': self.entity_id,
+                     'start_timestamp': start_ts,
+                     'end_timestamp': end_ts}
+
+    def _asset_list_request(self, endpoint, start_ts, end_ts, page_size,
+                            asset_class=None):
+        """Url and params of an asset list page request"""
+        params = {'id': self.entity_id,
+                  'start_timestamp': start_ts,
+                  'end_timestamp': end_ts,
+                  'count': page_size}
+        if asset_class is not None:
+            params['asset_class'] = asset_class
+        return EEN_API_URI + endpoint, params
+
+    @staticmethod
+    def map_image_asset(list_payload):
+        """Map an /asset/list/image entry to an EagleEyeImageAsset"""
+        return EagleEyeImageAsset(list_payload['s'], list_payload.get('t'))
+
+    @staticmethod
+    def map_video_asset(list_payload):
+        """Map an /asset/list/video entry to an EagleEyeVideoAsset"""
+        return EagleEyeVideoAsset(list_payload['s'], list_payload.get('e'))
+
+    def _list_assets(self, endpoint, start_utc_dt, end_utc_dt, page_size,
+                     mapper, asset_class=None):
+        pager = _AssetPager(format_een_timestamp(start_utc_dt), page_size)
+        end_ts = format_een_timestamp(end_utc_dt)
+        while pager.start_ts is not None:
+            url, params = self._asset_list_request(
+                endpoint, pager.start_ts, end_ts, page_size, asset_class)
+            page = self._api.authenticated_query(url, params=params)
+            for list_payload in pager.add_page(page):
+                yield mapper(list_payload)
+
+    def list_images(self, start_utc_dt, end_utc_dt,
+                    asset_class=EEN_ASSET_CLS_ALL,
+                    page_size=EEN_ASSET_LIST_PAGE_SIZE):
+        """List the recorded images of the camera
+
+        The list is paged lazily, a page of page_size images is only
+        requested once the previous page was consumed.
+
+        Args:
+            start_utc_dt: Datetime object in UTC of the range start
+            end_utc_dt: Datetime object in UTC of the range end
+            asset_class: all, pre, thumb
+            page_size: number of images requested per page
+
+        Returns:
+            Generator of EagleEyeImageAsset in chronological order
+        """
+        return self._list_assets(
+            EEN_LIST_IMAGE_ENDPOINT, start_utc_dt, end_utc_dt, page_size,
+            self.map_image_asset, asset_class)
+
+    def list_videos(self, start_utc_dt, end_utc_dt,
+                    page_size=EEN_ASSET_LIST_PAGE_SIZE):
+        """List the recorded videos of the camera
+
+        The list is paged lazily, see list_images().
+
+        Args:
+            start_utc_dt: Datetime object in UTC of the range start
+            end_utc_dt: Datetime object in UTC of the range end
+            page_size: number of videos requested per page
+
+        Returns:
+            Generator of EagleEyeVideoAsset in chronological order
+        """
+        return self._list_assets(
+            EEN_LIST_VIDEO_ENDPOINT, start_utc_dt, end_utc_dt, page_size,
+            self.map_video_asset)
+
+    def build_asset_index(self, start_utc_dt, end_utc_dt,
+                          asset_class=EEN_ASSET_CLS_ALL,
+                          page_size=EEN_ASSET_LIST_PAGE_SIZE):
+        """List the recorded images of a time range into an index
+
+        The EagleEyeAssetIndex resolves prev / next / asset lookups
+        locally, instead of querying the image endpoint per lookup.
+
+        Args:
+            start_utc_dt: Datetime object in UTC of the range start
+            end_utc_dt: Datetime object in UTC of the range end
+            asset_class: all, pre, thumb
+            page_size: number of images requested per page
+
+        Returns:
+            EagleEyeAssetIndex of the listed images
+        """
+        index = EagleEyeAssetIndex()
+        page = []
+        for asset in self.list_images(start_utc_dt, end_utc_dt,
+                                      asset_class, page_size):
+            page.append(asset)
+            if len(page) >= page_size:
+                index.extend(page)
+                page = []
+        index.extend(page)
+        return index
+
+    def _signed_url(self, url, params):
+        """Url with branded subdomain and embedded auth key"""
+        params = dict(params)
+        params['A'] = self._api.session_auth_key
+
+        prepared = Request(
+            url=url.format(self._api.session_brand_subdomain),
+            params=params).prepare()
+        return prepared.url
+
+    def _stream_to(self, file, url, params, retries):
+        """Stream an asset into file, resuming interrupted downloads"""
+        if retries:
+            resumable_download(self._api, url, params, file, retries)
+            return None
 
-        return start_ts, end_ts
+        return self._api.authenticated_query(
+            url, params=params,
+            stream=True,
+            response_handler=_copy_response_to(file))
 
     def get_image(self, file,
                   utc_dt=None,
                   asset_ref=EEN_ASSET_REF_PREV,
-                  asset_class=EEN_ASSET_CLS_PRE):
+                  asset_class=EEN_ASSET_CLS_PRE,
+                  retries=0):
         """Get binary JPEG image from the camera
 
         Args:
@@ -267,29 +523,91 @@ tags: {tags}"""
                 asset: image at timestamp
             asset_class:
                 all, pre, thumb
+            retries:
+                number of times an interrupted download is resumed
 
         Returns:
             JPEG Image
         """
-        def _response_file_handler(response):
-            response.raw.decode_content = True
-            shutil.copyfileobj(response.raw, file)
+        url, params = self._image_request(utc_dt, asset_ref, asset_class)
+
+        cache = self._api.snapshot_cache
+        single_flight = self._api.single_flight
+        if cache is None and single_flight is None:
+            return self._stream_to(file, url, params, retries)
+
+        key = SnapshotCache.key(
+            self.entity_id, params['timestamp'], asset_ref, asset_class)
+
+        def _download():
+            buffer = io.BytesIO()
+            self._stream_to(buffer, url, params, retries)
+            if cache is not None:
+                cache.put(key, buffer.getvalue())
+            return buffer.getvalue()
+
+        data = cache.get(key) if cache is not None else None
+        if data is None:
+            if single_flight is not None:
+                data = single_flight.do(('image',) + key, _download)
+            else:
+                data = _download()
+
+        file.write(data)
+
+    def get_image_into(self, buffer,
+                       utc_dt=None,
+                       asset_ref=EEN_ASSET_REF_PREV,
+                       asset_class=EEN_ASSET_CLS_PRE):
+        """Read a binary JPEG image into a preallocated buffer
+
+        The image is read from the connection into buffer, without
+        collecting the response content, which makes a reused buffer
+        the cheapest way to poll images at a high rate. Cached
+        images are copied into buffer, concurrent identical downloads
+        are not coalesced.
 
-        timestamp = 'now'
-        if utc_dt is not None:
-            timestamp = self.utc_to_een_timestamp(utc_dt)
+        Args:
+            buffer:
+                writable bytes-like object, e.g. bytearray or memoryview
+            utc_dt:
+                Datetime object in UTC
+            asset_ref:
+                prev: previous image to time stamp
+                next: next image to timestamp (blocks)
+                asset: image at timestamp
+            asset_class:
+                all, pre, thumb
 
-        url = EEN_API_URI + EEN_GET_IMAGE_ENDPOINT.format(
-            asset_ref)
-        return self._api.authenticated_query(
-            url, params={'id': self.entity_id,
-                         'timestamp': timestamp,
-                         'asset_class': asset_class},
+        Returns:
+            Size of the image, it was written to buffer[:size]
+
+        Raises:
+            CarsonError: The image does not fit into buffer.
+        """
+        url, params = self._image_request(utc_dt, asset_ref, asset_class)
+
+        cache = self._api.snapshot_cache
+        key = None
+        if cache is not None:
+            key = SnapshotCache.key(
+                self.entity_id, params['timestamp'], asset_ref, asset_class)
+            data = cache.get(key)
+            if data is not None:
+                check_buffer_size(len(data), len(buffer))
+                memoryview(buffer)[:len(data)] = data
+                return len(data)
+
+        size = self._api.authenticated_query(
+            url, params=params,
             stream=True,
-            response_handler=_response_file_handler)
+            headers={'Accept-Encoding': 'identity'},
+            response_handler=lambda r: read_response_into(r, buffer))
+
+        if cache is not None:
+            cache.put(key, bytes(memoryview(buffer)[:size]))
+        return size
 
-    # Not this is quite duplicate at the moment, but a major refactor
-    # would be needed to return a prepared url via authenticated_query
     def get_image_url(self, utc_dt=None,
                       asset_ref=EEN_ASSET_REF_PREV,
                       asset_class=EEN_ASSET_CLS_PRE,
@@ -314,26 +632,12 @@ tags: {tags}"""
         if check_auth and not self._api.check_auth():
             return None
 
-        timestamp = 'now'
-        if utc_dt is not None:
-            timestamp = self.utc_to_een_timestamp(utc_dt)
-
-        url = EEN_API_URI.format(
-            self._api.session_brand_subdomain
-        ) + EEN_GET_IMAGE_ENDPOINT.format(
-            asset_ref
-        )
-
-        prepared = Request(url=url, params={
-            'id': self.entity_id,
-            'timestamp': timestamp,
-            'asset_class': asset_class,
-            'A': self._api.session_auth_key}).prepare()
-        return prepared.url
+        return self._signed_url(
+            *self._image_request(utc_dt, asset_ref, asset_class))
 
     # stream Live video to file
     def get_video(self, file, length, utc_dt=None,
-                  video_format=EEN_VIDEO_FORMAT_FLV):
+                  video_format=EEN_VIDEO_FORMAT_FLV, retries=0):
         """Get a (live) video stream from the camera
 
         Args:
@@ -341,28 +645,52 @@ tags: {tags}"""
             length: of the stream in timedelta
             video_format: flv or mp4
             utc_dt: utc timestamp for video, live for None
+            retries:
+                number of times an interrupted download of a recorded
+                video is resumed, live videos cannot be resumed.
 
         Returns:
             Video stream to file
         """
-        def _response_file_handler(response):
-            response.raw.decode_content = True
-            shutil.copyfileobj(response.raw, file)
+        if retries and utc_dt is None:
+            raise CarsonAPIError('Live video streams cannot be resumed')
 
-        start_ts, end_ts = self._get_video_timestamps(
-            length, utc_dt, video_format)
+        url, params = self._video_request(length, utc_dt, video_format)
+        return self._stream_to(file, url, params, retries)
 
-        url = EEN_API_URI + EEN_GET_VIDEO_ENDPOINT.format(
-            video_format)
-        return self._api.authenticated_query(
-            url, params={'id': self.entity_id,
-                         'start_timestamp': start_ts,
-                         'end_timestamp': end_ts},
+    def _stream_video_request(self, length, utc_dt, video_format,
+                              align_tags):
+        if align_tags and video_format != EEN_VIDEO_FORMAT_FLV:
+            raise CarsonAPIError(
+                'Only .flv videos can be split on tag boundaries')
+        return self._video_request(length, utc_dt, video_format)
+
+    def stream_video(self, length, utc_dt=None,
+                     video_format=EEN_VIDEO_FORMAT_FLV,
+                     chunk_size=STREAM_CHUNK_SIZE, align_tags=False):
+        """Stream a (live) video from the camera in chunks
+
+        Args:
+            length: of the stream in timedelta
+            utc_dt: utc timestamp for video, live for None
+            video_format: flv or mp4
+            chunk_size: target size of the chunks in bytes
+            align_tags:
+                cut chunks on FLV tag boundaries, the first chunk is the
+                FLV header and every further chunk holds complete tags.
+
+        Returns:
+            VideoStream iterator of bytes chunks, close it to cancel
+            the stream early.
+        """
+        url, params = self._stream_video_request(
+            length, utc_dt, video_format, align_tags)
+        response = self._api.authenticated_query(
+            url, params=params,
             stream=True,
-            response_handler=_response_file_handler)
+            response_handler=_keep_response)
+        return VideoStream(response, chunk_size, align_tags)
 
-    # Not this is quite duplicate at the moment, but a major refactor
-    # would be needed to return a prepared url via authenticated_query
     def get_video_url(self, length, utc_dt=None,
                       video_format=EEN_VIDEO_FORMAT_FLV, check_auth=True):
         """Get a (live) video stream from the camera
@@ -380,18 +708,126 @@ tags: {tags}"""
         if check_auth and not self._api.check_auth():
             return None
 
-        start_ts, end_ts = self._get_video_timestamps(
-            length, utc_dt, video_format)
+        return self._signed_url(
+            *self._video_request(length, utc_dt, video_format))
 
-        url = EEN_API_URI.format(
-            self._api.session_brand_subdomain
-        ) + EEN_GET_VIDEO_ENDPOINT.format(
-            video_format
-        )
+    def _export_segments(self, path, start_utc_dt, length, segment_length):
+        """(part path, start, length) of the segments of an export
 
-        prepared = Request(url=url, params={
-            'id': self.entity_id,
-            'start_timestamp': start_ts,
-            'end_timestamp': end_ts,
-            'A': self._api.session_auth_key}).prepare()
-        return prepared.url
+        The part path encodes the segment range, so that parts of an
+        export with other parameters are never mistaken for a resumable
+        segment.
+        """
+        if segment_length <= timedelta(0):
+            raise CarsonError('Export segment length must be positive')
+
+        segments = []
+        offset = timedelta(0)
+        while offset < length:
+            seg_length = min(segment_length, length - offset)
+            seg_start = start_utc_dt + offset
+            part = '{}.{}-{}.part'.format(
+                path, format_een_timestamp(seg_start),
+                format_een_timestamp(seg_start + seg_length))
+            segments.append((part, seg_start, seg_length))
+            offset += seg_length
+        return segments
+
+    def _download_export_segment(self, segment, retries, retry_delay):
+        """Download a segment into its part file
+
+        Dropped connections are resumed with Range requests and the
+        received size is checked against the Content-Length, so that a
+        truncated segment never becomes a part file. Other failures
+        download the segment again.
+        """
+        part, seg_start, seg_length = segment
+        if os.path.exists(part):
+            _LOGGER.debug('Resuming export with existing part %s', part)
+            return
+
+        url, params = self._video_request(
+            seg_length, seg_start, EEN_VIDEO_FORMAT_FLV)
+        tmp_part = part + '.tmp'
+        attempt = 0
+        while True:
+            try:
+                with open(tmp_part, 'wb') as file:
+                    resumable_download(self._api, url, params, file, retries)
+                replace_file(tmp_part, part)
+                return
+            except (CarsonError, IOError) as error:
+                # resumable_download used up the retries of a dropped
+                # connection already
+                if attempt >= retries or isinstance(
+                        error, IncompleteDownloadError):
+                    if os.path.exists(tmp_part):
+                        os.remove(tmp_part)
+                    raise
+                attempt += 1
+                _LOGGER.info(
+                    'Export segment %s failed, retrying ... (%d left): %s',
+                    part, retries - attempt + 1, error)
+                time.sleep(retry_delay * attempt)
+
+    @staticmethod
+    def _join_export_segments(path, start_utc_dt, segments):
+        """Concatenate the downloaded parts in order into path"""
+        def _parts():
+            for part, seg_start, _ in segments:
+                with open(part, 'rb') as file:
+                    yield file, timedelta_to_milli_time(
+                        seg_start - start_utc_dt)
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as file:
+            concat_flv(file, _parts())
+        replace_file(tmp_path, path)
+
+        for part, _, _ in segments:
+            os.remove(part)
+
+    def export_video(self, path, start_utc_dt, length,
+                     segment_length=timedelta(
+                         seconds=EEN_EXPORT_SEGMENT_LENGTH),
+                     max_workers=BULK_MAX_WORKERS,
+                     retries=EEN_EXPORT_SEGMENT_RETRIES,
+                     retry_delay=EEN_EXPORT_RETRY_DELAY):
+        """Export a recorded video range into a single FLV file
+
+        The range is split into segments that are downloaded concurrently
+        into part files next to path. Failed segments are retried
+        individually. Once all segments are downloaded, they are joined
+        in order into path and the part files are removed.
+
+        If the export fails, the parts of the completed segments are
+        kept, calling export_video() again with the same arguments only
+        downloads the missing segments.
+
+        Args:
+            path: path of the exported FLV file
+            start_utc_dt: Datetime object in UTC of the range start
+            length: of the range in timedelta
+            segment_length: of the segments in timedelta
+            max_workers: maximum number of concurrent segment downloads
+            retries: retries of a failed segment
+            retry_delay:
+                seconds to wait before the first retry of a segment,
+                grows linearly with every retry
+
+        Raises:
+            CarsonAggregateError:
+                If segments failed after all retries, errors maps the
+                segment start to the raised exception.
+        """
+        segments = self._export_segments(
+            path, start_utc_dt, length, segment_length)
+
+        _, errors = concurrent_map(
+            lambda s: self._download_export_segment(s, retries, retry_delay),
+            segments, max_workers)
+        if errors:
+            raise CarsonAggregateError(
+                OrderedDict((s[1], e) for s, e in errors.items()))
+
+        self._join_export_segments(path, start_utc_dt, segments)
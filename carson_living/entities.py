@@ -4,6 +4,7 @@ import logging
 from abc import ABCMeta, abstractmethod
 
 from carson_living.error import CarsonError
+from carson_living.util import payload_fingerprint
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -19,6 +20,9 @@ class _AbstractEntity(object):
         _entity_payload:
             The payload the the entity draws its internal
             state from.
+        _payload_fingerprint:
+            Fingerprint of the applied _entity_payload, None
+            if it was not applied completely.
 
     """
     __metaclass__ = ABCMeta
@@ -27,6 +31,7 @@ class _AbstractEntity(object):
         self._update_callback = update_callback
         # Note, entity_payload is written in self.update()
         self._entity_payload = None
+        self._payload_fingerprint = None
 
         # update internal representation
         self.update(entity_payload)
@@ -82,11 +87,16 @@ class _AbstractEntity(object):
 
         Updates the entity with a given entity_payload. This payload
         can be passed directly the update function OR if left empty,
-        the entity updates via tha given update_callback
+        the entity updates via tha given update_callback. Payloads that
+        are equal to the current payload are skipped, the internal
+        update is only performed if the payload changed.
 
         Args:
             entity_payload: optional payload to setup the entity
 
+        Returns:
+            True if the payload changed and was applied
+
         Raises:
             CarsonError:
                 If neither a entity_payload or a update_callback
@@ -95,10 +105,7 @@ class _AbstractEntity(object):
         """
         # If there is a entity_payload, use it over the callback.
         if entity_payload:
-            self._entity_payload = entity_payload
-            # Allow child class to perform internal updates
-            self._internal_update()
-            return
+            return self._apply_payload(entity_payload)
 
         if not self._update_callback:
             raise CarsonError(
@@ -109,10 +116,23 @@ class _AbstractEntity(object):
         _LOGGER.info(
             'Trying to updated entity %s from update callback',
             self.unique_entity_id)
-        self._entity_payload = self._update_callback()
-
+        return self._apply_payload(self._update_callback())
+
+    def _apply_payload(self, entity_payload):
+        fingerprint = payload_fingerprint(entity_payload)
+        if fingerprint == self._payload_fingerprint:
+            _LOGGER.debug('Skipping update of unchanged entity %s',
+                          self.unique_entity_id)
+            return False
+
+        self._entity_payload = entity_payload
+        # Only remember the fingerprint once the update succeeded, so
+        # that failed updates are retried with the same payload
+        self._payload_fingerprint = None
         # Allow child class to perform internal updates
         self._internal_update()
+        self._payload_fingerprint = fingerprint
+        return True
 
 
 class _AbstractAPIEntity(_AbstractEntity):
@@ -20,3 +20,25 @@ class CarsonAPIError(CarsonError):
 
 class CarsonAuthenticationError(CarsonAPIError):
     """Carson Living authentication error"""
+
+
+class CarsonAggregateError(CarsonError):
+    """Carson Living error that aggregates errors of concurrent tasks
+
+    Attributes:
+        errors:
+            OrderedDict of task key to the raised exception, in the
+            (deterministic) order the tasks were submitted.
+        diff:
+            UpdateDiff of the entities that were updated by the tasks
+            that succeeded, None if the tasks do not update entities.
+    """
+
+    def __init__(self, errors, diff=None):
+        self.errors = errors
+        self.diff = diff
+        super(CarsonAggregateError, self).__init__(
+            '{} of the concurrent tasks failed: {}'.format(
+                len(errors),
+                '; '.join('{}: {!r}'.format(k, e)
+                          for k, e in errors.items())))
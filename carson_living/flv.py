@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""Minimal FLV container reading and writing
+
+Eagle Eye streams video as FLV: a 9 byte file header followed by a
+sequence of tags (audio, video or script data), each preceded by the
+size of the previous tag. Only the tag framing is handled, the tag
+payloads are passed through untouched.
+"""
+
+import struct
+from collections import namedtuple
+
+from carson_living.error import CarsonError
+
+FLV_SIGNATURE = b'FLV'
+FLV_HEADER_SIZE = 9
+FLV_TAG_HEADER_SIZE = 11
+FLV_PREVIOUS_TAG_SIZE = 4
+
+FLV_TAG_AUDIO = 8
+FLV_TAG_VIDEO = 9
+FLV_TAG_SCRIPT = 18
+
+# pylint: disable=invalid-name
+FlvTag = namedtuple('FlvTag', ['tag_type', 'timestamp', 'data'])
+FlvTag.__doc__ = """Tag of an FLV stream
+
+Attributes:
+    tag_type: 8 (audio), 9 (video) or 18 (script data)
+    timestamp: presentation time in milliseconds
+    data: tag payload
+"""
+
+
+def _read_exactly(file, size):
+    """Read size bytes, fewer only at the end of the stream"""
+    chunks = []
+    while size > 0:
+        chunk = file.read(size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def read_flv_header(file):
+    """Read the FLV file header and the first previous tag size
+
+    Args:
+        file: file-like object positioned at the start of the stream
+
+    Returns:
+        The raw header bytes, ready to be written to a new stream.
+
+    Raises:
+        CarsonError: The stream does not start with an FLV header.
+    """
+    header = _read_exactly(file, FLV_HEADER_SIZE)
+    if len(header) < FLV_HEADER_SIZE or header[:3] != FLV_SIGNATURE:
+        raise CarsonError('Video stream is not in FLV format')
+
+    data_offset = struct.unpack('>I', header[5:9])[0]
+    extra = _read_exactly(
+        file, data_offset - FLV_HEADER_SIZE + FLV_PREVIOUS_TAG_SIZE)
+    return header + extra
+
+
+def iter_flv_tags(file):
+    """Iterate over the tags of an FLV stream
+
+    Reads the stream incrementally, a tag is yielded as soon as it was
+    received completely. A truncated last tag ends the iteration.
+
+    Args:
+        file: file-like object positioned after the FLV header
+
+    Returns:
+        Generator of FlvTag
+    """
+    while True:
+        header = _read_exactly(file, FLV_TAG_HEADER_SIZE)
+        if len(header) < FLV_TAG_HEADER_SIZE:
+            return
+
+        tag_type = ord(header[0:1]) & 0x1f
+        size = struct.unpack('>I', b'\x00' + header[1:4])[0]
+        timestamp = struct.unpack('>I', header[7:8] + header[4:7])[0]
+
+        data = _read_exactly(file, size)
+        trailer = _read_exactly(file, FLV_PREVIOUS_TAG_SIZE)
+        if len(data) < size or len(trailer) < FLV_PREVIOUS_TAG_SIZE:
+            return
+
+        yield FlvTag(tag_type, timestamp, data)
+
+
+def encode_flv_tag(tag):
+    """Encode an FLV tag including its trailing previous tag size
+
+    Args:
+        tag: FlvTag to encode
+
+    Returns:
+        The raw tag bytes.
+    """
+    size = len(tag.data)
+    timestamp = tag.timestamp & 0xffffffff
+    header = struct.pack('>B', tag.tag_type) \
+        + struct.pack('>I', size)[1:] \
+        + struct.pack('>I', timestamp & 0xffffff)[1:] \
+        + struct.pack('>B', timestamp >> 24) \
+        + b'\x00\x00\x00'
+    return header + tag.data \
+        + struct.pack('>I', FLV_TAG_HEADER_SIZE + size)
+
+
+def concat_flv(out_file, segments):
+    """Concatenate FLV streams into a single FLV stream
+
+    The header of the first segment is kept, the tag timestamps of later
+    segments are shifted to continue where the previous segment ended
+    and their script data (metadata) tags are dropped.
+
+    Args:
+        out_file: file-like object the concatenated stream is written to
+        segments:
+            iterable of (file, offset) tuples, offset is the earliest
+            timestamp in ms the first tag of the segment is shifted to
+
+    Raises:
+        CarsonError: A segment is not in FLV format.
+    """
+    next_timestamp = 0
+    for index, (file, offset) in enumerate(segments):
+        header = read_flv_header(file)
+        if index == 0:
+            out_file.write(header)
+
+        shift = None
+        for tag in iter_flv_tags(file):
+            if index > 0 and tag.tag_type == FLV_TAG_SCRIPT:
+                continue
+            if shift is None:
+                shift = max(offset, next_timestamp) - tag.timestamp \
+                    if index > 0 else 0
+            timestamp = tag.timestamp + shift
+            out_file.write(encode_flv_tag(tag._replace(timestamp=timestamp)))
+            next_timestamp = max(next_timestamp, timestamp + 1)
+
+
+# pylint: disable=useless-object-inheritance
+class FlvChunker(object):
+    """Split a byte stream into chunks, optionally on FLV tag boundaries
+
+    Data is fed as it is received and complete chunks are returned. In
+    tag aligned mode, the first chunk is the FLV header and every further
+    chunk consists of complete tags (including their trailing previous
+    tag size). Chunks are cut at the first tag boundary at or after
+    chunk_size bytes, a tag bigger than chunk_size forms its own chunk.
+    Otherwise chunks have exactly chunk_size bytes, except the last one.
+
+    Args:
+        chunk_size: target size of the chunks in bytes
+        align_tags: cut chunks on FLV tag boundaries
+    """
+
+    def __init__(self, chunk_size, align_tags=False):
+        if chunk_size <= 0:
+            raise CarsonError('Chunk size must be positive')
+        self._chunk_size = chunk_size
+        self._align_tags = align_tags
+        self._buffer = bytearray()
+        # end of the last complete tag (or header) in the buffer
+        self._boundary = 0
+        # start of the first unparsed tag (or header) in the buffer
+        self._parsed = 0
+        self._header_done = not align_tags
+
+    def _scan_tags(self):
+        buffer = self._buffer
+        if not self._header_done:
+            if len(buffer) < FLV_HEADER_SIZE:
+                return
+            if bytes(buffer[:3]) != FLV_SIGNATURE:
+                raise CarsonError('Video stream is not in FLV format')
+            end = struct.unpack('>I', bytes(buffer[5:9]))[0] \
+                + FLV_PREVIOUS_TAG_SIZE
+            if len(buffer) < end:
+                return
+            # the header is always a chunk on its own
+            self._header_done = True
+            self._boundary = self._parsed = end
+            return
+
+        while len(buffer) - self._parsed >= FLV_TAG_HEADER_SIZE:
+            size = struct.unpack(
+                '>I', b'\x00' + bytes(buffer[self._parsed + 1:
+                                             self._parsed + 4]))[0]
+            end = self._parsed + FLV_TAG_HEADER_SIZE + size \
+                + FLV_PREVIOUS_TAG_SIZE
+            if len(buffer) < end:
+                return
+            self._boundary = self._parsed = end
+            if self._boundary >= self._chunk_size:
+                return
+
+    def _take(self, size):
+        chunk = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        self._boundary -= size
+        self._parsed -= size
+        return chunk
+
+    def feed(self, data):
+        """Add received data
+
+        Args:
+            data: received bytes
+
+        Returns:
+            list of complete chunks
+
+        Raises:
+            CarsonError: In tag aligned mode, if the stream is not FLV.
+        """
+        self._buffer.extend(data)
+        chunks = []
+        if not self._align_tags:
+            while len(self._buffer) >= self._chunk_size:
+                chunks.append(self._take(self._chunk_size))
+            return chunks
+
+        while True:
+            header_done = self._header_done
+            self._scan_tags()
+            if not header_done and self._header_done:
+                chunks.append(self._take(self._boundary))
+            elif self._boundary >= self._chunk_size:
+                chunks.append(self._take(self._boundary))
+            else:
+                return chunks
+
+    def flush(self):
+        """Signal the end of the stream
+
+        Returns:
+            list of the remaining chunks. In tag aligned mode, an
+            incomplete last tag is discarded.
+        """
+        if self._align_tags:
+            self._scan_tags()
+            size = self._boundary
+        else:
+            size = len(self._buffer)
+
+        chunks = [self._take(size)] if size > 0 else []
+        del self._buffer[:]
+        self._boundary = self._parsed = 0
+        return chunks
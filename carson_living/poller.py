@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""Scheduled polling of live camera snapshots"""
+
+import heapq
+import io
+import logging
+import random
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from carson_living.const import (BULK_MAX_WORKERS,
+                                 EEN_ASSET_CLS_PRE,
+                                 SNAPSHOT_POLL_INTERVAL,
+                                 SNAPSHOT_POLL_JITTER,
+                                 SNAPSHOT_POLL_MAX_BACKOFF)
+from carson_living.error import CarsonError
+
+# 2.7 support fallback
+try:
+    from queue import Full
+except ImportError:
+    from Queue import Full
+
+_LOGGER = logging.getLogger(__name__)
+
+# smoothing factor of the frame rate and lag averages
+_EMA_ALPHA = 0.2
+
+_monotonic = getattr(time, 'monotonic', time.time)
+
+# pylint: disable=invalid-name
+SnapshotFrame = namedtuple('SnapshotFrame',
+                           ['camera_id', 'received_at', 'lag', 'data'])
+SnapshotFrame.__doc__ = """Polled camera snapshot
+
+Attributes:
+    camera_id: Eagle Eye camera id
+    received_at: unix time the image was received
+    lag: seconds between the scheduled poll and the received image
+    data: JPEG image bytes
+"""
+
+SnapshotPollStats = namedtuple(
+    'SnapshotPollStats',
+    ['interval', 'frames', 'errors', 'rate_limited', 'dropped',
+     'frame_rate', 'lag', 'backoff'])
+SnapshotPollStats.__doc__ = """Polling statistics of a camera
+
+Attributes:
+    interval: configured poll interval in seconds
+    frames: number of delivered frames
+    errors: number of failed polls (including rate limited ones)
+    rate_limited: number of polls rejected with 429 Too Many Requests
+    dropped: number of frames dropped because the queue was full
+    frame_rate: achieved frames per second (moving average)
+    lag: seconds between scheduled poll and frame (moving average)
+    backoff: current error backoff in seconds (0 if healthy)
+"""
+
+
+def _retry_after(error):
+    """Status code and Retry-After seconds of a failed poll"""
+    args = getattr(error, 'args', None) or [None]
+    response = getattr(args[0], 'response', None)
+    if response is None:
+        return None, None
+    try:
+        retry_after = float(response.headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        retry_after = None
+    return response.status_code, retry_after
+
+
+def _ema(average, value):
+    if average is None:
+        return value
+    return average + _EMA_ALPHA * (value - average)
+
+
+# pylint: disable=useless-object-inheritance,too-many-instance-attributes
+class _CameraPoll(object):
+    """Schedule and statistics of a polled camera"""
+
+    def __init__(self, camera, interval, jitter, max_backoff):
+        self.camera = camera
+        self.interval = interval
+        self._jitter = jitter
+        self._max_backoff = max_backoff
+        self.due = None
+        self.frames = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.dropped = 0
+        self.consecutive_errors = 0
+        self.backoff = 0
+        self._last_frame = None
+        self._frame_interval = None
+        self._lag = None
+
+    def _jittered(self, delay):
+        return delay * (1 + random.uniform(-self._jitter, self._jitter))
+
+    def schedule_first(self, now):
+        """Spread the first polls of all cameras over the jitter range"""
+        self.due = now + random.uniform(0, self._jitter * self.interval)
+
+    def record_frame(self, now):
+        """Update statistics and schedule the next poll after a frame
+
+        Returns: lag of the frame in seconds
+        """
+        lag = max(now - self.due, 0)
+        self._lag = _ema(self._lag, lag)
+        if self._last_frame is not None:
+            self._frame_interval = _ema(self._frame_interval,
+                                        now - self._last_frame)
+        self._last_frame = now
+        self.frames += 1
+        self.consecutive_errors = 0
+        self.backoff = 0
+
+        # keep the cadence, but skip slots that were missed
+        self.due = max(self.due + self._jittered(self.interval), now)
+        return lag
+
+    def record_error(self, now, error):
+        """Update statistics and back off after a failed poll"""
+        self.errors += 1
+        self.consecutive_errors += 1
+        status, retry_after = _retry_after(error)
+        if status == 429:
+            self.rate_limited += 1
+
+        backoff = min(self.interval * 2 ** self.consecutive_errors,
+                      self._max_backoff)
+        if retry_after is not None:
+            backoff = max(backoff, retry_after)
+        self.backoff = backoff
+        self.due = now + self._jittered(backoff)
+
+    def stats(self):
+        """SnapshotPollStats of the camera"""
+        frame_rate = 0.0
+        if self._frame_interval:
+            frame_rate = 1.0 / self._frame_interval
+        return SnapshotPollStats(
+            self.interval, self.frames, self.errors, self.rate_limited,
+            self.dropped, frame_rate, self._lag or 0.0, self.backoff)
+
+
+class SnapshotPoller(object):
+    """Poll the live images of cameras at per camera intervals
+
+    A scheduler thread starts the poll of a camera once it is due, at
+    most max_workers polls run concurrently. The poll times are jittered
+    by +/- jitter * interval, so that many cameras do not hit the API in
+    lockstep. After a failed poll, the camera backs off exponentially up
+    to max_backoff seconds (or the Retry-After of a 429 response), the
+    other cameras are not affected.
+
+    Frames are delivered to callback and/or put into frame_queue. Frames
+    that do not fit into a full queue are dropped and counted.
+
+    Args:
+        callback:
+            optional callable that receives every SnapshotFrame, it is
+            called from the worker threads.
+        frame_queue: optional queue.Queue that receives every SnapshotFrame
+        interval: default poll interval in seconds
+        max_workers: maximum number of concurrent polls
+        jitter: relative jitter of the poll times
+        max_backoff: maximum seconds to back off after errors
+        asset_class: all, pre, thumb
+    """
+
+    def __init__(self, callback=None, frame_queue=None,
+                 interval=SNAPSHOT_POLL_INTERVAL,
+                 max_workers=BULK_MAX_WORKERS,
+                 jitter=SNAPSHOT_POLL_JITTER,
+                 max_backoff=SNAPSHOT_POLL_MAX_BACKOFF,
+                 asset_class=EEN_ASSET_CLS_PRE):
+        if callback is None and frame_queue is None:
+            raise CarsonError('SnapshotPoller needs a callback or a queue')
+        self._callback = callback
+        self._frame_queue = frame_queue
+        self._interval = interval
+        self._max_workers = max_workers
+        self._jitter = jitter
+        self._max_backoff = max_backoff
+        self._asset_class = asset_class
+        self._polls = {}
+        # ids of the cameras with a poll in flight, tracked per camera id
+        # so that re-added cameras are not polled twice at once
+        self._in_flight = set()
+        self._condition = threading.Condition()
+        self._stopped = True
+        self._thread = None
+        self._executor = None
+
+    def add_camera(self, camera, interval=None):
+        """Add (or reschedule) a camera
+
+        A camera that is re-added while its poll is in flight is polled
+        again once that poll finished.
+
+        Args:
+            camera: EagleEyeCamera to poll
+            interval: poll interval in seconds, default interval if None
+        """
+        poll = _CameraPoll(camera, interval or self._interval,
+                           self._jitter, self._max_backoff)
+        with self._condition:
+            poll.schedule_first(_monotonic())
+            self._polls[camera.entity_id] = poll
+            self._condition.notify()
+
+    def remove_camera(self, camera_id):
+        """Stop polling a camera
+
+        Args:
+            camera_id: Eagle Eye camera id
+        """
+        with self._condition:
+            self._polls.pop(camera_id, None)
+
+    def stats(self):
+        """Polling statistics
+
+        Returns: dict of camera id to SnapshotPollStats
+        """
+        with self._condition:
+            return {k: p.stats() for k, p in self._polls.items()}
+
+    @property
+    def running(self):
+        """True if the poller is running"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start polling in background threads"""
+        if self.running:
+            return
+        self._stopped = False
+        self._executor = ThreadPoolExecutor(max_workers=self._max_workers)
+        self._thread = threading.Thread(target=self._run,
+                                        name='snapshot poller')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop polling and wait for polls in flight
+
+        Args:
+            timeout: seconds to wait for the scheduler thread to finish
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _run(self):
+        with self._condition:
+            while not self._stopped:
+                now = _monotonic()
+                # (due, camera id) of the idle cameras
+                idle = [(p.due, k) for k, p in self._polls.items()
+                        if k not in self._in_flight]
+                heapq.heapify(idle)
+                while idle and idle[0][0] <= now:
+                    _, camera_id = heapq.heappop(idle)
+                    poll = self._polls[camera_id]
+                    self._in_flight.add(camera_id)
+                    self._executor.submit(self._poll, camera_id, poll)
+
+                timeout = idle[0][0] - now if idle else None
+                self._condition.wait(timeout)
+
+    def _poll(self, camera_id, poll):
+        buffer = io.BytesIO()
+        try:
+            poll.camera.get_image(buffer, asset_class=self._asset_class)
+        except Exception as error:  # pylint: disable=broad-except
+            with self._condition:
+                poll.record_error(_monotonic(), error)
+                self._in_flight.discard(camera_id)
+                self._condition.notify()
+            _LOGGER.warning(
+                'Polling camera %s failed, backing off %.1fs: %s',
+                camera_id, poll.backoff, error)
+            return
+
+        with self._condition:
+            lag = poll.record_frame(_monotonic())
+            self._in_flight.discard(camera_id)
+            self._condition.notify()
+
+        self._deliver(poll, SnapshotFrame(
+            camera_id, time.time(), lag, buffer.getvalue()))
+
+    def _deliver(self, poll, frame):
+        if self._frame_queue is not None:
+            try:
+                self._frame_queue.put_nowait(frame)
+            except Full:
+                with self._condition:
+                    poll.dropped += 1
+
+        if self._callback is not None:
+            try:
+                self._callback(frame)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.warning('Snapshot callback failed for camera %s',
+                                frame.camera_id, exc_info=True)
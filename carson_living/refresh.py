@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""Refresh policies with independent intervals per entity type"""
+
+import logging
+import time
+from collections import OrderedDict, namedtuple
+
+from carson_living.const import (REFRESH_BUILDINGS_INTERVAL,
+                                 REFRESH_CAMERA_LISTS_INTERVAL,
+                                 REFRESH_CAMERAS_INTERVAL,
+                                 REFRESH_DOORS_INTERVAL,
+                                 REFRESH_SESSIONS_INTERVAL,
+                                 REFRESH_USER_INTERVAL)
+from carson_living.error import (CarsonAggregateError,
+                                 CarsonError)
+from carson_living.renewal import RenewalThread
+from carson_living.util import (changed_payload_fields,
+                                UpdateDiff)
+
+_LOGGER = logging.getLogger(__name__)
+
+_monotonic = getattr(time, 'monotonic', time.time)
+
+# parts of the entity tree that are refreshed via /me/
+_ME_PARTS = ('user', 'buildings', 'doors')
+_BUILDING_PARTS = ('camera_lists', 'sessions')
+
+
+class RefreshPolicy(namedtuple('RefreshPolicy',
+                               ['user', 'buildings', 'doors',
+                                'camera_lists', 'cameras', 'sessions'])):
+    """Refresh intervals per entity type in seconds
+
+    None disables the refresh of an entity type.
+
+    Attributes:
+        user: interval of the user payload
+        buildings:
+            interval of the building payloads, buildings whose payload
+            changed also refresh their doors and camera lists
+        doors: interval of the door payloads
+        camera_lists: interval of the Eagle Eye device lists
+        cameras: interval of the payload of every single camera
+        sessions: interval of the Eagle Eye session keys
+    """
+    __slots__ = ()
+
+    def __new__(cls, user=REFRESH_USER_INTERVAL,
+                buildings=REFRESH_BUILDINGS_INTERVAL,
+                doors=REFRESH_DOORS_INTERVAL,
+                camera_lists=REFRESH_CAMERA_LISTS_INTERVAL,
+                cameras=REFRESH_CAMERAS_INTERVAL,
+                sessions=REFRESH_SESSIONS_INTERVAL):
+        return super(RefreshPolicy, cls).__new__(
+            cls, user, buildings, doors, camera_lists, cameras, sessions)
+
+
+# pylint: disable=useless-object-inheritance
+class RefreshScheduler(object):
+    """Refresh only the stale parts of a Carson account
+
+    Every tick() refreshes the entity types whose interval elapsed
+    since their last refresh. User, buildings and doors share a single
+    /me/ query. Cameras are tracked individually, new cameras count as
+    fresh since the tick before their discovery. Parts that fail are
+    retried on the next tick, the other parts are refreshed nevertheless.
+
+    Camera lists, sessions and cameras are only refreshed for buildings
+    whose cameras were discovered already, lazy buildings (see
+    lazy_cameras) are not forced to discover them.
+
+    Creating the scheduler counts as refresh of all parts, since the
+    account was updated during initialization.
+
+    Args:
+        carson: Carson API object
+        policy: RefreshPolicy, RefreshPolicy() defaults if None
+        callback: optional callable that receives non-empty diffs of
+            background ticks
+
+    Attributes:
+        ticks: number of ticks
+    """
+
+    def __init__(self, carson, policy=None, callback=None):
+        self._carson = carson
+        self._policy = policy or RefreshPolicy()
+        self._callback = callback
+        if all(i is None for i in self._policy):
+            raise CarsonError('RefreshPolicy disables all refreshes')
+
+        now = _monotonic()
+        self._last = {part: now for part in self._policy._fields}
+        self._camera_last = {}
+        self._renewal = None
+        self.ticks = 0
+
+    @property
+    def policy(self):
+        """The RefreshPolicy of the scheduler"""
+        return self._policy
+
+    def _due(self, part, now):
+        interval = getattr(self._policy, part)
+        return interval is not None and now - self._last[part] >= interval
+
+    def _loaded_buildings(self):
+        return [b for b in self._carson.buildings if b.cameras_loaded]
+
+    def _cameras(self):
+        return OrderedDict(
+            (c.unique_entity_id, c)
+            for b in self._loaded_buildings() for c in b.cameras)
+
+    def next_delay(self):
+        """Seconds until the next part is due
+
+        Returns: seconds, 0 if a part is due already
+
+        """
+        now = _monotonic()
+        due = [self._last[part] + getattr(self._policy, part)
+               for part in self._policy._fields
+               if part != 'cameras' and getattr(self._policy, part)
+               is not None]
+        if self._policy.cameras is not None:
+            due.extend(last + self._policy.cameras
+                       for last in self._camera_last.values())
+            if not self._camera_last:
+                due.append(self._last['cameras'] + self._policy.cameras)
+        return max(min(due) - now, 0)
+
+    def tick(self):
+        """Refresh all stale parts
+
+        Returns:
+            UpdateDiff of the refreshed entities
+
+        Raises:
+            CarsonAggregateError:
+                If parts failed to refresh, keyed by 'me', (part name,
+                building unique entity id), 'cameras' or camera unique
+                entity id.
+                All other parts were refreshed, their UpdateDiff is the
+                diff attribute of the error.
+
+        """
+        now = _monotonic()
+        self.ticks += 1
+        diff = UpdateDiff()
+        errors = OrderedDict()
+
+        me_parts = [p for p in _ME_PARTS if self._due(p, now)]
+        if me_parts:
+            _LOGGER.debug('Refreshing %s', ', '.join(me_parts))
+            try:
+                diff = diff.merge(self._carson.update(
+                    user='user' in me_parts,
+                    buildings='buildings' in me_parts,
+                    doors='doors' in me_parts))
+                for part in me_parts:
+                    self._last[part] = now
+                # building payloads include their doors
+                if 'buildings' in me_parts:
+                    self._last['doors'] = now
+            except Exception as error:  # pylint: disable=broad-except
+                if getattr(error, 'diff', None):
+                    diff = diff.merge(error.diff)
+                errors['me'] = error
+
+        for part in _BUILDING_PARTS:
+            if not self._due(part, now):
+                continue
+            _LOGGER.debug('Refreshing %s', part)
+            part_errors = len(errors)
+            diff = diff.merge(self._refresh_buildings(part, errors))
+            # failing buildings keep the part due
+            if len(errors) == part_errors:
+                self._last[part] = now
+
+        if self._policy.cameras is not None:
+            diff = diff.merge(self._refresh_cameras(now, errors))
+
+        if errors:
+            raise CarsonAggregateError(errors, diff)
+        return diff
+
+    def _refresh_buildings(self, part, errors):
+        diff = UpdateDiff()
+        for building in self._loaded_buildings():
+            try:
+                if part == 'camera_lists':
+                    diff = diff.merge(building.update_cameras())
+                else:
+                    building.eagleeye_api.update_session_auth_key()
+            except Exception as error:  # pylint: disable=broad-except
+                errors[(part, building.unique_entity_id)] = error
+        return diff
+
+    def _refresh_cameras(self, now, errors):
+        diff = UpdateDiff()
+        try:
+            cameras = self._cameras()
+        except Exception as error:  # pylint: disable=broad-except
+            errors['cameras'] = error
+            return diff
+        # forget removed cameras, new cameras count as fresh since the
+        # last tick (or the creation of the scheduler)
+        self._camera_last = {
+            k: self._camera_last.get(k, self._last['cameras'])
+            for k in cameras}
+        self._last['cameras'] = now
+
+        for key, camera in cameras.items():
+            if now - self._camera_last[key] < self._policy.cameras:
+                continue
+            old_payload = camera.entity_payload
+            try:
+                if camera.update():
+                    diff.changed[key] = changed_payload_fields(
+                        old_payload, camera.entity_payload)
+                self._camera_last[key] = now
+            except Exception as error:  # pylint: disable=broad-except
+                errors[key] = error
+        return diff
+
+    def _background_tick(self):
+        try:
+            diff = self.tick()
+        except CarsonAggregateError as error:
+            # report the refreshed parts, the failed ones are logged
+            if error.diff and self._callback is not None:
+                self._callback(error.diff)
+            raise
+        if diff and self._callback is not None:
+            self._callback(diff)
+
+    @property
+    def running(self):
+        """True if the background refresh is running"""
+        return self._renewal is not None and self._renewal.running
+
+    def start(self):
+        """Tick in a background thread whenever a part is due
+
+        Failed ticks are logged and retried, see RenewalThread.
+
+        Returns:
+            The started RenewalThread
+        """
+        self.stop()
+        self._renewal = RenewalThread(self._background_tick,
+                                      self.next_delay,
+                                      'Carson refresh')
+        self._renewal.start()
+        return self._renewal
+
+    def stop(self, timeout=None):
+        """Stop the background refresh, if it is running
+
+        Args:
+            timeout: seconds to wait for the thread to finish
+        """
+        if self._renewal is not None:
+            self._renewal.stop(timeout)
+            self._renewal = None
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Background renewal of authentication credentials"""
+
+import logging
+import threading
+
+from carson_living.const import (RENEWAL_MIN_INTERVAL,
+                                 RENEWAL_RETRY_INTERVAL)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+# pylint: disable=useless-object-inheritance
+class RenewalThread(object):
+    """Daemon thread that renews credentials ahead of their expiry
+
+    The thread waits next_delay() seconds, calls renew() and starts
+    over. Failed renewals are logged and retried after retry_interval
+    seconds, so a temporary outage does not stop the renewal.
+
+    Args:
+        renew: callable without arguments that renews the credentials
+        next_delay: callable that returns the seconds until the next
+            renewal is due
+        name: name of the thread (used for logging)
+        retry_interval: seconds to wait after a failed renewal
+        min_interval: minimum seconds between two successful renewals
+
+    Attributes:
+        renewals: number of successful renewals
+        failures: number of failed renewals
+    """
+
+    def __init__(self, renew, next_delay, name,
+                 retry_interval=RENEWAL_RETRY_INTERVAL,
+                 min_interval=RENEWAL_MIN_INTERVAL):
+        self._renew = renew
+        self._next_delay = next_delay
+        self._name = name
+        self._retry_interval = retry_interval
+        self._min_interval = min_interval
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self.renewals = 0
+        self.failures = 0
+
+    @property
+    def running(self):
+        """True if the renewal thread is running"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the renewal thread"""
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=self._name)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop the renewal thread
+
+        Args:
+            timeout: seconds to wait for the thread to finish
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        delay = self._next_delay()
+        while not self._stop_event.wait(max(delay, 0)):
+            try:
+                self._renew()
+                self.renewals += 1
+                delay = max(self._next_delay(), self._min_interval)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.warning('%s failed, retrying in %ss',
+                                self._name, self._retry_interval,
+                                exc_info=True)
+                self.failures += 1
+                delay = self._retry_interval
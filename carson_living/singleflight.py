@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Single-flight deduplication of concurrent identical calls"""
+
+import threading
+
+
+# pylint: disable=useless-object-inheritance,too-few-public-methods
+class _Call(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """Deduplicate concurrent calls with identical keys
+
+    While a call for a key is in flight, further calls with the same key
+    do not execute their function, but wait for the in-flight call and
+    receive its result (or exception). Note, all waiters receive the
+    very same result object.
+
+    Attributes:
+        executed: number of calls that were executed
+        coalesced: number of calls that were served by an in-flight call
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, func):
+        """Execute func, unless a call with key is already in flight
+
+        Args:
+            key: hashable key that identifies identical calls
+            func: callable without arguments
+
+        Returns:
+            The return value of func (or of the in-flight call).
+
+        Raises:
+            Any exception raised by func (or the in-flight call).
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    def stats(self):
+        """Single-flight statistics
+
+        Returns:
+            dict with keys executed and coalesced
+
+        """
+        with self._lock:
+            return {
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+            }
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""Credential stores that keep tokens and sessions across restarts"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from carson_living.util import replace_file
+
+_LOGGER = logging.getLogger(__name__)
+
+_TOKEN = 'token'
+_EAGLEEYE_SESSIONS = 'eagleeye_sessions'
+
+
+# pylint: disable=useless-object-inheritance
+class CredentialStore(object):
+    """In-memory store for the Carson token and Eagle Eye sessions
+
+    Base class of persistent credential stores. Subclasses persist the
+    credentials by overriding _load() and _save(). A store holds the
+    credentials of a single Carson account, the Eagle Eye sessions are
+    kept per building.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = None
+
+    def _load(self):
+        """Load the persisted credentials
+
+        Returns: credential dict
+        """
+        return {}
+
+    def _save(self, data):
+        """Persist the credentials
+
+        Args:
+            data: credential dict
+        """
+
+    def _loaded_data(self):
+        if self._data is None:
+            self._data = self._load()
+        return self._data
+
+    def load_token(self):
+        """Stored Carson JWT token
+
+        Returns: The token or None if no token is stored.
+        """
+        with self._lock:
+            return self._loaded_data().get(_TOKEN)
+
+    def save_token(self, token):
+        """Store the Carson JWT token
+
+        Args:
+            token: JWT token
+        """
+        with self._lock:
+            data = self._loaded_data()
+            if data.get(_TOKEN) == token:
+                return
+            data[_TOKEN] = token
+            self._save(data)
+
+    def load_eagleeye_session(self, building_id):
+        """Stored Eagle Eye session of a building
+
+        Args:
+            building_id: The building id of the Carson property
+
+        Returns:
+            (auth_key, brand_subdomain) tuple or None if no session
+            is stored.
+        """
+        with self._lock:
+            session = self._loaded_data().get(
+                _EAGLEEYE_SESSIONS, {}).get(str(building_id))
+        if not session:
+            return None
+        return session['auth_key'], session['brand_subdomain']
+
+    def save_eagleeye_session(self, building_id, auth_key,
+                              brand_subdomain):
+        """Store the Eagle Eye session of a building
+
+        Args:
+            building_id: The building id of the Carson property
+            auth_key: Eagle Eye session auth key
+            brand_subdomain: Eagle Eye brand subdomain
+        """
+        session = {
+            'auth_key': auth_key,
+            'brand_subdomain': brand_subdomain,
+        }
+        with self._lock:
+            sessions = self._loaded_data().setdefault(_EAGLEEYE_SESSIONS, {})
+            if sessions.get(str(building_id)) == session:
+                return
+            sessions[str(building_id)] = session
+            self._save(self._data)
+
+
+class FileCredentialStore(CredentialStore):
+    """Credential store that persists to a JSON file
+
+    The file is replaced atomically on every change, so a crash never
+    leaves a partially written file behind. It is created with owner
+    only permissions, since it contains secrets. Failing writes are
+    logged, but do not interrupt the API.
+
+    Args:
+        path: path of the JSON file
+    """
+
+    def __init__(self, path):
+        self._path = path
+        super(FileCredentialStore, self).__init__()
+
+    @property
+    def path(self):
+        """Path of the JSON file"""
+        return self._path
+
+    def _load(self):
+        try:
+            with open(self._path) as file:
+                data = json.load(file)
+        except (IOError, OSError):
+            return {}
+        except ValueError:
+            _LOGGER.warning('Ignoring invalid credential store %s',
+                            self._path)
+            return {}
+
+        return data if isinstance(data, dict) else {}
+
+    def _save(self, data):
+        directory = os.path.dirname(os.path.abspath(self._path))
+        try:
+            handle, tmp_path = tempfile.mkstemp(
+                prefix='.' + os.path.basename(self._path) + '.',
+                dir=directory)
+        except (IOError, OSError):
+            _LOGGER.warning('Cannot write credential store %s',
+                            self._path, exc_info=True)
+            return
+
+        try:
+            with os.fdopen(handle, 'w') as file:
+                json.dump(data, file)
+                file.flush()
+                os.fsync(file.fileno())
+            replace_file(tmp_path, self._path)
+        except (IOError, OSError):
+            _LOGGER.warning('Cannot write credential store %s',
+                            self._path, exc_info=True)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
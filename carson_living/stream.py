@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""Chunked streaming of Eagle Eye videos"""
+
+from carson_living.flv import FlvChunker
+
+
+# pylint: disable=useless-object-inheritance
+class VideoStream(object):
+    """Iterator over the chunks of a streaming video response
+
+    The response is read on demand: a chunk is only received once the
+    consumer asks for it, so a slow consumer slows down the transfer
+    instead of buffering the video in memory. Closing the stream (or
+    leaving its context) before the end cancels the transfer and releases
+    the connection. The stream closes itself after the last chunk.
+
+    Args:
+        response: streaming requests response
+        chunk_size: target size of the chunks in bytes
+        align_tags: cut chunks on FLV tag boundaries, see FlvChunker
+
+    Attributes:
+        bytes_received: number of bytes yielded so far
+        chunks_received: number of chunks yielded so far
+    """
+
+    def __init__(self, response, chunk_size, align_tags=False):
+        self._response = response
+        self._chunk_size = chunk_size
+        self._chunker = FlvChunker(chunk_size, align_tags)
+        self._chunks = self._iter_chunks()
+        self._closed = False
+        self.bytes_received = 0
+        self.chunks_received = 0
+
+    def _iter_chunks(self):
+        try:
+            for data in self._response.iter_content(self._chunk_size):
+                for chunk in self._chunker.feed(data):
+                    yield chunk
+            for chunk in self._chunker.flush():
+                yield chunk
+        finally:
+            self.close()
+
+    @property
+    def closed(self):
+        """True once the stream ended or was closed"""
+        return self._closed
+
+    def close(self):
+        """Cancel the stream and release the connection"""
+        if not self._closed:
+            self._closed = True
+            self._response.close()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._closed:
+            raise StopIteration
+        chunk = next(self._chunks)
+        self.bytes_received += len(chunk)
+        self.chunks_received += 1
+        return chunk
+
+    next = __next__  # Python 2
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
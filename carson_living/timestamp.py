@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""Fast conversion of Eagle Eye (EEN) timestamps
+
+EEN timestamps are UTC strings with millisecond resolution in the format
+YYYYMMDDhhmmss.xxx (e.g. 20200131230103.123). The functions avoid
+strftime / strptime and the batch functions format or parse the date
+part only once per day, so bulk timeline and asset list work is not
+dominated by datetime overhead.
+
+Note, no timezone conversion is performed, datetime objects are expected
+(and returned) as naive datetimes in UTC.
+"""
+
+import calendar
+from datetime import datetime, timedelta
+
+from carson_living.error import CarsonError
+
+_EPOCH = datetime(1970, 1, 1)
+_MS_PER_DAY = 24 * 60 * 60 * 1000
+_EEN_TIMESTAMP_LENGTH = 18
+
+
+def format_een_timestamp(utc_dt):
+    """Format a datetime as EEN timestamp
+
+    Args:
+        utc_dt: Datetime object in UTC
+
+    Returns: EEN timestamp string, microseconds are truncated.
+
+    """
+    return '%04d%02d%02d%02d%02d%02d.%03d' % (
+        utc_dt.year, utc_dt.month, utc_dt.day,
+        utc_dt.hour, utc_dt.minute, utc_dt.second,
+        utc_dt.microsecond // 1000)
+
+
+def _invalid_een_timestamp(timestamp):
+    return CarsonError('Invalid EEN timestamp {}'.format(timestamp))
+
+
+def _split_een_time(timestamp):
+    if len(timestamp) != _EEN_TIMESTAMP_LENGTH or timestamp[14] != '.':
+        raise _invalid_een_timestamp(timestamp)
+    try:
+        hour, minute, second, milli = (
+            int(timestamp[8:10]), int(timestamp[10:12]),
+            int(timestamp[12:14]), int(timestamp[15:18]))
+    except ValueError:
+        raise _invalid_een_timestamp(timestamp)
+    # same ranges as datetime, e.g. no leap seconds
+    if not (0 <= hour < 24 and 0 <= minute < 60 and 0 <= second < 60
+            and 0 <= milli < 1000):
+        raise _invalid_een_timestamp(timestamp)
+    return hour, minute, second, milli
+
+
+def _split_een_timestamp(timestamp):
+    hour, minute, second, milli = _split_een_time(timestamp)
+    try:
+        year, month, day = (int(timestamp[0:4]), int(timestamp[4:6]),
+                            int(timestamp[6:8]))
+    except ValueError:
+        raise _invalid_een_timestamp(timestamp)
+    # calendar.timegm would silently roll e.g. Feb 31 over to March
+    if not (1 <= year and 1 <= month <= 12
+            and 1 <= day <= calendar.monthrange(year, month)[1]):
+        raise _invalid_een_timestamp(timestamp)
+    return year, month, day, hour, minute, second, milli
+
+
+def parse_een_timestamp(timestamp):
+    """Parse an EEN timestamp into a datetime
+
+    Args:
+        timestamp: EEN timestamp string
+
+    Returns: Datetime object in UTC
+
+    Raises:
+        CarsonError: timestamp is not a valid EEN timestamp.
+
+    """
+    year, month, day, hour, minute, second, milli = \
+        _split_een_timestamp(timestamp)
+    return datetime(year, month, day, hour, minute, second, milli * 1000)
+
+
+def utc_to_millis(utc_dt):
+    """Convert a datetime to milliseconds since epoch
+
+    Args:
+        utc_dt: Datetime object in UTC
+
+    Returns: Milliseconds since epoch, microseconds are truncated.
+
+    """
+    return calendar.timegm(utc_dt.timetuple()) * 1000 \
+        + utc_dt.microsecond // 1000
+
+
+def millis_to_utc(millis):
+    """Convert milliseconds since epoch to a datetime
+
+    Args:
+        millis: Milliseconds since epoch
+
+    Returns: Datetime object in UTC
+
+    """
+    return _EPOCH + timedelta(milliseconds=millis)
+
+
+def een_timestamp_to_millis(timestamp):
+    """Convert an EEN timestamp to milliseconds since epoch
+
+    Args:
+        timestamp: EEN timestamp string
+
+    Returns: Milliseconds since epoch
+
+    Raises:
+        CarsonError: timestamp is not a valid EEN timestamp.
+
+    """
+    year, month, day, hour, minute, second, milli = \
+        _split_een_timestamp(timestamp)
+    return calendar.timegm(
+        (year, month, day, hour, minute, second)) * 1000 + milli
+
+
+def millis_to_een_timestamp(millis):
+    """Convert milliseconds since epoch to an EEN timestamp
+
+    Args:
+        millis: Milliseconds since epoch
+
+    Returns: EEN timestamp string
+
+    """
+    return millis_to_een_timestamps([millis])[0]
+
+
+def millis_to_een_timestamps(millis_list):
+    """Convert many epoch milliseconds to EEN timestamps
+
+    The date part is formatted once per day, which makes the conversion
+    of (sorted) timelines considerably faster than per value formatting.
+
+    Args:
+        millis_list: iterable of milliseconds since epoch
+
+    Returns: list of EEN timestamp strings
+
+    """
+    timestamps = []
+    append = timestamps.append
+    day_start = day_end = None
+    date_prefix = None
+    for millis in millis_list:
+        if day_start is None or not day_start <= millis < day_end:
+            day_start = millis - millis % _MS_PER_DAY
+            day_end = day_start + _MS_PER_DAY
+            date = _EPOCH + timedelta(milliseconds=day_start)
+            date_prefix = '%04d%02d%02d' % (date.year, date.month,
+                                            date.day)
+        rest = millis - day_start
+        hour, rest = divmod(rest, 3600000)
+        minute, rest = divmod(rest, 60000)
+        second, milli = divmod(rest, 1000)
+        append('%s%02d%02d%02d.%03d' % (date_prefix, hour, minute,
+                                        second, milli))
+    return timestamps
+
+
+def een_timestamps_to_millis(timestamps):
+    """Convert many EEN timestamps to epoch milliseconds
+
+    The date part is converted once per day.
+
+    Args:
+        timestamps: iterable of EEN timestamp strings
+
+    Returns: list of milliseconds since epoch
+
+    Raises:
+        CarsonError: a timestamp is not a valid EEN timestamp.
+
+    """
+    millis_list = []
+    append = millis_list.append
+    day_millis = {}
+    for timestamp in timestamps:
+        date = timestamp[:8]
+        day_start = day_millis.get(date)
+        if day_start is None:
+            day_start = een_timestamp_to_millis(date + '000000.000')
+            day_millis[date] = day_start
+        hour, minute, second, milli = _split_een_time(timestamp)
+        append(day_start + hour * 3600000 + minute * 60000
+               + second * 1000 + milli)
+    return millis_list
@@ -1,11 +1,22 @@
 # -*- coding: utf-8 -*-
 """Collection of util functions"""
 
+import hashlib
+import json
+import os
 import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
 
 from carson_living.error import (CarsonAPIError,
+                                 CarsonAggregateError,
                                  CarsonCommunicationError)
-from carson_living.const import CARSON_RESPONSE
+from carson_living.const import (CARSON_RESPONSE,
+                                 HTTP_POOL_CONNECTIONS,
+                                 HTTP_POOL_MAXSIZE)
 
 
 def default_carson_response_handler(response):
@@ -25,27 +36,257 @@ def default_carson_response_handler(response):
     """
     try:
         r_json = response.json()
-        if not all(k in r_json for k in CARSON_RESPONSE.values()):
-            raise CarsonCommunicationError(
-                'Carson API response does not contain all expected keys')
-
-        if r_json.get(CARSON_RESPONSE['CODE']) != 0:
-            raise CarsonAPIError(
-                # pylint: disable=too-many-format-args
-                'Carson API error returned unsuccessful state. '
-                'Status: {}, Message: {}'.format(
-                    r_json.get(CARSON_RESPONSE['STATUS'], '<no status>'),
-                    r_json.get(CARSON_RESPONSE['MSG']), '<no msg>')
-                )
     except ValueError:
         raise CarsonCommunicationError(
             'Unable to handle response payload for {} to {}'.format(
                 response.request.method, response.url))
 
+    return unwrap_carson_response(r_json)
+
+
+def unwrap_carson_response(r_json):
+    """Validate and unwrap a decoded Carson API response
+
+    Shared by the synchronous and asynchronous response handlers.
+
+    Args:
+        r_json: The decoded json body of a Carson API response.
+
+    Returns:
+        The unwrapped data dict of the Carson Living response.
+
+    Raises:
+        CarsonCommunicationError: Response is not in the expected format.
+        CarsonAPIError: Response indicated an client-side API
+            error.
+    """
+    if not isinstance(r_json, dict) \
+            or not all(k in r_json for k in CARSON_RESPONSE.values()):
+        raise CarsonCommunicationError(
+            'Carson API response does not contain all expected keys')
+
+    if r_json.get(CARSON_RESPONSE['CODE']) != 0:
+        raise CarsonAPIError(
+            # pylint: disable=too-many-format-args
+            'Carson API error returned unsuccessful state. '
+            'Status: {}, Message: {}'.format(
+                r_json.get(CARSON_RESPONSE['STATUS'], '<no status>'),
+                r_json.get(CARSON_RESPONSE['MSG']), '<no msg>')
+            )
+
     return r_json.get(CARSON_RESPONSE['DATA'])
 
 
-def update_dictionary(current_dict, update_dict, constructor):
+def create_http_session(pool_connections=HTTP_POOL_CONNECTIONS,
+                        pool_maxsize=HTTP_POOL_MAXSIZE,
+                        pool_block=False,
+                        host_pool_maxsize=None):
+    """Create a keep-alive, connection pooled HTTP session
+
+    All API classes of this library accept a requests session. Sharing
+    a single session between them allows TCP/TLS connections to be
+    reused across Carson Living and Eagle Eye queries.
+
+    Args:
+        pool_connections: number of host pools to cache
+        pool_maxsize: number of connections to keep alive per host
+        pool_block: block if no free connection is available in the pool
+        host_pool_maxsize:
+            optional dict of url prefix (e.g. 'https://api.carson.live')
+            to pool_maxsize, to configure dedicated per-host pool sizes
+
+    Returns:
+        A configured requests.Session object.
+
+    """
+    session = requests.Session()
+
+    adapter = HTTPAdapter(pool_connections=pool_connections,
+                          pool_maxsize=pool_maxsize,
+                          pool_block=pool_block)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    for prefix, maxsize in (host_pool_maxsize or {}).items():
+        session.mount(prefix, HTTPAdapter(pool_connections=1,
+                                          pool_maxsize=maxsize,
+                                          pool_block=pool_block))
+
+    return session
+
+
+def concurrent_map(func, keys, max_workers=None):
+    """Call func(key) for all keys in a bounded thread pool
+
+    Exceptions of individual calls do not abort the remaining calls, but
+    are collected and returned. Both results and errors are ordered
+    by keys, independent of the completion order.
+
+    Args:
+        func: callable that is executed with every key
+        keys: iterable of keys
+        max_workers:
+            maximum number of concurrent calls, None or 1 executes
+            all calls serially in the calling thread.
+
+    Returns:
+        (tuple): tuple containing:
+
+            results(OrderedDict): key to return value of successful calls
+            errors(OrderedDict): key to raised exception of failed calls
+    """
+    keys = list(keys)
+
+    def _call(key):
+        try:
+            return True, func(key)
+        except Exception as error:  # pylint: disable=broad-except
+            return False, error
+
+    if not max_workers or max_workers <= 1 or len(keys) <= 1:
+        outcomes = [_call(k) for k in keys]
+    else:
+        with ThreadPoolExecutor(
+                max_workers=min(max_workers, len(keys))) as executor:
+            outcomes = list(executor.map(_call, keys))
+
+    results = OrderedDict()
+    errors = OrderedDict()
+    for key, (success, value) in zip(keys, outcomes):
+        if success:
+            results[key] = value
+        else:
+            errors[key] = value
+
+    return results, errors
+
+
+class UpdateDiff(namedtuple('UpdateDiff', ['added', 'removed', 'changed'])):
+    """Entities that changed during an update
+
+    Unchanged entities are not listed. A diff is falsy if nothing changed.
+
+    Attributes:
+        added: list of unique entity ids of new entities
+        removed: list of unique entity ids of removed entities
+        changed:
+            OrderedDict of unique entity id to the sorted tuple of
+            top level payload fields that changed
+    """
+    __slots__ = ()
+
+    def __new__(cls, added=None, removed=None, changed=None):
+        return super(UpdateDiff, cls).__new__(
+            cls, list(added or []), list(removed or []),
+            OrderedDict(changed or {}))
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    __nonzero__ = __bool__  # Python 2
+
+    def merge(self, other):
+        """Combine two diffs
+
+        Args:
+            other: UpdateDiff to add to this one
+
+        Returns: new UpdateDiff with the entities of both diffs
+
+        """
+        changed = OrderedDict(self.changed)
+        for key, fields in other.changed.items():
+            changed[key] = tuple(sorted(set(changed.get(key, ()))
+                                        | set(fields)))
+        return UpdateDiff(self.added + other.added,
+                          self.removed + other.removed,
+                          changed)
+
+
+def payload_fingerprint(payload):
+    """Fingerprint of a decoded JSON payload
+
+    Equal payloads have equal fingerprints, independent of their key
+    order.
+
+    Args:
+        payload: JSON compatible payload
+
+    Returns: hex digest of the canonical JSON encoding
+
+    """
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'),
+                         default=repr)
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+
+def changed_payload_fields(old_payload, new_payload):
+    """Top level fields that differ between two entity payloads
+
+    Args:
+        old_payload: previous entity payload
+        new_payload: current entity payload
+
+    Returns:
+        sorted tuple of added, removed and changed field names, empty
+        if the payloads are not dicts
+
+    """
+    if not isinstance(old_payload, dict) \
+            or not isinstance(new_payload, dict):
+        return ()
+    missing = object()
+    return tuple(sorted(
+        k for k in set(old_payload) | set(new_payload)
+        if old_payload.get(k, missing) != new_payload.get(k, missing)))
+
+
+def update_entity(entity, entity_payload, constructor):
+    """Update an entity, or construct it if it does not exist yet
+
+    Args:
+        entity: the existing entity or None
+        entity_payload: the latest payload of the entity
+        constructor: Constructor function to generate entity with payload
+
+    Returns:
+        (tuple): tuple containing:
+
+            entity: the updated or constructed entity
+            diff(UpdateDiff): the entity if it was added or changed
+
+    """
+    if entity is None:
+        entity = constructor(entity_payload)
+        return entity, UpdateDiff(added=[entity.unique_entity_id])
+
+    old_payload = entity.entity_payload
+    if not entity.update(entity_payload):
+        return entity, UpdateDiff()
+    return entity, UpdateDiff(changed={
+        entity.unique_entity_id:
+            changed_payload_fields(old_payload, entity_payload)})
+
+
+def attach_update_diff(error, diff):
+    """Attach the UpdateDiff of the applied entities to an error
+
+    Entities that were applied before an update failed are skipped as
+    unchanged by the next update, the diff keeps their changes
+    available to the caller.
+
+    Args:
+        error: the raised exception
+        diff:
+            UpdateDiff to put in front of the diff that is already
+            attached to the error, if any
+
+    """
+    error.diff = diff.merge(getattr(error, 'diff', None) or UpdateDiff())
+
+
+def update_dictionary(current_dict, update_dict, constructor,
+                      max_workers=None):
     """Update current_dict to update_dict without reconstructing existing
 
     update_dictionary updates the dict current_dict to resemble update_dict
@@ -56,27 +297,68 @@ def update_dictionary(current_dict, update_dict, constructor):
            (via constructor(update_dict['new'])
         3. update values (via current_dict[i].update(update_dict['changed']))
 
+    Entities skip updates with an unchanged payload (see
+    _AbstractEntity.update), those are not part of the returned diff.
+
     Args:
         current_dict: The dict to update with entities
         update_dict: The latest dict with update payloads
         constructor: Constructor funtion to generate entity with payload
+        max_workers:
+            optional number of threads to add and update entities
+            concurrently. Failing entities do not abort the others,
+            but are raised as one CarsonAggregateError after all
+            other entities were applied.
+
+    Returns:
+        UpdateDiff of the added, removed and changed entities
+
+    Raises:
+        CarsonAggregateError:
+            If adding or updating entities failed in concurrent mode.
+        Exception:
+            Serially, the exception of the first failing entity is
+            propagated as is. In both modes the UpdateDiff of the
+            entities that were applied is attached to the error as
+            diff attribute.
 
     """
+    diff = UpdateDiff()
 
-    existing_keys = set(current_dict.keys())
-    update_keys = set(update_dict.keys())
+    # Remove
+    for i in [k for k in current_dict if k not in update_dict]:
+        diff.removed.append(current_dict.pop(i).unique_entity_id)
 
-    # Update
-    for i in existing_keys.intersection(update_keys):
-        current_dict[i].update(update_dict[i])
+    def _apply(key):
+        return update_entity(current_dict.get(key), update_dict[key],
+                             constructor)
 
-    # Add
-    for i in update_keys.difference(existing_keys):
-        current_dict[i] = constructor(update_dict[i])
+    def _record(key, entity, entity_diff):
+        current_dict[key] = entity
+        diff.added.extend(entity_diff.added)
+        diff.changed.update(entity_diff.changed)
 
-    # Remove
-    for i in existing_keys.difference(update_keys):
-        del current_dict[i]
+    if not max_workers:
+        for key in update_dict:
+            try:
+                entity, entity_diff = _apply(key)
+            except Exception as error:
+                attach_update_diff(error, diff)
+                raise
+            _record(key, entity, entity_diff)
+        return diff
+
+    results, errors = concurrent_map(
+        _apply, list(update_dict.keys()), max_workers)
+
+    # Update and add, in payload order to keep the diff deterministic
+    for key, (entity, entity_diff) in results.items():
+        _record(key, entity, entity_diff)
+
+    if errors:
+        raise CarsonAggregateError(errors, diff)
+
+    return diff
 
 
 def current_milli_time():
@@ -87,3 +369,17 @@ def current_milli_time():
 def timedelta_to_milli_time(timedelta):
     """Return the current time in milliseconds"""
     return int(timedelta.total_seconds() * 1000)
+
+
+def timedelta_to_micro_time(timedelta):
+    """Return the timedelta in (integer) microseconds"""
+    return (timedelta.days * 86400 + timedelta.seconds) * 1000000 \
+        + timedelta.microseconds
+
+
+def replace_file(src, dst):
+    """Atomically replace dst with src (os.replace is Python 3.3+)"""
+    try:
+        os.replace(src, dst)
+    except AttributeError:
+        os.rename(src, dst)
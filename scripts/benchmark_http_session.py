@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""Benchmark pooled keep-alive sessions against per-call connections
+
+Runs CarsonAuth.authenticated_query against a local HTTPS stand-in server,
+once with a fresh connection per request (the former requests.request
+behaviour) and once with the shared connection pooled http session.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import warnings
+
+import jwt
+import requests
+from urllib3.exceptions import InsecureRequestWarning
+
+# pylint: disable=wrong-import-position
+# run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))))
+
+from carson_living import CarsonAuth, create_http_session
+
+from standin_server import StandInServer
+
+ME_BODY = json.dumps({
+    'code': 0, 'status': 'ok', 'msg': '', 'data': {'id': 1}
+}).encode('utf-8')
+
+
+class _PerCallSession(requests.Session):
+    """Session that opens a new connection for every request"""
+
+    def request(self, *args, **kwargs):  # pylint: disable=arguments-differ
+        with requests.Session() as session:
+            session.verify = self.verify
+            session.trust_env = self.trust_env
+            return session.request(*args, **kwargs)
+
+
+def _token():
+    token = jwt.encode({'exp': int(time.time()) + 3600, 'email': 'b@m.k'},
+                       'secret', algorithm='HS256')
+    return token.decode('utf-8') if isinstance(token, bytes) else token
+
+
+def _run(auth, url, count):
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        auth.authenticated_query(url)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies
+
+
+def _report(name, latencies, server, connections_before):
+    print('{:<10} mean {:7.2f} ms   p50 {:7.2f} ms   p95 {:7.2f} ms   '
+          'connections {}'.format(
+              name,
+              1000 * sum(latencies) / len(latencies),
+              1000 * latencies[len(latencies) // 2],
+              1000 * latencies[int(len(latencies) * 0.95)],
+              server.connection_count - connections_before))
+
+
+def main():
+    """main function"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--requests', type=int, default=200,
+                        help='number of requests per mode')
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore', InsecureRequestWarning)
+    routes = {'/me/': ('application/json', ME_BODY)}
+
+    with StandInServer(routes, use_tls=True) as server:
+        url = server.base_url + '/me/'
+
+        per_call = _PerCallSession()
+        pooled = create_http_session()
+        for session in (per_call, pooled):
+            # self-signed stand-in certificate
+            session.verify = False
+            session.trust_env = False
+
+        for name, session in (('per-call', per_call), ('pooled', pooled)):
+            auth = CarsonAuth('user', 'password', _token(),
+                              http_session=session)
+            connections_before = server.connection_count
+            _report(name, _run(auth, url, args.requests),
+                    server, connections_before)
+
+
+if __name__ == '__main__':
+    main()
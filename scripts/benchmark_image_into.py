@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""Benchmark image polling into a reused buffer against get_image()
+
+Polls the latest image of a camera from a local stand-in server, once
+with get_image() into a new BytesIO per frame and once with
+get_image_into() into a single preallocated bytearray. Reports the
+throughput and the number of memory blocks a frame allocates, from a
+tracemalloc snapshot diff over a batch of frames whose results are
+kept.
+"""
+
+import argparse
+import gc
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+# pylint: disable=wrong-import-position
+# run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))))
+
+from carson_living import EagleEye, create_http_session
+from carson_living.const import (EEN_DEVICE_LIST_ENDPOINT,
+                                 EEN_GET_IMAGE_ENDPOINT,
+                                 EEN_ASSET_REF_PREV)
+
+from standin_server import LocalRedirectAdapter, StandInServer
+
+
+_IGNORE = [tracemalloc.Filter(False, tracemalloc.__file__)]
+
+
+def _device_list():
+    return [['0001', 'c0', 'Camera 0', 'camera', [['bridge', 'ATTD']],
+             'ATTD', 'perm', [], 'guid', None, 0, 'US/Eastern', -18000]]
+
+
+def _measure(poll, frames):
+    """Return (seconds, allocated blocks per frame, bytes per frame)"""
+    gc.collect()
+    start = time.perf_counter()
+    for _ in range(frames):
+        poll()
+    seconds = time.perf_counter() - start
+
+    batch = min(frames, 50)
+    results = []
+    tracemalloc.start()
+    gc.collect()
+    before = tracemalloc.take_snapshot()
+    for _ in range(batch):
+        results.append(poll())
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats = after.filter_traces(_IGNORE).compare_to(
+        before.filter_traces(_IGNORE), 'lineno')
+    blocks = sum(s.count_diff for s in stats if s.count_diff > 0)
+    size = sum(s.size_diff for s in stats if s.size_diff > 0)
+    return seconds, blocks / float(batch), size / float(batch)
+
+
+def _get_image(camera):
+    file = io.BytesIO()
+    camera.get_image(file)
+    return file
+
+
+def main():
+    """main function"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-f', '--frames', type=int, default=500)
+    parser.add_argument('-s', '--size', type=int, default=256 * 1024,
+                        help='image size in bytes')
+    args = parser.parse_args()
+
+    routes = {
+        EEN_DEVICE_LIST_ENDPOINT: (
+            'application/json', json.dumps(_device_list()).encode('utf-8')),
+        EEN_GET_IMAGE_ENDPOINT.format(EEN_ASSET_REF_PREV): (
+            'image/jpeg', b'\xff' * args.size),
+    }
+
+    with StandInServer(routes) as server:
+        session = create_http_session()
+        session.mount('https://', LocalRedirectAdapter(server.base_url))
+        eagle_eye = EagleEye(lambda: ('auth_key', 'sub'),
+                             http_session=session)
+        eagle_eye.update()
+        camera = next(iter(eagle_eye.cameras))
+        buffer = bytearray(args.size)
+
+        results = [
+            ('get_image', _measure(
+                lambda: _get_image(camera), args.frames)),
+            ('get_image_into', _measure(
+                lambda: camera.get_image_into(buffer), args.frames)),
+        ]
+
+    print('{} frames of {} KiB'.format(args.frames, args.size // 1024))
+    for name, (seconds, blocks, size) in results:
+        print('{:15} {:8.1f} frames/s {:8.1f} MiB/s   '
+              '{:6.1f} allocations {:8.1f} KiB/frame'.format(
+                  name, args.frames / seconds,
+                  args.frames * args.size / seconds / 1024 / 1024,
+                  blocks, size / 1024.0))
+
+
+if __name__ == '__main__':
+    main()
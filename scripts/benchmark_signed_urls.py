@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""Benchmark batch signed image url generation against per-call urls
+
+Generates the image urls of a timeline (every camera at every step over a
+time range) once via EagleEyeCamera.get_image_url per url and once via
+EagleEye.get_image_urls. No network access is needed, the auth check is
+skipped in both modes.
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+# pylint: disable=wrong-import-position
+# run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))))
+
+from carson_living import EagleEye, EagleEyeCamera
+
+
+def _per_call(cameras, start, count, step):
+    return [camera.get_image_url(start + i * step, check_auth=False)
+            for camera in cameras
+            for i in range(count)]
+
+
+def _batch(eagle_eye, cameras, start, count, step):
+    urls = eagle_eye.get_image_urls(
+        [camera.entity_id for camera in cameras],
+        start, start + count * step, step, check_auth=False)
+    return [url for camera_urls in urls.values() for url in camera_urls]
+
+
+def _measure(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        result = func()
+        duration = time.perf_counter() - begin
+        best = duration if best is None else min(best, duration)
+    return best, result
+
+
+def main():
+    """main function"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-c', '--cameras', type=int, default=20,
+                        help='number of cameras')
+    parser.add_argument('-d', '--duration', type=int, default=3600,
+                        help='time range in seconds')
+    parser.add_argument('-s', '--step', type=int, default=10,
+                        help='step in seconds')
+    parser.add_argument('-r', '--repeat', type=int, default=3,
+                        help='repetitions, the best run is reported')
+    args = parser.parse_args()
+
+    eagle_eye = EagleEye(lambda: None,
+                         initial_session=('c000~0123456789abcdef', 'c001'))
+    cameras = [EagleEyeCamera(eagle_eye, {'id': '1000{:04x}'.format(i)})
+               for i in range(args.cameras)]
+    start = datetime(2020, 1, 31, 23, 0, 0)
+    step = timedelta(seconds=args.step)
+    count = args.duration // args.step
+
+    per_call_s, per_call_urls = _measure(
+        lambda: _per_call(cameras, start, count, step), args.repeat)
+    batch_s, batch_urls = _measure(
+        lambda: _batch(eagle_eye, cameras, start, count, step), args.repeat)
+
+    if per_call_urls != batch_urls:
+        raise SystemExit('batch urls differ from per-call urls')
+
+    for name, duration in (('per-call', per_call_s), ('batch', batch_s)):
+        print('{:<10} {:8.1f} ms   {:10.0f} urls/s'.format(
+            name, 1000 * duration, len(batch_urls) / duration))
+    print('speedup    {:8.1f}x ({} urls)'.format(per_call_s / batch_s,
+                                                len(batch_urls)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""Benchmark bulk snapshot download against the serial camera loop
+
+Downloads the latest image of N cameras from a local stand-in server with
+artificial latency, once with the serial get_image() loop of carsoncli.py
+and once with EagleEye.get_images().
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+# pylint: disable=wrong-import-position
+# run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))))
+
+from carson_living import EagleEye, create_http_session
+from carson_living.const import (EEN_DEVICE_LIST_ENDPOINT,
+                                 EEN_GET_IMAGE_ENDPOINT,
+                                 EEN_ASSET_REF_PREV)
+
+from standin_server import LocalRedirectAdapter, StandInServer
+
+
+def _device_list(count):
+    return [['0001', 'c{}'.format(i), 'Camera {}'.format(i), 'camera',
+             [['bridge', 'ATTD']], 'ATTD', 'perm', [], 'guid', None, 0,
+             'US/Eastern', -18000] for i in range(count)]
+
+
+def _eagle_eye(server, pool_maxsize):
+    session = create_http_session(pool_maxsize=pool_maxsize)
+    session.mount('https://', LocalRedirectAdapter(
+        server.base_url, pool_maxsize=pool_maxsize))
+    eagle_eye = EagleEye(lambda: ('auth_key', 'sub'), http_session=session)
+    eagle_eye.update()
+    return eagle_eye
+
+
+def main():
+    """main function"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-c', '--cameras', type=int, default=32)
+    parser.add_argument('-w', '--workers', type=int, default=8)
+    parser.add_argument('-d', '--delay', type=float, default=0.05,
+                        help='server latency per request in seconds')
+    parser.add_argument('-s', '--size', type=int, default=64 * 1024,
+                        help='image size in bytes')
+    args = parser.parse_args()
+
+    routes = {
+        EEN_DEVICE_LIST_ENDPOINT: (
+            'application/json',
+            json.dumps(_device_list(args.cameras)).encode('utf-8')),
+        EEN_GET_IMAGE_ENDPOINT.format(EEN_ASSET_REF_PREV): (
+            'image/jpeg', b'\xff' * args.size),
+    }
+
+    with StandInServer(routes, delay_s=args.delay) as server:
+        eagle_eye = _eagle_eye(server, args.workers)
+
+        # serial loop as in scripts/carsoncli.py
+        start = time.perf_counter()
+        for cam in eagle_eye.cameras:
+            cam.get_image(io.BytesIO())
+        serial = time.perf_counter() - start
+
+        start = time.perf_counter()
+        buffers = {c.entity_id: io.BytesIO() for c in eagle_eye.cameras}
+        errors = eagle_eye.get_images(buffers, max_workers=args.workers)
+        bulk = time.perf_counter() - start
+
+    print('{} cameras, {:.0f} ms server latency'.format(
+        args.cameras, args.delay * 1000))
+    print('serial loop      {:8.1f} ms'.format(serial * 1000))
+    print('get_images ({:>2}) {:8.1f} ms   speedup {:.1f}x   errors {}'.format(
+        args.workers, bulk * 1000, serial / bulk, len(errors)))
+
+
+if __name__ == '__main__':
+    main()
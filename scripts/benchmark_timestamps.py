@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""Benchmark EEN timestamp conversions against strftime / strptime
+
+Converts a timeline of epoch milliseconds (one value per second over a
+configurable number of hours) to EEN timestamps and back, once with the
+datetime based formatting that was used before and once with the
+functions of carson_living.timestamp.
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+# pylint: disable=wrong-import-position
+# run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))))
+
+from carson_living.timestamp import (format_een_timestamp,
+                                     millis_to_een_timestamps,
+                                     een_timestamps_to_millis)
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _strftime(millis_list):
+    return [(_EPOCH + timedelta(milliseconds=m))
+            .strftime('%Y%m%d%H%M%S.%f')[:-3] for m in millis_list]
+
+
+def _strptime(timestamps):
+    return [int((datetime.strptime(t, '%Y%m%d%H%M%S.%f') - _EPOCH)
+                .total_seconds() * 1000) for t in timestamps]
+
+
+def _format(millis_list):
+    return [format_een_timestamp(_EPOCH + timedelta(milliseconds=m))
+            for m in millis_list]
+
+
+def _measure(func, arg, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        result = func(arg)
+        duration = time.perf_counter() - begin
+        best = duration if best is None else min(best, duration)
+    return best, result
+
+
+def main():
+    """main function"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hours', type=int, default=24,
+                        help='timeline length in hours (1 value/s)')
+    parser.add_argument('-r', '--repeat', type=int, default=3,
+                        help='repetitions, the best run is reported')
+    args = parser.parse_args()
+
+    start = 1580511663123
+    millis_list = [start + i * 1000 for i in range(args.hours * 3600)]
+
+    results = {}
+    for name, func, arg in (
+            ('strftime', _strftime, millis_list),
+            ('format_een_timestamp', _format, millis_list),
+            ('millis_to_een_timestamps', millis_to_een_timestamps,
+             millis_list)):
+        duration, results[name] = _measure(func, arg, args.repeat)
+        print('{:<26} {:8.1f} ms   {:10.0f} values/s'.format(
+            name, 1000 * duration, len(millis_list) / duration))
+
+    timestamps = results['strftime']
+    if len(set(tuple(r) for r in results.values())) != 1:
+        raise SystemExit('formatted timestamps differ')
+
+    parsed = {}
+    for name, func in (('strptime', _strptime),
+                       ('een_timestamps_to_millis',
+                        een_timestamps_to_millis)):
+        duration, parsed[name] = _measure(func, timestamps, args.repeat)
+        print('{:<26} {:8.1f} ms   {:10.0f} values/s'.format(
+            name, 1000 * duration, len(timestamps) / duration))
+
+    if parsed['een_timestamps_to_millis'] != millis_list:
+        raise SystemExit('parsed timestamps differ')
+
+
+if __name__ == '__main__':
+    main()
@@ -4,11 +4,18 @@
 import getpass
 import argparse
 import logging
+import os
+import sys
 
 from datetime import timedelta, datetime
 
 import requests
 
+# pylint: disable=wrong-import-position
+# run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))))
+
 from carson_living import Carson, CarsonAPIError
 
 
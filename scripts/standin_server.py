@@ -0,0 +1,144 @@
+"""Local stand-in server for Carson Living / Eagle Eye benchmarks
+
+Serves canned responses on 127.0.0.1 with HTTP/1.1 keep-alive, optionally
+over HTTPS with a throw-away self-signed certificate (requires the openssl
+command line tool).
+"""
+
+import os
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, urlunsplit
+
+from requests.adapters import HTTPAdapter
+
+
+def _create_self_signed_cert(directory):
+    cert_file = os.path.join(directory, 'cert.pem')
+    key_file = os.path.join(directory, 'key.pem')
+    subprocess.check_call(
+        ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes',
+         '-keyout', key_file, '-out', cert_file, '-days', '1',
+         '-subj', '/CN=127.0.0.1'],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return cert_file, key_file
+
+
+class StandInServer(object):
+    """Threaded stand-in server with per-path canned responses
+
+    Args:
+        routes:
+            dict of path (without query) to (content_type, body_bytes)
+        use_tls: serve HTTPS instead of HTTP
+        delay_s: artificial per-request server delay
+    """
+
+    def __init__(self, routes, use_tls=False, delay_s=0.0):
+        self.routes = routes
+        self.use_tls = use_tls
+        self.delay_s = delay_s
+        self.request_count = 0
+        self.connection_count = 0
+        self._server = None
+        self._thread = None
+        self._cert_dir = None
+
+    @property
+    def base_url(self):
+        """Base url of the running server"""
+        return '{}://127.0.0.1:{}'.format(
+            'https' if self.use_tls else 'http',
+            self._server.server_address[1])
+
+    def _handler(self):
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # buffer header and body into a single write (no Nagle delay)
+            wbufsize = -1
+
+            def setup(self):
+                server.connection_count += 1
+                BaseHTTPRequestHandler.setup(self)
+
+            def _reply(self):
+                server.request_count += 1
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    self.rfile.read(length)
+                if server.delay_s:
+                    threading.Event().wait(server.delay_s)
+                route = server.routes.get(self.path.split('?')[0])
+                if route is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                content_type, body = route
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = _reply  # noqa: N815
+            do_POST = _reply  # noqa: N815
+
+            def log_message(self, *args):  # pylint: disable=arguments-differ
+                pass
+
+        return _Handler
+
+    def start(self):
+        """Start serving in a background thread"""
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        if self.use_tls:
+            self._cert_dir = tempfile.mkdtemp()
+            cert_file, key_file = _create_self_signed_cert(self._cert_dir)
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(cert_file, key_file)
+            self._server.socket = context.wrap_socket(
+                self._server.socket, server_side=True)
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and clean up"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._cert_dir:
+            shutil.rmtree(self._cert_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+class LocalRedirectAdapter(HTTPAdapter):
+    """requests adapter that sends every request to a stand-in server
+
+    Mount it on a session to route the fixed Carson Living / Eagle Eye
+    urls of the library to the local server, keeping path and query.
+    """
+
+    def __init__(self, base_url, **kwargs):
+        self._base = urlsplit(base_url)
+        super(LocalRedirectAdapter, self).__init__(**kwargs)
+
+    def send(self, request, **kwargs):  # pylint: disable=arguments-differ
+        url = urlsplit(request.url)
+        request.url = urlunsplit((self._base.scheme, self._base.netloc,
+                                  url.path, url.query, url.fragment))
+        return super(LocalRedirectAdapter, self).send(request, **kwargs)
@@ -13,7 +13,7 @@ def readme():
 
 setup(
     name='carson_living',
-    packages=['carson_living'],
+    packages=['carson_living', 'carson_living.aio'],
     version=_VERSION,
     description='A Python library to communicate with'
                 ' Carson Living Residences (https://www.carson.live/)',
@@ -24,7 +24,11 @@ setup(
     license='Apache License 2.0',
     python_requires='>=2.7, !=3.0.*, !=3.1.*, !=3.2.*, !=3.3.*',
     include_package_data=True,
-    install_requires=['requests', 'pyjwt'],
+    install_requires=['requests', 'pyjwt',
+                      'futures; python_version < "3"'],
+    extras_require={
+        'async': ['aiohttp; python_version >= "3.5"'],
+    },
     test_suite='tests',
     keywords=[
         'carson living',
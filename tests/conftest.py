@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""pytest configuration for Carson Living tests."""
+import sys
+
+# The asynchronous interface requires Python 3.5+ (async/await)
+collect_ignore = []
+if sys.version_info < (3, 5):
+    collect_ignore.append('test_aio.py')
@@ -1,10 +1,24 @@
 # -*- coding: utf-8 -*-
 """Helper Module for Carson Living tests."""
 import os
+import re
+import socket
+import threading
 import time
 import json
 import jwt
 
+from requests.adapters import HTTPAdapter
+from requests.compat import urlparse, urlunparse
+
+# 2.7 support fallback
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
 from carson_living import (EEN_ASSET_REF_PREV,
                            EEN_VIDEO_FORMAT_FLV)
 
@@ -12,7 +26,9 @@ from carson_living.const import (EEN_API_URI,
                                  EEN_DEVICE_ENDPOINT,
                                  EEN_DEVICE_LIST_ENDPOINT,
                                  EEN_GET_IMAGE_ENDPOINT,
-                                 EEN_GET_VIDEO_ENDPOINT)
+                                 EEN_GET_VIDEO_ENDPOINT,
+                                 EEN_LIST_IMAGE_ENDPOINT,
+                                 EEN_LIST_VIDEO_ENDPOINT)
 
 from tests.const import TOKEN_PAYLOAD_TEMPLATE
 
@@ -146,3 +162,155 @@ def setup_ee_video_mock(mock, active_brand_subdomain,
         content=binary_video
     )
     return binary_video
+
+
+def page_asset_list(asset_list, params):
+    """Page of an asset list like the EE asset list endpoints
+
+    Args:
+        asset_list: list of asset list payloads (sorted by 's')
+        params: dict of start_timestamp, end_timestamp and count
+
+    Returns: list of asset list payloads in the page
+
+    """
+    page = [a for a in asset_list
+            if params['start_timestamp'] <= a['s']
+            < params['end_timestamp']]
+    return page[:int(params['count'])]
+
+
+def setup_ee_asset_list_mocks(mock, active_brand_subdomain):
+    """Setup paging EE image and video asset list endpoints
+
+    Args:
+        mock: requests_mock mock
+        active_brand_subdomain: subdomain to replace in url
+
+    Returns:
+        (tuple): tuple containing:
+
+            image_list(list): image asset list fixture
+            video_list(list): video asset list fixture
+    """
+    lists = {}
+    for endpoint, filename in ((EEN_LIST_IMAGE_ENDPOINT,
+                                'asset_list_image.json'),
+                               (EEN_LIST_VIDEO_ENDPOINT,
+                                'asset_list_video.json')):
+        asset_list = json.loads(
+            load_fixture('eagleeyenetworks.com', filename))
+        lists[endpoint] = asset_list
+
+        def _page(request, _context, asset_list=asset_list):
+            params = {k: v[0] for k, v in request.qs.items()}
+            return page_asset_list(asset_list, params)
+
+        mock.get(EEN_API_URI.format(active_brand_subdomain) + endpoint,
+                 json=_page)
+
+    return lists[EEN_LIST_IMAGE_ENDPOINT], lists[EEN_LIST_VIDEO_ENDPOINT]
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class DroppingAssetServer(object):
+    """Local stand-in server for Eagle Eye assets that drops connections
+
+    Serves body on every path. The n-th response is cut off after
+    drops[n] body bytes by closing the connection, later responses are
+    served completely.
+
+    Args:
+        body: asset bytes
+        drops: list of body byte counts after which a response is cut off
+        support_range: reply to Range requests with 206 Partial Content
+        content_type: content type of the asset
+    """
+
+    def __init__(self, body, drops=(), support_range=True,
+                 content_type='video/x-flv'):
+        self.body = body
+        self.drops = list(drops)
+        self.support_range = support_range
+        self.content_type = content_type
+        # Range header (or None) of every request
+        self.ranges = []
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def base_url(self):
+        """Base url of the running server"""
+        return 'http://127.0.0.1:{}'.format(self._server.server_address[1])
+
+    def _handler(self):
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):  # noqa: N802 pylint: disable=invalid-name
+                """Serve the (partial) asset"""
+                range_header = self.headers.get('Range')
+                with server._lock:  # pylint: disable=protected-access
+                    index = len(server.ranges)
+                    server.ranges.append(range_header)
+
+                start = 0
+                match = re.match(r'bytes=(\d+)-', range_header or '')
+                if server.support_range and match:
+                    start = int(match.group(1))
+                    self.send_response(206)
+                    self.send_header('Content-Range', 'bytes {}-{}/{}'.format(
+                        start, len(server.body) - 1, len(server.body)))
+                else:
+                    self.send_response(200)
+                body = server.body[start:]
+                self.send_header('Content-Type', server.content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+
+                if index < len(server.drops):
+                    self.wfile.write(body[:server.drops[index]])
+                    self.wfile.flush()
+                    self.close_connection = True
+                    self.connection.shutdown(socket.SHUT_RDWR)
+                    return
+                self.wfile.write(body)
+
+            def log_message(self, *args):  # pylint: disable=arguments-differ
+                pass
+
+        return _Handler
+
+    def start(self):
+        """Start serving in a background thread"""
+        self._server = _ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        thread = threading.Thread(target=self._server.serve_forever,
+                                  args=(0.05,))
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving"""
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class LocalRedirectAdapter(HTTPAdapter):
+    """requests adapter that sends every request to a local server"""
+
+    def __init__(self, base_url, **kwargs):
+        self._base = urlparse(base_url)
+        super(LocalRedirectAdapter, self).__init__(**kwargs)
+
+    def send(self, request, **kwargs):  # pylint: disable=arguments-differ
+        url = urlparse(request.url)
+        request.url = urlunparse((self._base.scheme, self._base.netloc,
+                                  url.path, url.params, url.query,
+                                  url.fragment))
+        return super(LocalRedirectAdapter, self).send(request, **kwargs)
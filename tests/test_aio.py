@@ -0,0 +1,792 @@
+# -*- coding: utf-8 -*-
+"""Asynchronous API Module for Carson Living tests."""
+
+import asyncio
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from aiohttp import ClientSession, web
+from aiohttp.test_utils import TestServer
+from yarl import URL
+
+from carson_living import (CarsonAggregateError,
+                           CarsonAPIError,
+                           CarsonAuthenticationError,
+                           CarsonCommunicationError,
+                           CarsonError,
+                           EagleEyeCamera)
+from carson_living.aio import (AsyncCarson,
+                               AsyncCarsonAuth,
+                               AsyncSnapshotPoller)
+from carson_living.flv import concat_flv
+from carson_living.const import (C_API_URI,
+                                 C_AUTH_ENDPOINT,
+                                 C_ME_ENDPOINT,
+                                 C_EEN_SESSION_ENDPOINT,
+                                 C_DOOR_OPEN_ENDPOINT,
+                                 EEN_API_URI,
+                                 EEN_DEVICE_ENDPOINT,
+                                 EEN_DEVICE_LIST_ENDPOINT,
+                                 EEN_GET_IMAGE_ENDPOINT,
+                                 EEN_GET_VIDEO_ENDPOINT,
+                                 EEN_IS_AUTH_ENDPOINT,
+                                 EEN_LIST_IMAGE_ENDPOINT)
+
+from tests.const import (USERNAME, PASSWORD)
+from tests.helpers import (load_fixture,
+                           get_encoded_token,
+                           page_asset_list)
+
+
+class _LocalSession(object):
+    """aiohttp session wrapper that routes all hosts to a local server
+
+    https://host/path is requested as http://127.0.0.1:port/host/path
+    """
+
+    def __init__(self, session, server):
+        self._session = session
+        self._server = server
+
+    def request(self, method, url, **kwargs):
+        """Rewrite and forward the request to the local server"""
+        url = URL(url)
+        return self._session.request(
+            method,
+            self._server.make_url('/' + url.host + url.path),
+            **kwargs)
+
+
+class MockCarsonServer(object):
+    """Local stand-in server for Carson Living and Eagle Eye"""
+
+    def __init__(self):
+        self.app = web.Application()
+        self.calls = []
+        self._responses = {}
+
+    def add(self, method, url, body=b'', status=200, content_type=None,
+            failures=0):
+        """Add (or replace) a canned response for a full url
+
+        The first failures calls are answered with 500.
+        """
+        url = URL(url)
+        route = (method, '/' + url.host + url.path)
+        known = route in self._responses
+        self._responses[route] = [body, status, content_type, failures]
+        if known:
+            return
+
+        async def _handler(request):
+            self.calls.append((request.method, url, request))
+            response = self._responses[route]
+            body, status, content_type, failures = response
+            if failures:
+                response[3] -= 1
+                return web.Response(status=500)
+            if content_type is None and isinstance(body, str):
+                return web.Response(text=body, status=status,
+                                    content_type='application/json')
+            return web.Response(body=body, status=status,
+                                content_type=content_type)
+
+        self.app.router.add_route(method, route[1], _handler)
+
+    def call_count(self, url):
+        """Number of calls to url"""
+        return len([c for c in self.calls if c[1] == URL(url)])
+
+
+class TestAsyncCarson(unittest.TestCase):
+    """Carson Living asynchronous API test class."""
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.token, _ = get_encoded_token()
+
+        self.c_mock_me = json.loads(
+            load_fixture('carson.live', 'carson_me.json')).get('data')
+        self.c_mock_esession = json.loads(load_fixture(
+            'carson.live', 'carson_eagleeye_session.json')).get('data')
+        self.subdomain = self.c_mock_esession['activeBrandSubdomain']
+        self.e_mock_device_list = json.loads(load_fixture(
+            'eagleeyenetworks.com', 'device_list.json'))
+
+        self.server = MockCarsonServer()
+        self.server.add('GET', C_API_URI + C_ME_ENDPOINT,
+                        load_fixture('carson.live', 'carson_me.json'))
+        for prop in self.c_mock_me['properties']:
+            self.server.add(
+                'GET',
+                C_API_URI + C_EEN_SESSION_ENDPOINT.format(prop['id']),
+                load_fixture('carson.live', 'carson_eagleeye_session.json'))
+        self.server.add(
+            'GET', self._een_url(EEN_DEVICE_LIST_ENDPOINT),
+            load_fixture('eagleeyenetworks.com', 'device_list.json'))
+
+    def tearDown(self):
+        self.loop.close()
+
+    def _een_url(self, endpoint):
+        return EEN_API_URI.format(self.subdomain) + endpoint
+
+    def _run(self, test_coro_fn):
+        async def _with_server():
+            test_server = TestServer(self.server.app)
+            await test_server.start_server()
+            session = ClientSession()
+            try:
+                await test_coro_fn(_LocalSession(session, test_server))
+            finally:
+                await session.close()
+                await test_server.close()
+
+        self.loop.run_until_complete(_with_server())
+
+    def _carson(self, local_session):
+        return AsyncCarson(USERNAME, PASSWORD, self.token,
+                           http_session=local_session)
+
+    def test_update_initializes_entities(self):
+        """Test entity initialization via asynchronous update"""
+        async def _test(local_session):
+            carson = self._carson(local_session)
+            await carson.update()
+
+            self.assertEqual(self.c_mock_me['firstName'],
+                             carson.user.first_name)
+            self.assertEqual(1, len(carson.buildings))
+
+            building = carson.first_building
+            self.assertEqual(self.c_mock_me['properties'][0]['name'],
+                             building.name)
+            self.assertEqual(3, len(building.doors))
+            self.assertEqual(2, len(building.cameras))
+            self.assertEqual(8, len(building.eagleeye_api.cameras))
+
+            mock_camera_dict = {d[1]: d for d in self.e_mock_device_list}
+            for camera in building.cameras:
+                self.assertEqual(
+                    EagleEyeCamera.map_list_to_entity_payload(
+                        mock_camera_dict[camera.entity_id]),
+                    camera.entity_payload)
+
+        self._run(_test)
+
+    def test_unchanged_update_is_skipped(self):
+        """Test unchanged buildings do not query Eagle Eye again"""
+        async def _test(local_session):
+            carson = self._carson(local_session)
+            diff = await carson.update()
+            self.assertIn(carson.first_building.unique_entity_id,
+                          diff.added)
+            self.assertEqual(8, len([k for k in diff.added
+                                     if k.startswith('eagleeye_camera_')]))
+
+            calls = len(self.server.calls)
+            self.assertFalse(await carson.update())
+            # only /me/
+            self.assertEqual(calls + 1, len(self.server.calls))
+
+        self._run(_test)
+
+    def test_failed_camera_update_is_retried(self):
+        """Test buildings whose cameras failed to update stay stale"""
+        self.server.add(
+            'GET', self._een_url(EEN_DEVICE_LIST_ENDPOINT),
+            load_fixture('eagleeyenetworks.com', 'device_list.json'),
+            failures=1)
+
+        async def _test(local_session):
+            carson = self._carson(local_session)
+            with self.assertRaises(CarsonAggregateError) as context:
+                await carson.update()
+            building = carson.first_building
+            self.assertEqual([building.entity_id],
+                             list(context.exception.errors))
+            self.assertIn(building.unique_entity_id,
+                          context.exception.diff.added)
+            self.assertEqual(0, len(building.cameras))
+
+            diff = await carson.update()
+            self.assertEqual(8, len([k for k in diff.added
+                                     if k.startswith('eagleeye_camera_')]))
+            self.assertEqual(2, len(building.cameras))
+            self.assertFalse(building.cameras_stale)
+
+        self._run(_test)
+
+    def test_login_without_initial_token(self):
+        """Test asynchronous login"""
+        self.server.add('POST', C_API_URI + C_AUTH_ENDPOINT,
+                        load_fixture('carson.live', 'carson_login.json'))
+
+        async def _test(local_session):
+            auth = AsyncCarsonAuth(USERNAME, PASSWORD,
+                                   http_session=local_session)
+            await auth.authenticated_query(C_API_URI + C_ME_ENDPOINT)
+
+            self.assertIsNotNone(auth.token)
+            self.assertTrue(auth.valid_token())
+            _, _, request = self.server.calls[-1]
+            self.assertEqual('JWT {}'.format(auth.token),
+                             request.headers.get('Authorization'))
+
+        self._run(_test)
+
+    def test_concurrent_queries_login_once(self):
+        """Test concurrent coroutines share a single login"""
+        self.server.add('POST', C_API_URI + C_AUTH_ENDPOINT,
+                        load_fixture('carson.live', 'carson_login.json'))
+
+        async def _test(local_session):
+            auth = AsyncCarsonAuth(USERNAME, PASSWORD,
+                                   http_session=local_session)
+            await asyncio.gather(
+                *[auth.authenticated_query(C_API_URI + C_ME_ENDPOINT)
+                  for _ in range(5)])
+
+            self.assertEqual(1, self.server.call_count(
+                C_API_URI + C_AUTH_ENDPOINT))
+
+        self._run(_test)
+
+    def test_token_renewal(self):
+        """Test asynchronous background token renewal"""
+        self.server.add('POST', C_API_URI + C_AUTH_ENDPOINT,
+                        load_fixture('carson.live', 'carson_login.json'))
+        token, _ = get_encoded_token(600)
+
+        async def _test(local_session):
+            auth = AsyncCarsonAuth(USERNAME, PASSWORD, token,
+                                   http_session=local_session)
+            renewal = auth.start_token_renewal(margin=900)
+            for _ in range(500):
+                if renewal.renewals:
+                    break
+                await asyncio.sleep(0.01)
+            await auth.close()
+
+            self.assertFalse(renewal.running)
+            self.assertEqual(1, renewal.renewals)
+            self.assertNotEqual(token, auth.token)
+            self.assertEqual(1, self.server.call_count(
+                C_API_URI + C_AUTH_ENDPOINT))
+
+        self._run(_test)
+
+    def test_login_failure(self):
+        """Test asynchronous login failure"""
+        self.server.add('POST', C_API_URI + C_AUTH_ENDPOINT,
+                        load_fixture('carson.live',
+                                     'carson_auth_failure.json'),
+                        status=401)
+
+        async def _test(local_session):
+            auth = AsyncCarsonAuth(USERNAME, PASSWORD,
+                                   http_session=local_session)
+            with self.assertRaises(CarsonAuthenticationError):
+                await auth.update_token()
+
+        self._run(_test)
+
+    def test_camera_get_image(self):
+        """Test asynchronous image download"""
+        mock_image = load_fixture('eagleeyenetworks.com',
+                                  'camera_image.jpeg', 'rb')
+        self.server.add('GET',
+                        self._een_url(EEN_GET_IMAGE_ENDPOINT.format('prev')),
+                        mock_image, content_type='image/jpeg')
+
+        async def _test(local_session):
+            carson = self._carson(local_session)
+            await carson.update()
+            camera = next(iter(carson.first_building.cameras))
+
+            buffer = io.BytesIO()
+            await camera.get_image(buffer,
+                                   datetime(2020, 1, 31, 23, 1, 3, 123456))
+
+            self.assertEqual(mock_image, buffer.getvalue())
+            _, _, request = self.server.calls[-1]
+            self.assertEqual('20200131230103.123',
+                             request.query['timestamp'])
+            self.assertIn('auth_key=', request.headers.get('Cookie'))
+
+        self._run(_test)
+
+    def test_camera_get_image_into(self):
+        """Test asynchronous image download into a buffer"""
+        mock_image = load_fixture('eagleeyenetworks.com',
+                                  'camera_image.jpeg', 'rb')
+        self.server.add('GET',
+                        self._een_url(EEN_GET_IMAGE_ENDPOINT.format('prev')),
+                        mock_image, content_type='image/jpeg')
+
+        async def _test(local_session):
+            carson = self._carson(local_session)
+            await carson.update()
+            camera = next(iter(carson.first_building.cameras))
+
+            buffer = bytearray(64 * 1024)
+            size = await camera.get_image_into(buffer)
+
+            self.assertEqual(mock_image, bytes(buffer[:size]))
+            with self.assertRaises(CarsonError):
+                await camera.get_image_into(bytearray(16))
+
+        self._run(_test)
+
+    def test_building_get_images(self):
+        """Test asynchronous bulk image download"""
+        mock_image = load_fixture('eagleeyenetworks.com',
+                                  'camera_image.jpeg', 'rb')
+        self.server.add('GET',
+                        self._een_url(EEN_GET_IMAGE_ENDPOINT.format('prev')),
+                        mock_image, content_type='image/jpeg')
+
+        async def _test(local_session):
+            carson = self._carson(local_session)
+            await carson.update()
+            building = carson.first_building
+            buffers = {c.entity_id: io.BytesIO() for c in building.cameras}
+            buffers['unknown'] = io.BytesIO()
+
+            errors = await building.get_images(buffers, max_workers=2)
+            serial = await building.get_images(
+                {k: io.BytesIO() for k in buffers}, max_workers=None)
+            self.assertEqual(list(errors), list(serial))
+
+            self.assertEqual(['unknown'], list(errors))
+            for camera in building.cameras:
+                self.assertEqual(mock_image,
+                                 buffers[camera.entity_id].getvalue())
+
+        self._run(_test)
+
+    def test_update_camera_details(self):
+        """Test asynchronous bulk camera detail update"""
+        self.server.add('GET', self._een_url(EEN_DEVICE_ENDPOINT),
+                        load_fixture('eagleeyenetworks.com',
+                                     'device_camera.json'))
+
+        async def _test(local_session):
+            carson = self._carson(local_session)
+            await carson.update()
+            eagle_eye = carson.first_building.eagleeye_api
+
+            diff, errors = await eagle_eye.update_camera_details(
+                ['c0'], max_workers=None)
+
+            self.assertEqual({}, errors)
+            self.assertEqual(['eagleeye_camera_c0'], list(diff.changed))
+            self.assertIn('camera_info',
+                          eagle_eye.get_camera('c0').entity_payload)
+
+        self._run(_test)
+
+    def test_camera_list_images(self):
+        """Test asynchronous image listing"""
+        image_list_txt = load_fixture('eagleeyenetworks.com',
+                                      'asset_list_image.json')
+        self.server.add('GET', self._een_url(EEN_LIST_IMAGE_ENDPOINT),
+                        image_list_txt)
+
+        async def _test(local_session):
+            carson = self._carson(local_session)
+            await carson.update()
+            camera = next(iter(carson.first_building.cameras))
+            start = datetime(2020, 1, 31, 23, 0, 0)
+
+            timestamps = []
+            async for image in camera.list_images(
+                    start, start + timedelta(minutes=1), page_size=10):
+                timestamps.append(image.timestamp)
+
+            self.assertEqual([i['s'] for i in json.loads(image_list_txt)],
+                             timestamps)
+            self.assertEqual(1, self.server.call_count(
+                self._een_url(EEN_LIST_IMAGE_ENDPOINT)))
+
+        self._run(_test)
+
+    def test_camera_list_images_page_boundary_millisecond(self):
+        """Test asynchronous listing of images sharing a page boundary"""
+        image_list = [{'t': 'PRFR', 's': '20200131230000.012'},
+                      {'t': 'PRFR', 's': '20200131230000.500'},
+                      {'t': 'PRFR', 's': '20200131230001.015'},
+                      {'t': 'THUMB', 's': '20200131230001.015'},
+                      {'t': 'PRFR', 's': '20200131230002.013'}]
+        starts = []
+
+        async def _list(request):
+            starts.append(request.query['start_timestamp'])
+            return web.json_response(
+                page_asset_list(image_list, request.query))
+
+        self.server.app.router.add_get(
+            '/' + URL(self._een_url(EEN_LIST_IMAGE_ENDPOINT)).host
+            + EEN_LIST_IMAGE_ENDPOINT, _list)
+
+        async def _test(local_session):
+            carson = self._carson(local_session)
+            await carson.update()
+            camera = next(iter(carson.first_building.cameras))
+            start = datetime(2020, 1, 31, 23, 0, 0)
+
+            images = []
+            async for image in camera.list_images(
+                    start, start + timedelta(minutes=1), page_size=3):
+                images.append(tuple(image))
+
+            self.assertEqual([(i['s'], i['t']) for i in image_list],
+                             images)
+            self.assertEqual(['20200131230000.000', '20200131230001.015',
+                              '20200131230002.013'], starts)
+
+        self._run(_test)
+
+    def test_camera_export_video(self):
+        """Test asynchronous chunked video export"""
+        mock_video = load_fixture('eagleeyenetworks.com',
+                                  'camera_video.flv', 'rb')
+        video_url = self._een_url(EEN_GET_VIDEO_ENDPOINT.format('flv'))
+        self.server.add('GET', video_url, mock_video,
+                        content_type='video/x-flv')
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'export.flv')
+
+        async def _test(local_session):
+            carson = self._carson(local_session)
+            await carson.update()
+            camera = next(iter(carson.first_building.cameras))
+
+            await camera.export_video(
+                path, datetime(2020, 1, 31, 23, 0, 0),
+                timedelta(minutes=20), timedelta(minutes=10),
+                max_workers=2)
+
+            self.assertEqual(2, self.server.call_count(video_url))
+            expected = io.BytesIO()
+            concat_flv(expected, [(io.BytesIO(mock_video), 0),
+                                  (io.BytesIO(mock_video), 600000)])
+            with open(path, 'rb') as file:
+                self.assertEqual(expected.getvalue(), file.read())
+            self.assertEqual(['export.flv'], os.listdir(directory))
+
+        self._run(_test)
+
+    def _add_dropping_video(self, mock_video, drops):
+        """Serve the video, cutting off the n-th response after drops[n]"""
+        ranges = []
+
+        async def _video(request):
+            ranges.append(request.headers.get('Range'))
+            start = int(request.headers.get('Range', 'bytes=0-')[6:-1])
+            response = web.StreamResponse(status=206 if start else 200)
+            if start:
+                response.headers['Content-Range'] = 'bytes {}-{}/{}'.format(
+                    start, len(mock_video) - 1, len(mock_video))
+            response.content_length = len(mock_video) - start
+            await response.prepare(request)
+            if len(ranges) <= len(drops):
+                await response.write(
+                    mock_video[start:start + drops[len(ranges) - 1]])
+                request.transport.close()
+                return response
+            await response.write(mock_video[start:])
+            await response.write_eof()
+            return response
+
+        self.server.app.router.add_get(
+            '/' + URL(self._een_url(
+                EEN_GET_VIDEO_ENDPOINT.format('flv'))).host
+            + EEN_GET_VIDEO_ENDPOINT.format('flv'), _video)
+        return ranges
+
+    def test_camera_export_video_dropped_segment(self):
+        """Test asynchronous export of a segment with dropped connections"""
+        mock_video = load_fixture('eagleeyenetworks.com',
+                                  'camera_video.flv', 'rb')
+        ranges = self._add_dropping_video(mock_video, [40000, 1000])
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'export.flv')
+        start = datetime(2020, 1, 31, 23, 0, 0)
+
+        async def _test(local_session):
+            carson = self._carson(local_session)
+            await carson.update()
+            camera = next(iter(carson.first_building.cameras))
+
+            with self.assertRaises(CarsonAggregateError) as context:
+                await camera.export_video(
+                    path, start, timedelta(seconds=2), retries=0)
+            self.assertIsInstance(context.exception.errors[start],
+                                  CarsonCommunicationError)
+            self.assertEqual([], os.listdir(directory))
+
+            await camera.export_video(
+                path, start, timedelta(seconds=2), retries=1,
+                retry_delay=0)
+
+            self.assertEqual([None, None, 'bytes=1000-'], ranges)
+            expected = io.BytesIO()
+            concat_flv(expected, [(io.BytesIO(mock_video), 0)])
+            with open(path, 'rb') as file:
+                self.assertEqual(expected.getvalue(), file.read())
+
+        self._run(_test)
+
+    def test_camera_get_video_resumes(self):
+        """Test asynchronous resume of an interrupted video download"""
+        mock_video = load_fixture('eagleeyenetworks.com',
+                                  'camera_video.flv', 'rb')
+        ranges = self._add_dropping_video(mock_video, [40000])
+
+        async def _test(local_session):
+            carson = self._carson(local_session)
+            await carson.update()
+            camera = next(iter(carson.first_building.cameras))
+
+            buffer = io.BytesIO()
+            await camera.get_video(buffer, timedelta(seconds=2),
+                                   datetime(2020, 1, 31, 23, 0, 0),
+                                   retries=1)
+
+            self.assertEqual(mock_video, buffer.getvalue())
+            self.assertEqual([None, 'bytes=40000-'], ranges)
+
+        self._run(_test)
+
+    def test_camera_stream_video(self):
+        """Test asynchronous chunked video streaming"""
+        mock_video = load_fixture('eagleeyenetworks.com',
+                                  'camera_video.flv', 'rb')
+        self.server.add('GET',
+                        self._een_url(EEN_GET_VIDEO_ENDPOINT.format('flv')),
+                        mock_video, content_type='video/x-flv')
+
+        async def _test(local_session):
+            carson = self._carson(local_session)
+            await carson.update()
+            camera = next(iter(carson.first_building.cameras))
+
+            chunks = []
+            async with camera.stream_video(
+                    timedelta(seconds=2), chunk_size=10000,
+                    align_tags=True) as stream:
+                async for chunk in stream:
+                    chunks.append(chunk)
+
+            self.assertEqual(mock_video, b''.join(chunks))
+            self.assertEqual(mock_video[:13], chunks[0])
+            self.assertEqual(len(chunks), stream.chunks_received)
+            self.assertTrue(stream.closed)
+
+        self._run(_test)
+
+    def test_camera_stream_video_cancel(self):
+        """Test asynchronous stream backpressure and cancellation"""
+        mock_video = b'\0' * (4 * 1024 * 1024)
+        self.server.add('GET',
+                        self._een_url(EEN_GET_VIDEO_ENDPOINT.format('flv')),
+                        mock_video, content_type='video/x-flv')
+
+        async def _test(local_session):
+            carson = self._carson(local_session)
+            await carson.update()
+            camera = next(iter(carson.first_building.cameras))
+
+            stream = camera.stream_video(timedelta(seconds=2),
+                                         chunk_size=1024,
+                                         max_buffered_chunks=2)
+            self.assertEqual(1024, len(await stream.__anext__()))
+            await asyncio.sleep(0.05)
+            # pylint: disable=protected-access
+            self.assertLessEqual(stream._queue.qsize(), 2)
+
+            await stream.aclose()
+            self.assertTrue(stream._task.cancelled())
+            async for _ in stream:
+                self.fail('Closed streams yield no chunks')
+
+        self._run(_test)
+
+    def test_snapshot_poller(self):
+        """Test asynchronous snapshot polling"""
+        mock_image = load_fixture('eagleeyenetworks.com',
+                                  'camera_image.jpeg', 'rb')
+        self.server.add('GET',
+                        self._een_url(EEN_GET_IMAGE_ENDPOINT.format('prev')),
+                        mock_image, content_type='image/jpeg')
+
+        async def _test(local_session):
+            carson = self._carson(local_session)
+            await carson.update()
+            camera = next(iter(carson.first_building.cameras))
+
+            frames = asyncio.Queue()
+            callbacks = []
+
+            async def _callback(frame):
+                callbacks.append(frame.camera_id)
+
+            async with AsyncSnapshotPoller(_callback, frames,
+                                           interval=0.01) as poller:
+                poller.add_camera(camera)
+                for _ in range(3):
+                    frame = await asyncio.wait_for(frames.get(), 5)
+                    self.assertEqual(mock_image, frame.data)
+
+            self.assertFalse(poller.running)
+            self.assertGreaterEqual(
+                poller.stats()[camera.entity_id].frames, 3)
+            self.assertIn(camera.entity_id, callbacks)
+
+        self._run(_test)
+
+    def test_snapshot_poller_readd_in_flight(self):
+        """Test re-added cameras are not polled twice at once"""
+        async def _test(local_session):
+            carson = self._carson(local_session)
+            await carson.update()
+            camera = next(iter(carson.first_building.cameras))
+            started = asyncio.Event()
+            release = asyncio.Event()
+            polls = []
+
+            async def _get_image(file, **_kwargs):
+                polls.append(file)
+                started.set()
+                await release.wait()
+                file.write(b'image')
+
+            camera.get_image = _get_image
+            frames = asyncio.Queue()
+
+            async with AsyncSnapshotPoller(frame_queue=frames,
+                                           interval=0.01) as poller:
+                poller.add_camera(camera)
+                await asyncio.wait_for(started.wait(), 5)
+                poller.add_camera(camera)
+                await asyncio.sleep(0.05)
+                self.assertEqual(1, len(polls))
+                release.set()
+                frame = await asyncio.wait_for(frames.get(), 5)
+                self.assertEqual(b'image', frame.data)
+
+        self._run(_test)
+
+    def test_camera_async_update(self):
+        """Test asynchronous camera payload update"""
+        self.server.add('GET', self._een_url(EEN_DEVICE_ENDPOINT),
+                        load_fixture('eagleeyenetworks.com',
+                                     'device_camera_update.json'))
+        e_mock_camera = json.loads(load_fixture(
+            'eagleeyenetworks.com', 'device_camera_update.json'))
+
+        async def _test(local_session):
+            carson = self._carson(local_session)
+            await carson.update()
+            camera = next(iter(carson.first_building.cameras))
+
+            await camera.async_update()
+
+            self.assertEqual(e_mock_camera['name'], camera.name)
+
+        self._run(_test)
+
+    def test_selective_building_update(self):
+        """Test asynchronous single building and camera updates"""
+        self.server.add('GET', self._een_url(EEN_DEVICE_ENDPOINT),
+                        load_fixture('eagleeyenetworks.com',
+                                     'device_camera.json'))
+
+        async def _test(local_session):
+            carson = self._carson(local_session)
+            await carson.update()
+            building = carson.first_building
+
+            calls = len(self.server.calls)
+            self.assertFalse(
+                await carson.update_building(building.entity_id))
+            # only /me/
+            self.assertEqual(calls + 1, len(self.server.calls))
+
+            diff = await building.update_camera('c0')
+            self.assertIn('eagleeye_camera_c0', diff.changed)
+            self.assertEqual(calls + 2, len(self.server.calls))
+            self.assertIn('camera_info',
+                          building.eagleeye_api.get_camera('c0')
+                          .entity_payload)
+
+        self._run(_test)
+
+    def test_eagleeye_retries_on_401(self):
+        """Test Eagle Eye session refresh on 401"""
+        self.server.add('GET', self._een_url(EEN_IS_AUTH_ENDPOINT),
+                        status=401)
+
+        async def _test(local_session):
+            carson = self._carson(local_session)
+            await carson.update()
+            eagle_eye = carson.first_building.eagleeye_api
+            session_url = C_API_URI + C_EEN_SESSION_ENDPOINT.format(
+                carson.first_building.entity_id)
+
+            self.assertFalse(await eagle_eye.check_auth())
+            self.assertEqual(2, self.server.call_count(
+                self._een_url(EEN_IS_AUTH_ENDPOINT)))
+            self.assertEqual(2, self.server.call_count(session_url))
+
+            with self.assertRaises(CarsonAPIError):
+                await eagle_eye.authenticated_query(
+                    EEN_API_URI + EEN_IS_AUTH_ENDPOINT, retry_auth=0)
+
+        self._run(_test)
+
+    def test_urls_match_sync_api(self):
+        """Asynchronous url generation shares the sync url mapping"""
+        async def _test(local_session):
+            carson = self._carson(local_session)
+            await carson.update()
+            camera = next(iter(carson.first_building.cameras))
+            sample_dt = datetime(2020, 1, 31, 23, 1, 3, 123456)
+
+            url = await camera.get_image_url(sample_dt, check_auth=False)
+
+            self.assertEqual(
+                EagleEyeCamera.get_image_url(camera, sample_dt,
+                                             check_auth=False),
+                url)
+            self.assertIn('A=', url)
+
+        self._run(_test)
+
+    def test_door_open(self):
+        """Test asynchronous door open"""
+        door_id = self.c_mock_me['properties'][0]['doors'][0]['id']
+        open_url = C_API_URI + C_DOOR_OPEN_ENDPOINT.format(door_id)
+        self.server.add(
+            'POST', open_url,
+            load_fixture('carson.live', 'carson_door_open.json'))
+
+        async def _test(local_session):
+            carson = self._carson(local_session)
+            await carson.update()
+            door = next(iter(carson.first_building.doors))
+            self.assertEqual(door_id, door.entity_id)
+
+            await door.open()
+
+            self.assertEqual(1, self.server.call_count(open_url))
+
+        self._run(_test)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""Eagle Eye asset index Module for Carson Living tests."""
+
+import json
+import unittest
+from datetime import datetime
+
+from carson_living import (CarsonError,
+                           EagleEyeAssetIndex,
+                           EagleEyeImageAsset,
+                           EEN_ASSET_REF_ASSET,
+                           EEN_ASSET_REF_AFTER,
+                           EEN_ASSET_REF_NEXT,
+                           EEN_ASSET_REF_PREV)
+from carson_living.timestamp import een_timestamp_to_millis
+
+from tests.helpers import load_fixture
+
+
+class TestEagleEyeAssetIndex(unittest.TestCase):
+    """Carson Living asset index test class."""
+
+    def setUp(self):
+        self.assets = [
+            EagleEyeImageAsset(a['s'], a['t'])
+            for a in json.loads(load_fixture('eagleeyenetworks.com',
+                                             'asset_list_image.json'))]
+        self.index = EagleEyeAssetIndex(self.assets)
+
+    def test_iteration_restores_assets(self):
+        """The index stores the assets losslessly"""
+        self.assertEqual(len(self.assets), len(self.index))
+        self.assertEqual(self.assets, list(self.index))
+        self.assertEqual(['THUMB', 'PRFR'], self.index.asset_types)
+
+    def test_find_asset_ref_semantics(self):
+        """prev / next / after / asset lookups"""
+        exact = datetime(2020, 1, 31, 23, 0, 2, 13000)
+        between = datetime(2020, 1, 31, 23, 0, 2, 500000)
+
+        self.assertEqual(self.assets[2],
+                         self.index.find(exact, EEN_ASSET_REF_PREV))
+        self.assertEqual(self.assets[2],
+                         self.index.find(between, EEN_ASSET_REF_PREV))
+        self.assertEqual(self.assets[2],
+                         self.index.find(exact, EEN_ASSET_REF_NEXT))
+        self.assertEqual(self.assets[3],
+                         self.index.find(between, EEN_ASSET_REF_NEXT))
+        self.assertEqual(self.assets[3],
+                         self.index.find(exact, EEN_ASSET_REF_AFTER))
+        self.assertEqual(self.assets[2],
+                         self.index.find(exact, EEN_ASSET_REF_ASSET))
+        self.assertIsNone(self.index.find(between, EEN_ASSET_REF_ASSET))
+
+    def test_find_out_of_range(self):
+        """Lookups before the first and after the last image"""
+        before = datetime(2020, 1, 31, 22, 0, 0)
+        after = datetime(2020, 2, 1, 0, 0, 0)
+
+        self.assertIsNone(self.index.find(before, EEN_ASSET_REF_PREV))
+        self.assertEqual(self.assets[0],
+                         self.index.find(before, EEN_ASSET_REF_NEXT))
+        self.assertEqual(self.assets[-1],
+                         self.index.find(after, EEN_ASSET_REF_PREV))
+        self.assertIsNone(self.index.find(after, EEN_ASSET_REF_NEXT))
+        self.assertIsNone(self.index.find(after, EEN_ASSET_REF_ASSET))
+        self.assertIsNone(EagleEyeAssetIndex().find(after))
+
+    def test_find_by_asset_type_and_millis(self):
+        """Lookups can be restricted to an asset type"""
+        millis = een_timestamp_to_millis(self.assets[4].timestamp)
+
+        self.assertEqual(self.assets[3],
+                         self.index.find(millis, asset_type='THUMB'))
+        self.assertEqual(self.assets[4],
+                         self.index.find(millis, asset_type='PRFR'))
+        self.assertEqual(self.assets[6], self.index.find(
+            millis, EEN_ASSET_REF_AFTER, asset_type='THUMB'))
+        self.assertIsNone(self.index.find(millis, asset_type='PVID'))
+
+    def test_find_unknown_asset_ref_raises(self):
+        """Unknown asset references raise CarsonError"""
+        with self.assertRaises(CarsonError):
+            self.index.find(datetime(2020, 1, 31), 'latest')
+
+    def test_between(self):
+        """Range queries exclude the end"""
+        self.assertEqual(self.assets[2:4], list(self.index.between(
+            datetime(2020, 1, 31, 23, 0, 2),
+            datetime(2020, 1, 31, 23, 0, 4, 11000))))
+
+    def test_extend_out_of_order(self):
+        """Assets added out of order are sorted"""
+        index = EagleEyeAssetIndex(self.assets[4:])
+        index.extend(reversed(self.assets[:4]))
+
+        self.assertEqual(self.assets, list(index))
+        self.assertEqual(self.assets[1], index.find(
+            datetime(2020, 1, 31, 23, 0, 1, 500000)))
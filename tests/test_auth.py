@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 """Authentication Module for Carson Living tests."""
 
+import threading
 import unittest
 import requests_mock
 
@@ -11,6 +12,7 @@ except ImportError:
     from mock import Mock
 
 from carson_living import (CarsonAuth,
+                           create_http_session,
                            CarsonAPIError,
                            CarsonTokenError,
                            CarsonCommunicationError,
@@ -197,3 +199,154 @@ class TestCarsonAuth(unittest.TestCase):
             auth.authenticated_query(query_url)
 
         self.assertTrue(mock.called)
+
+    @requests_mock.Mocker()
+    def test_query_uses_injected_http_session(self, mock):
+        """Test that queries are routed through the injected session"""
+        query_url = 'https://api.carson.live/api/v1.4.4/me/'
+        mock.get(query_url,
+                 text=load_fixture('carson.live', 'carson_me.json'))
+
+        token, _ = get_encoded_token()
+        session = create_http_session()
+        session.request = Mock(wraps=session.request)
+
+        auth = CarsonAuth(USERNAME, PASSWORD, token, http_session=session)
+        auth.authenticated_query(query_url)
+        auth.authenticated_query(query_url)
+
+        self.assertIs(session, auth.http_session)
+        self.assertEqual(2, session.request.call_count)
+        self.assertEqual(2, mock.call_count)
+
+    def test_create_http_session_pool_sizes(self):
+        """Test pool configuration of the default http session"""
+        session = create_http_session(
+            pool_maxsize=4,
+            host_pool_maxsize={'https://api.carson.live': 2})
+
+        default_adapter = session.get_adapter('https://c000.eagleeye.com')
+        host_adapter = session.get_adapter('https://api.carson.live/api/')
+
+        # pylint: disable=protected-access
+        self.assertEqual(4, default_adapter._pool_maxsize)
+        self.assertEqual(2, host_adapter._pool_maxsize)
+
+    def _run_concurrent_queries(self, auth, query_url, thread_count=32):
+        start = threading.Event()
+        errors = []
+
+        def _query():
+            start.wait(5)
+            try:
+                auth.authenticated_query(query_url)
+            except Exception as error:  # pylint: disable=broad-except
+                errors.append(error)
+
+        threads = [threading.Thread(target=_query)
+                   for _ in range(thread_count)]
+        for thread in threads:
+            thread.start()
+        start.set()
+        for thread in threads:
+            thread.join(10)
+
+        self.assertEqual([], errors)
+
+    @requests_mock.Mocker()
+    def test_concurrent_expired_token_single_login(self, mock):
+        """Many threads with an expired token trigger exactly one login"""
+        login_text = load_fixture('carson.live', 'carson_login.json')
+
+        def _slow_login(_request, _context):
+            threading.Event().wait(0.05)
+            return login_text
+
+        login = mock.post('https://api.carson.live/api/v1.4.4/auth/login/',
+                          text=_slow_login)
+        query_url = 'https://api.carson.live/api/v1.4.4/me/'
+        query = mock.get(query_url,
+                         text=load_fixture('carson.live', 'carson_me.json'))
+        token, _ = get_encoded_token(-60)
+        mock_token_update_cb = Mock()
+        auth = CarsonAuth(USERNAME, PASSWORD, token, mock_token_update_cb)
+
+        self._run_concurrent_queries(auth, query_url)
+
+        self.assertEqual(1, login.call_count)
+        self.assertEqual(32, query.call_count)
+        mock_token_update_cb.assert_called_once_with(FIXTURE_TOKEN)
+        for request in query.request_history:
+            self.assertEqual('JWT {}'.format(FIXTURE_TOKEN),
+                             request.headers.get('Authorization'))
+
+    @requests_mock.Mocker()
+    def test_concurrent_401_single_login(self, mock):
+        """Many threads rejected with 401 trigger exactly one login"""
+        login = mock.post('https://api.carson.live/api/v1.4.4/auth/login/',
+                          text=load_fixture('carson.live',
+                                            'carson_login.json'))
+        me_text = load_fixture('carson.live', 'carson_me.json')
+
+        def _me(request, context):
+            threading.Event().wait(0.01)
+            if request.headers.get('Authorization') \
+                    != 'JWT {}'.format(FIXTURE_TOKEN):
+                context.status_code = 401
+                return ''
+            return me_text
+
+        query_url = 'https://api.carson.live/api/v1.4.4/me/'
+        mock.get(query_url, text=_me)
+        token, _ = get_encoded_token()
+        auth = CarsonAuth(USERNAME, PASSWORD, token)
+
+        self._run_concurrent_queries(auth, query_url)
+
+        self.assertEqual(1, login.call_count)
+        self.assertEqual(FIXTURE_TOKEN, auth.token)
+
+    def _wait_for_renewals(self, renewal, count=1):
+        for _ in range(500):
+            if renewal.renewals >= count:
+                return
+            threading.Event().wait(0.01)
+        self.fail('renewal did not run')
+
+    @requests_mock.Mocker()
+    def test_token_renewal_before_expiry(self, mock):
+        """Tokens within the renewal margin are renewed in the background"""
+        login = mock.post('https://api.carson.live/api/v1.4.4/auth/login/',
+                          text=load_fixture('carson.live',
+                                            'carson_login.json'))
+        token, _ = get_encoded_token(600)
+        mock_token_update_cb = Mock()
+        auth = CarsonAuth(USERNAME, PASSWORD, token, mock_token_update_cb)
+
+        renewal = auth.start_token_renewal(margin=900)
+        try:
+            self._wait_for_renewals(renewal)
+        finally:
+            auth.stop_token_renewal()
+
+        self.assertFalse(renewal.running)
+        self.assertEqual(1, login.call_count)
+        self.assertEqual(FIXTURE_TOKEN, auth.token)
+        mock_token_update_cb.assert_called_once_with(FIXTURE_TOKEN)
+
+    @requests_mock.Mocker()
+    def test_token_renewal_waits_for_margin(self, mock):
+        """Tokens outside of the renewal margin are not renewed"""
+        login = mock.post('https://api.carson.live/api/v1.4.4/auth/login/',
+                          text=load_fixture('carson.live',
+                                            'carson_login.json'))
+        token, _ = get_encoded_token(600)
+        auth = CarsonAuth(USERNAME, PASSWORD, token)
+
+        renewal = auth.start_token_renewal(margin=60)
+        threading.Event().wait(0.05)
+        auth.stop_token_renewal()
+
+        self.assertEqual(0, renewal.renewals)
+        self.assertFalse(login.called)
+        self.assertEqual(token, auth.token)
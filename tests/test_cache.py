@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""Snapshot cache Module for Carson Living tests."""
+
+import unittest
+
+# 2.7 support fallback
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+from carson_living import SnapshotCache
+
+
+class TestSnapshotCache(unittest.TestCase):
+    """Carson Living snapshot cache test class."""
+
+    def test_hit_and_miss_counters(self):
+        """Test cache hits and misses"""
+        cache = SnapshotCache()
+        key = SnapshotCache.key('c0', '20200131230103.123', 'asset', 'all')
+
+        self.assertIsNone(cache.get(key))
+        cache.put(key, b'image')
+
+        self.assertEqual(b'image', cache.get(key))
+        self.assertEqual(b'image', cache.get(key))
+        self.assertEqual(
+            {'hits': 2, 'misses': 1, 'evictions': 0,
+             'entries': 1, 'size': 5},
+            cache.stats())
+
+    @patch('carson_living.cache.time')
+    def test_live_images_expire(self, mock_time):
+        """Live images expire after live_ttl, historic ones do not"""
+        mock_time.time.return_value = 1000.0
+        cache = SnapshotCache(live_ttl=1.0)
+        live_key = SnapshotCache.key('c0', 'now', 'prev', 'pre')
+        historic_key = SnapshotCache.key('c0', '20200131230103.123',
+                                         'prev', 'pre')
+        cache.put(live_key, b'live')
+        cache.put(historic_key, b'historic')
+
+        mock_time.time.return_value = 1000.5
+        self.assertEqual(b'live', cache.get(live_key))
+
+        mock_time.time.return_value = 1001.0
+        self.assertIsNone(cache.get(live_key))
+        self.assertEqual(b'historic', cache.get(historic_key))
+
+        mock_time.time.return_value = 10 ** 9
+        self.assertEqual(b'historic', cache.get(historic_key))
+        self.assertEqual(8, cache.size)
+
+    def test_lru_eviction_by_size(self):
+        """Least recently used images are evicted to stay within bounds"""
+        cache = SnapshotCache(max_bytes=10)
+        keys = [SnapshotCache.key('c{}'.format(i), '1', 'asset', 'all')
+                for i in range(3)]
+
+        cache.put(keys[0], b'0000')
+        cache.put(keys[1], b'1111')
+        # touch 0, so 1 becomes least recently used
+        cache.get(keys[0])
+        cache.put(keys[2], b'2222')
+
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertEqual(b'0000', cache.get(keys[0]))
+        self.assertEqual(b'2222', cache.get(keys[2]))
+        self.assertEqual(1, cache.evictions)
+        self.assertEqual(8, cache.size)
+
+    def test_oversized_images_are_not_cached(self):
+        """Images larger than the cache are skipped"""
+        cache = SnapshotCache(max_bytes=4)
+        key = SnapshotCache.key('c0', '1', 'asset', 'all')
+
+        cache.put(key, b'12345')
+
+        self.assertEqual(0, len(cache))
+        self.assertEqual(0, cache.size)
@@ -1,17 +1,35 @@
 # -*- coding: utf-8 -*-
 """Carson API Module for Carson Living tests."""
 import io
+import os
+import shutil
+import tempfile
+import threading
 from datetime import datetime
 from datetime import timedelta
 
 import requests_mock
 
 from carson_living import (EagleEyeCamera,
+                           EagleEyeImageAsset,
+                           EagleEyeVideoAsset,
+                           EagleEye,
+                           CarsonAggregateError,
                            CarsonAPIError,
+                           SnapshotCache,
                            EEN_VIDEO_FORMAT_MP4)
 
+from carson_living.const import (EEN_API_URI,
+                                 EEN_GET_IMAGE_ENDPOINT,
+                                 EEN_GET_VIDEO_ENDPOINT,
+                                 EEN_IS_AUTH_ENDPOINT,
+                                 EEN_LIST_IMAGE_ENDPOINT)
+from carson_living.flv import concat_flv
+
 from tests.test_base import CarsonUnitTestBase
-from tests.helpers import (setup_ee_camera_mock,
+from tests.helpers import (page_asset_list,
+                           setup_ee_camera_mock,
+                           setup_ee_asset_list_mocks,
                            setup_ee_image_mock,
                            setup_ee_video_mock)
 
@@ -75,6 +93,20 @@ class TestCamera(CarsonUnitTestBase):
 
         self.assertEqual(e_mock_camera['name'], first_camera.name)
 
+    @requests_mock.Mocker()
+    def test_api_call_back_update_unchanged(self, mock):
+        """Test repeated equal camera payloads are skipped"""
+        subdomain = self.c_mock_esession['activeBrandSubdomain']
+        setup_ee_camera_mock(mock, subdomain, 'device_camera_update.json')
+
+        first_camera = next(iter(self.first_building.cameras))
+        self.assertTrue(first_camera.update())
+        payload = first_camera.entity_payload
+
+        self.assertFalse(first_camera.update())
+        self.assertIs(payload, first_camera.entity_payload)
+        self.assertEqual(2, mock.call_count)
+
     @requests_mock.Mocker()
     def test_payload_and_api_init_are_equal(self, mock):
         """Test equal initialization class methods"""
@@ -267,3 +299,327 @@ class TestCamera(CarsonUnitTestBase):
 
         self.assertIsNone(url_live)
         self.first_building.eagleeye_api.check_auth.assert_called_with()
+
+    @requests_mock.Mocker()
+    def test_building_get_images(self, mock):
+        """Test bulk image download of all building cameras"""
+        subdomain = self.c_mock_esession['activeBrandSubdomain']
+        mock_image = setup_ee_image_mock(mock, subdomain)
+
+        buffers = {c.entity_id: io.BytesIO()
+                   for c in self.first_building.cameras}
+        # camera known to Eagle Eye, but not part of the building
+        buffers['c7'] = io.BytesIO()
+
+        errors = self.first_building.get_images(buffers)
+
+        self.assertEqual(['c7'], list(errors))
+        self.assertEqual(2, mock.call_count)
+        for camera in self.first_building.cameras:
+            self.assertEqual(mock_image, buffers[camera.entity_id].getvalue())
+
+    @requests_mock.Mocker()
+    def test_camera_get_image_cached(self, mock):
+        """Repeated image requests are served from the snapshot cache"""
+        subdomain = self.c_mock_esession['activeBrandSubdomain']
+        mock_image = setup_ee_image_mock(mock, subdomain)
+        cache = SnapshotCache()
+        eagle_eye = EagleEye(
+            lambda: (self.c_mock_esession['sessionId'], subdomain),
+            snapshot_cache=cache)
+        camera = EagleEyeCamera.from_list_payload(
+            eagle_eye, self.e_mock_device_list[0])
+        sample_dt = datetime(2020, 1, 31, 23, 1, 3, 123456)
+
+        for _ in range(3):
+            buffer = io.BytesIO()
+            self.assertIsNone(camera.get_image(buffer, sample_dt))
+            self.assertEqual(mock_image, buffer.getvalue())
+
+        # different asset class is a different image
+        camera.get_image(io.BytesIO(), sample_dt, asset_class='thumb')
+
+        self.assertEqual(2, mock.call_count)
+        self.assertEqual(2, cache.hits)
+        self.assertEqual(2, cache.misses)
+
+    @requests_mock.Mocker()
+    def test_camera_get_image_coalesced(self, mock):
+        """Concurrent requests for the same image share one download"""
+        subdomain = self.c_mock_esession['activeBrandSubdomain']
+        mock_image = setup_ee_image_mock(mock, subdomain)
+        release = threading.Event()
+
+        def _slow_image(_request, _context):
+            release.wait(5)
+            return mock_image
+
+        mock.get(EEN_API_URI.format(subdomain)
+                 + EEN_GET_IMAGE_ENDPOINT.format('prev'),
+                 content=_slow_image)
+        eagle_eye = EagleEye(
+            lambda: (self.c_mock_esession['sessionId'], subdomain),
+            coalesce_requests=True)
+        camera = EagleEyeCamera.from_list_payload(
+            eagle_eye, self.e_mock_device_list[0])
+        sample_dt = datetime(2020, 1, 31, 23, 1, 3, 123456)
+        buffers = [io.BytesIO() for _ in range(4)]
+
+        threads = [threading.Thread(target=camera.get_image,
+                                    args=(buffer, sample_dt))
+                   for buffer in buffers]
+        for thread in threads:
+            thread.start()
+        while eagle_eye.single_flight.stats()['coalesced'] < 3:
+            threading.Event().wait(0.001)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(1, mock.call_count)
+        for buffer in buffers:
+            self.assertEqual(mock_image, buffer.getvalue())
+
+    @requests_mock.Mocker()
+    def test_camera_urls_skip_auth_check_in_trust_window(self, mock):
+        """Url generation is local while the session is trusted"""
+        subdomain = self.c_mock_esession['activeBrandSubdomain']
+        is_auth = mock.get(EEN_API_URI.format(subdomain)
+                           + EEN_IS_AUTH_ENDPOINT, text='{}')
+        eagle_eye = EagleEye(
+            lambda: (self.c_mock_esession['sessionId'], subdomain),
+            session_trust_window=60)
+        camera = EagleEyeCamera.from_list_payload(
+            eagle_eye, self.e_mock_device_list[0])
+
+        for _ in range(10):
+            self.assertIn('A=', camera.get_image_url())
+            self.assertIn('A=', camera.get_video_url(timedelta(seconds=30)))
+
+        # only the very first check queries (and fetches) the session
+        self.assertEqual(1, is_auth.call_count)
+        self.assertEqual(19, eagle_eye.auth_checks_avoided)
+
+    @requests_mock.Mocker()
+    def test_camera_list_images_pages_lazily(self, mock):
+        """Images are listed page by page as the generator is consumed"""
+        subdomain = self.c_mock_esession['activeBrandSubdomain']
+        image_list, _ = setup_ee_asset_list_mocks(mock, subdomain)
+        start = datetime(2020, 1, 31, 23, 0, 0)
+
+        images = self.first_camera.list_images(
+            start, start + timedelta(minutes=1), page_size=3)
+        self.assertEqual(0, mock.call_count)
+
+        first = next(images)
+        self.assertEqual(
+            EagleEyeImageAsset(image_list[0]['s'], image_list[0]['t']),
+            first)
+        self.assertEqual(1, mock.call_count)
+
+        rest = list(images)
+        self.assertEqual([i['s'] for i in image_list],
+                         [first.timestamp] + [i.timestamp for i in rest])
+        # 7 images in pages of 3, overlapping by the last image
+        self.assertEqual(4, mock.call_count)
+
+        params = mock.last_request.qs
+        self.assertEqual([self.first_camera.entity_id.lower()],
+                         params['id'])
+        self.assertEqual(['20200131230006.014'], params['start_timestamp'])
+        self.assertEqual(['20200131230100.000'], params['end_timestamp'])
+        self.assertEqual(['all'], params['asset_class'])
+        self.assertEqual(['3'], params['count'])
+
+    @requests_mock.Mocker()
+    def test_camera_list_images_full_last_page(self, mock):
+        """A full last page is followed by a single empty page"""
+        subdomain = self.c_mock_esession['activeBrandSubdomain']
+        image_list, _ = setup_ee_asset_list_mocks(mock, subdomain)
+        start = datetime(2020, 1, 31, 23, 0, 0)
+
+        images = list(self.first_camera.list_images(
+            start, start + timedelta(minutes=1), page_size=7))
+
+        self.assertEqual(len(image_list), len(images))
+        self.assertEqual(2, mock.call_count)
+
+    @requests_mock.Mocker()
+    def test_camera_list_images_page_boundary_millisecond(self, mock):
+        """Images sharing the millisecond of a page boundary are listed"""
+        subdomain = self.c_mock_esession['activeBrandSubdomain']
+        image_list = [{'t': 'PRFR', 's': '20200131230000.012'},
+                      {'t': 'PRFR', 's': '20200131230000.500'},
+                      {'t': 'PRFR', 's': '20200131230001.015'},
+                      {'t': 'THUMB', 's': '20200131230001.015'},
+                      {'t': 'PRFR', 's': '20200131230002.013'}]
+        mock.get(EEN_API_URI.format(subdomain) + EEN_LIST_IMAGE_ENDPOINT,
+                 json=lambda request, _: page_asset_list(
+                     image_list, {k: v[0] for k, v in request.qs.items()}))
+        start = datetime(2020, 1, 31, 23, 0, 0)
+
+        images = list(self.first_camera.list_images(
+            start, start + timedelta(minutes=1), page_size=3))
+
+        self.assertEqual([EagleEyeImageAsset(i['s'], i['t'])
+                          for i in image_list], images)
+        self.assertEqual(
+            [['20200131230000.000'], ['20200131230001.015'],
+             ['20200131230002.013']],
+            [r.qs['start_timestamp'] for r in mock.request_history])
+
+    @requests_mock.Mocker()
+    def test_camera_list_images_full_page_millisecond(self, mock):
+        """A page full of a single millisecond does not repeat forever"""
+        subdomain = self.c_mock_esession['activeBrandSubdomain']
+        image_list = [{'t': 'PRFR', 's': '20200131230001.015'},
+                      {'t': 'THUMB', 's': '20200131230001.015'},
+                      {'t': 'PRFR', 's': '20200131230002.013'}]
+        mock.get(EEN_API_URI.format(subdomain) + EEN_LIST_IMAGE_ENDPOINT,
+                 json=lambda request, _: page_asset_list(
+                     image_list, {k: v[0] for k, v in request.qs.items()}))
+        start = datetime(2020, 1, 31, 23, 0, 0)
+
+        images = list(self.first_camera.list_images(
+            start, start + timedelta(minutes=1), page_size=2))
+
+        self.assertEqual([EagleEyeImageAsset(i['s'], i['t'])
+                          for i in image_list], images)
+        self.assertEqual('20200131230001.016',
+                         mock.last_request.qs['start_timestamp'][0])
+
+    @requests_mock.Mocker()
+    def test_camera_list_videos(self, mock):
+        """Videos within the time range are listed"""
+        subdomain = self.c_mock_esession['activeBrandSubdomain']
+        _, video_list = setup_ee_asset_list_mocks(mock, subdomain)
+        start = datetime(2020, 1, 31, 23, 0, 0)
+
+        videos = list(self.first_camera.list_videos(
+            start, start + timedelta(minutes=2), page_size=1))
+
+        self.assertEqual(
+            [EagleEyeVideoAsset(v['s'], v['e']) for v in video_list[:2]],
+            videos)
+        self.assertNotIn('asset_class', mock.last_request.qs)
+
+    @requests_mock.Mocker()
+    def test_camera_build_asset_index(self, mock):
+        """The asset index is built from all pages of the image list"""
+        subdomain = self.c_mock_esession['activeBrandSubdomain']
+        image_list, _ = setup_ee_asset_list_mocks(mock, subdomain)
+        start = datetime(2020, 1, 31, 23, 0, 0)
+
+        index = self.first_camera.build_asset_index(
+            start, start + timedelta(minutes=1), page_size=2)
+
+        self.assertEqual(7, mock.call_count)
+        self.assertEqual([EagleEyeImageAsset(i['s'], i['t'])
+                          for i in image_list], list(index))
+
+    def _setup_export_mock(self, mock, failures=None):
+        """Serve the FLV fixture, failing a number of times per segment
+
+        Args:
+            mock: requests_mock mock
+            failures: dict of start_timestamp to number of 500 replies
+
+        Returns: (binary video, list of requested start timestamps)
+        """
+        subdomain = self.c_mock_esession['activeBrandSubdomain']
+        mock_video = setup_ee_video_mock(mock, subdomain)
+        failures = dict(failures or {})
+        requested = []
+        lock = threading.Lock()
+
+        def _video(request, context):
+            start_ts = request.qs['start_timestamp'][0]
+            with lock:
+                requested.append(start_ts)
+                if failures.get(start_ts, 0) > 0:
+                    failures[start_ts] -= 1
+                    context.status_code = 500
+                    return b''
+            return mock_video
+
+        mock.get(EEN_API_URI.format(subdomain)
+                 + EEN_GET_VIDEO_ENDPOINT.format('flv'), content=_video)
+        return mock_video, requested
+
+    def _export_path(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        return os.path.join(directory, 'export.flv')
+
+    @requests_mock.Mocker()
+    def test_camera_export_video(self, mock):
+        """Segments are downloaded and joined in order"""
+        mock_video, requested = self._setup_export_mock(mock)
+        path = self._export_path()
+        start = datetime(2020, 1, 31, 23, 0, 0)
+
+        self.first_camera.export_video(
+            path, start, timedelta(minutes=25),
+            segment_length=timedelta(minutes=10), max_workers=3)
+
+        self.assertEqual(['20200131230000.000', '20200131231000.000',
+                          '20200131232000.000'], sorted(requested))
+        self.assertIn('end_timestamp=20200131232500.000',
+                      [r.query for r in mock.request_history
+                       if 'start_timestamp=20200131232000.000'
+                       in r.query][0])
+
+        expected = io.BytesIO()
+        concat_flv(expected, [(io.BytesIO(mock_video), 0),
+                              (io.BytesIO(mock_video), 600000),
+                              (io.BytesIO(mock_video), 1200000)])
+        with open(path, 'rb') as file:
+            self.assertEqual(expected.getvalue(), file.read())
+        self.assertEqual(['export.flv'],
+                         os.listdir(os.path.dirname(path)))
+
+    @requests_mock.Mocker()
+    def test_camera_export_video_retries_segment(self, mock):
+        """Only the failed segment is requested again"""
+        _, requested = self._setup_export_mock(
+            mock, {'20200131231000.000': 2})
+        path = self._export_path()
+
+        self.first_camera.export_video(
+            path, datetime(2020, 1, 31, 23, 0, 0), timedelta(minutes=30),
+            segment_length=timedelta(minutes=10), retries=2,
+            retry_delay=0)
+
+        self.assertEqual(5, len(requested))
+        self.assertEqual(3, requested.count('20200131231000.000'))
+        self.assertTrue(os.path.exists(path))
+
+    @requests_mock.Mocker()
+    def test_camera_export_video_resumes(self, mock):
+        """A failed export keeps finished parts and resumes from them"""
+        failed_ts = '20200131231000.000'
+        _, requested = self._setup_export_mock(mock, {failed_ts: 2})
+        path = self._export_path()
+        start = datetime(2020, 1, 31, 23, 0, 0)
+
+        with self.assertRaises(CarsonAggregateError) as context:
+            self.first_camera.export_video(
+                path, start, timedelta(minutes=30),
+                segment_length=timedelta(minutes=10), retries=1,
+                retry_delay=0)
+
+        self.assertEqual([start + timedelta(minutes=10)],
+                         list(context.exception.errors))
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(2, len([f for f in os.listdir(
+            os.path.dirname(path)) if f.endswith('.part')]))
+
+        del requested[:]
+        self.first_camera.export_video(
+            path, start, timedelta(minutes=30),
+            segment_length=timedelta(minutes=10), retries=1,
+            retry_delay=0)
+
+        self.assertEqual([failed_ts], requested)
+        self.assertEqual(['export.flv'],
+                         os.listdir(os.path.dirname(path)))
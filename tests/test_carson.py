@@ -3,6 +3,17 @@
 
 import requests_mock
 
+from carson_living import (Carson,
+                           CarsonAggregateError,
+                           CarsonError,
+                           CredentialStore)
+from carson_living.const import (C_API_URI,
+                                 C_AUTH_ENDPOINT,
+                                 C_EEN_SESSION_ENDPOINT)
+
+from tests.const import (USERNAME, PASSWORD)
+from tests.helpers import (load_fixture,
+                           setup_ee_camera_mock)
 from tests.test_base import CarsonUnitTestBase
 
 
@@ -192,3 +203,209 @@ class TestCarson(CarsonUnitTestBase):
 
         # Door deleted, changed, added
         self.assertEqual(4, len(self.first_building.doors))
+
+    @requests_mock.Mocker()
+    def test_unchanged_carson_update_is_skipped(self, mock):
+        """Unchanged payloads neither update entities nor query Eagle Eye"""
+        self._init_default_mocks(mock, 'carson_me.json')
+
+        diff = self.carson.update()
+
+        self.assertFalse(diff)
+        # only /me/, no Eagle Eye session or device list
+        self.assertEqual(1, mock.call_count)
+
+    @requests_mock.Mocker()
+    def test_carson_update_returns_diff(self, mock):
+        """Update reports added, removed and changed entities"""
+        self._init_default_mocks(mock, 'carson_me_update.json')
+
+        diff = self.carson.update()
+
+        building_id = self.first_building.unique_entity_id
+        self.assertIn('carson_building_3382', diff.added)
+        self.assertIn('name', diff.changed[building_id])
+        self.assertIn('firstName',
+                      diff.changed[self.carson.user.unique_entity_id])
+        self.assertIn('carson_door_23', diff.removed)
+        self.assertIn('carson_door_24', diff.added)
+        self.assertIn('carson_door_25', diff.added)
+        self.assertNotIn('carson_door_21', diff.added)
+
+    @requests_mock.Mocker()
+    def test_update_building_only_touches_building(self, mock):
+        """Single building updates leave the user and others alone"""
+        self._init_default_mocks(mock, 'carson_me_update.json')
+        first_name = self.carson.user.first_name
+        other_id = self.c_mock_me['properties'][1]['id']
+
+        diff = self.carson.update_building(self.first_building.entity_id)
+
+        self.assertIn('name', diff.changed[
+            self.first_building.unique_entity_id])
+        self.assertIn('carson_door_24', diff.added)
+        self.assertEqual(first_name, self.carson.user.first_name)
+        self.assertEqual(1, len(self.carson.buildings))
+        self.assertEqual(3, len(self.first_building.cameras))
+        self.assertFalse(any(
+            r.url == C_API_URI + C_EEN_SESSION_ENDPOINT.format(other_id)
+            for r in mock.request_history))
+
+    @requests_mock.Mocker()
+    def test_update_building_unchanged(self, mock):
+        """Unchanged single buildings only query /me/"""
+        self._init_default_mocks(mock, 'carson_me.json')
+
+        self.assertFalse(
+            self.carson.update_building(self.first_building.entity_id))
+        self.assertEqual(1, mock.call_count)
+
+        with self.assertRaises(CarsonError):
+            self.carson.update_building(-1)
+
+    @requests_mock.Mocker()
+    def test_update_building_camera(self, mock):
+        """Single cameras are updated via their device payload"""
+        e_mock_camera = setup_ee_camera_mock(
+            mock, self.c_mock_esession['activeBrandSubdomain'])
+
+        diff = self.first_building.update_camera(e_mock_camera['id'])
+
+        self.assertEqual(1, mock.call_count)
+        camera = self.first_building.eagleeye_api.get_camera(
+            e_mock_camera['id'])
+        self.assertIn('camera_info', diff.changed[camera.unique_entity_id])
+        self.assertIn(camera, self.first_building.cameras)
+        self.assertEqual(e_mock_camera, camera.entity_payload)
+
+    def test_api_shares_http_session(self):
+        """All API objects share the same pooled http session"""
+        self.assertIsNotNone(self.carson.http_session)
+        for building in self.carson.buildings:
+            self.assertIs(self.carson.http_session,
+                          building.eagleeye_api.http_session)
+
+    @requests_mock.Mocker()
+    def test_concurrent_update_initializes_buildings(self, mock):
+        """Buildings are initialized concurrently with max_workers"""
+        self._init_default_mocks(mock, 'carson_me_update.json')
+
+        carson = Carson(USERNAME, PASSWORD, self.token, max_workers=4)
+
+        self.assertEqual(
+            [p['id'] for p in self.c_mock_me['properties']],
+            sorted(b.entity_id for b in carson.buildings))
+        self.assertEqual(3, len(carson.first_building.cameras))
+
+    @requests_mock.Mocker()
+    def test_concurrent_update_aggregates_errors(self, mock):
+        """Failing buildings do not abort the concurrent update"""
+        with requests_mock.Mocker() as init_mock:
+            self._init_default_mocks(init_mock, 'carson_me.json')
+            carson = Carson(USERNAME, PASSWORD, self.token, max_workers=4)
+
+        self._init_default_mocks(mock, 'carson_me_update.json')
+        failing_id = self.c_mock_me['properties'][1]['id']
+        mock.get(C_API_URI + C_EEN_SESSION_ENDPOINT.format(failing_id),
+                 status_code=500)
+
+        with self.assertRaises(CarsonAggregateError) as context:
+            carson.update()
+
+        self.assertEqual([failing_id], list(context.exception.errors))
+        # the other building was updated nevertheless
+        self.assertEqual(1, len(carson.buildings))
+        self.assertEqual(3, len(carson.first_building.cameras))
+
+    @requests_mock.Mocker()
+    def test_failed_update_reports_partial_diff(self, mock):
+        """The diff of the applied parts is attached to the error"""
+        self._init_default_mocks(mock, 'carson_me_update.json')
+        failing_id = self.c_mock_me['properties'][1]['id']
+        mock.get(C_API_URI + C_EEN_SESSION_ENDPOINT.format(failing_id),
+                 status_code=500)
+
+        with self.assertRaises(CarsonError) as context:
+            self.carson.update()
+
+        self.assertNotIsInstance(context.exception, CarsonAggregateError)
+        diff = context.exception.diff
+        self.assertIn(self.first_building.unique_entity_id, diff.changed)
+        self.assertIn('carson_door_24', diff.added)
+        self.assertIn(self.carson.user.unique_entity_id, diff.changed)
+
+    @requests_mock.Mocker()
+    def test_lazy_cameras_defer_eagleeye_discovery(self, mock):
+        """Lazy buildings only query /me/ during initialization"""
+        with requests_mock.Mocker() as init_mock:
+            self._init_default_mocks(init_mock, 'carson_me.json')
+            carson = Carson(USERNAME, PASSWORD, self.token,
+                            lazy_cameras=True)
+            self.assertEqual(1, init_mock.call_count)
+            self.assertEqual(3, len(carson.first_building.doors))
+
+        self._init_default_mocks(mock, 'carson_me.json')
+
+        self.assertEqual(2, len(carson.first_building.cameras))
+        # Eagle Eye session and device list
+        self.assertEqual(2, mock.call_count)
+
+        # Cameras are only discovered once
+        self.assertEqual(8, len(carson.first_building.eagleeye_api.cameras))
+        self.assertEqual(2, mock.call_count)
+
+    @requests_mock.Mocker()
+    def test_lazy_cameras_rediscovered_after_update(self, mock):
+        """A payload update marks lazily discovered cameras stale"""
+        with requests_mock.Mocker() as init_mock:
+            self._init_default_mocks(init_mock, 'carson_me.json')
+            carson = Carson(USERNAME, PASSWORD, self.token,
+                            lazy_cameras=True)
+            carson.first_building.update_cameras()
+            self.assertEqual(3, init_mock.call_count)
+
+        self._init_default_mocks(mock, 'carson_me_update.json')
+        carson.update()
+        self.assertEqual(1, mock.call_count)
+
+        self.assertEqual(3, len(carson.first_building.cameras))
+
+    @requests_mock.Mocker()
+    def test_credential_store_persists_credentials(self, mock):
+        """Token and Eagle Eye sessions are saved to the store"""
+        self._init_default_mocks(mock, 'carson_me.json')
+        mock.post(C_API_URI + C_AUTH_ENDPOINT,
+                  text=load_fixture('carson.live', 'carson_login.json'))
+        store = CredentialStore()
+
+        carson = Carson(USERNAME, PASSWORD, credential_store=store)
+
+        self.assertEqual(carson.token, store.load_token())
+        for building in carson.buildings:
+            self.assertEqual(
+                (self.c_mock_esession['sessionId'],
+                 self.c_mock_esession['activeBrandSubdomain']),
+                store.load_eagleeye_session(building.entity_id))
+
+    @requests_mock.Mocker()
+    def test_credential_store_warm_restart(self, mock):
+        """A warm restart neither logs in nor fetches Eagle Eye sessions"""
+        with requests_mock.Mocker() as init_mock:
+            self._init_default_mocks(init_mock, 'carson_me.json')
+            store = CredentialStore()
+            Carson(USERNAME, PASSWORD, self.token, credential_store=store)
+            store.save_token(self.token)
+
+        self._init_default_mocks(mock, 'carson_me.json')
+        login = mock.post(C_API_URI + C_AUTH_ENDPOINT, status_code=500)
+
+        carson = Carson(USERNAME, PASSWORD, credential_store=store)
+
+        session_urls = [C_API_URI + C_EEN_SESSION_ENDPOINT.format(b.entity_id)
+                        for b in carson.buildings]
+        self.assertEqual(self.token, carson.token)
+        self.assertFalse(login.called)
+        self.assertEqual(
+            [], [r.url for r in mock.request_history
+                 if r.url in session_urls])
+        self.assertEqual(2, len(carson.first_building.cameras))
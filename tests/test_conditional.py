@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""Conditional Request Module for Carson Living tests."""
+
+import unittest
+
+import requests_mock
+
+# 2.7 support fallback
+try:
+    from unittest.mock import Mock
+except ImportError:
+    from mock import Mock
+
+from carson_living import (Carson,
+                           CarsonAggregateError,
+                           CarsonCommunicationError,
+                           ConditionalCache,
+                           EagleEye)
+from carson_living.conditional import NOT_MODIFIED
+from carson_living.const import (C_API_URI,
+                                 C_ME_ENDPOINT,
+                                 C_EEN_SESSION_ENDPOINT,
+                                 EEN_API_URI,
+                                 EEN_DEVICE_LIST_ENDPOINT)
+
+from tests.const import (USERNAME, PASSWORD)
+from tests.test_base import CarsonUnitTestBase
+from tests.helpers import load_fixture
+
+
+class TestConditionalCarson(CarsonUnitTestBase):
+    """Carson Living conditional /me/ query test class."""
+
+    def setUp(self):
+        super(TestConditionalCarson, self).setUp()
+        self.me_url = C_API_URI + C_ME_ENDPOINT
+        self.me_txt = load_fixture('carson.live', 'carson_me.json')
+
+        with requests_mock.Mocker() as mock:
+            self._init_default_mocks(mock, 'carson_me.json')
+            mock.get(self.me_url, text=self.me_txt,
+                     headers={'ETag': '"v1"'})
+            self.conditional = Carson(USERNAME, PASSWORD, self.token,
+                                      conditional_requests=True)
+
+    @requests_mock.Mocker()
+    def test_not_modified_skips_update(self, mock):
+        """304 responses neither update entities nor query Eagle Eye"""
+        mock.get(self.me_url, status_code=304)
+
+        diff = self.conditional.update()
+
+        self.assertFalse(diff)
+        self.assertEqual(1, mock.call_count)
+        self.assertEqual('"v1"', mock.last_request.headers['If-None-Match'])
+
+        cache = self.conditional.conditional_cache
+        self.assertEqual(1, cache.not_modified)
+        self.assertEqual(len(self.me_txt.encode('utf-8')), cache.bytes_saved)
+
+    @requests_mock.Mocker()
+    def test_identical_body_skips_update(self, mock):
+        """Responses with an unchanged body are not parsed"""
+        mock.get(self.me_url, text=self.me_txt)
+
+        self.assertFalse(self.conditional.update())
+
+        self.assertEqual(1, mock.call_count)
+        stats = self.conditional.conditional_cache.stats()
+        self.assertEqual(1, stats['unchanged'])
+        self.assertEqual(0, stats['bytes_saved'])
+        self.assertGreater(stats['parse_time_saved'], 0)
+
+    @requests_mock.Mocker()
+    def test_changed_body_updates_entities(self, mock):
+        """Changed responses are applied and their validators used"""
+        self._init_default_mocks(mock, 'carson_me_update.json')
+        mock.get(self.me_url,
+                 text=load_fixture('carson.live', 'carson_me_update.json'),
+                 headers={'ETag': '"v2"'})
+
+        self.assertTrue(self.conditional.update())
+        self.assertEqual(2, len(self.conditional.buildings))
+
+        mock.get(self.me_url, status_code=304)
+        self.assertFalse(self.conditional.update())
+        self.assertEqual('"v2"', mock.last_request.headers['If-None-Match'])
+
+    @requests_mock.Mocker()
+    def test_failed_update_is_repeated(self, mock):
+        """Validators of payloads that failed to apply are not used"""
+        self._init_default_mocks(mock, 'carson_me_update.json')
+        self.conditional._max_workers = 4  # pylint: disable=protected-access
+        failing_id = self.c_mock_me['properties'][1]['id']
+        mock.get(C_API_URI + C_EEN_SESSION_ENDPOINT.format(failing_id),
+                 status_code=500)
+
+        with self.assertRaises(CarsonAggregateError):
+            self.conditional.update()
+
+        self.assertEqual(
+            {}, self.conditional.conditional_cache.request_headers(
+                self.me_url))
+        with self.assertRaises(CarsonAggregateError):
+            self.conditional.update()
+
+    def test_unconditional_by_default(self):
+        """Conditional requests are disabled by default"""
+        self.assertFalse(self.carson.conditional_requests)
+        self.assertIsNone(self.carson.conditional_cache)
+        self.assertTrue(self.conditional.conditional_requests)
+        for building in self.conditional.buildings:
+            self.assertIsNotNone(building.eagleeye_api.conditional_cache)
+
+
+class TestConditionalEagleEye(unittest.TestCase):
+    """Carson Living conditional device list query test class."""
+
+    def setUp(self):
+        self.list_url = EEN_API_URI.format('sd') + EEN_DEVICE_LIST_ENDPOINT
+        self.list_txt = load_fixture('eagleeyenetworks.com',
+                                     'device_list.json')
+        self.eagle_eye = EagleEye(Mock(return_value=('key', 'sd')),
+                                  conditional_requests=True)
+
+    @requests_mock.Mocker()
+    def test_device_list_not_modified(self, mock):
+        """Unchanged device lists keep the camera entities"""
+        mock.get(self.list_url, text=self.list_txt,
+                 headers={'Last-Modified': 'Fri, 31 Jan 2020 23:00:00 GMT'})
+        self.assertEqual(8, len(self.eagle_eye.update().added))
+        cameras = list(self.eagle_eye.cameras)
+
+        mock.get(self.list_url, status_code=304)
+        self.assertFalse(self.eagle_eye.update())
+
+        self.assertEqual('Fri, 31 Jan 2020 23:00:00 GMT',
+                         mock.last_request.headers['If-Modified-Since'])
+        self.assertEqual(cameras, list(self.eagle_eye.cameras))
+        self.assertEqual(1, self.eagle_eye.conditional_cache.not_modified)
+
+
+class TestConditionalCache(unittest.TestCase):
+    """Carson Living conditional cache test class."""
+
+    def setUp(self):
+        self.cache = ConditionalCache()
+
+    def _response(self, status_code=200, content=b'{}', headers=None):
+        return Mock(status_code=status_code, content=content,
+                    headers=headers or {}, url='https://test.com')
+
+    def test_uncommitted_validators_are_not_used(self):
+        """Only committed responses are compared"""
+        handler = self.cache.response_handler('key', lambda r: 'parsed')
+        response = self._response(headers={'ETag': '"a"'})
+
+        self.assertEqual('parsed', handler(response))
+        self.assertEqual({}, self.cache.request_headers('key'))
+        self.assertEqual('parsed', handler(response))
+
+        self.cache.commit('key')
+        self.assertEqual({'If-None-Match': '"a"'},
+                         self.cache.request_headers('key'))
+        self.assertIs(NOT_MODIFIED, handler(response))
+
+    def test_unexpected_not_modified_raises(self):
+        """304 responses without stored validators are errors"""
+        handler = self.cache.response_handler('key', lambda r: 'parsed')
+
+        with self.assertRaises(CarsonCommunicationError):
+            handler(self._response(status_code=304))
+
+    def test_invalidate(self):
+        """Invalidated keys receive the full payload again"""
+        handler = self.cache.response_handler('key', lambda r: 'parsed')
+        handler(self._response(headers={'ETag': '"a"'}))
+        self.cache.commit('key')
+
+        self.cache.invalidate('key')
+
+        self.assertEqual({}, self.cache.request_headers('key'))
+        self.assertEqual('parsed', handler(self._response()))
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""Resumable download Module for Carson Living tests."""
+
+import io
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+
+import requests_mock
+
+# 2.7 support fallback
+try:
+    from unittest.mock import Mock
+except ImportError:
+    from mock import Mock
+
+from carson_living import (CarsonAggregateError,
+                           CarsonAPIError,
+                           CarsonCommunicationError,
+                           CarsonError,
+                           EagleEye,
+                           EagleEyeCamera,
+                           SnapshotCache)
+from carson_living.download import read_response_into
+from carson_living.flv import concat_flv
+
+from tests.test_base import CarsonUnitTestBase
+from tests.helpers import (load_fixture,
+                           setup_ee_image_mock,
+                           DroppingAssetServer,
+                           LocalRedirectAdapter)
+
+
+class TestResumableDownload(CarsonUnitTestBase):
+    """Carson Living resumable download test class."""
+
+    def setUp(self):
+        super(TestResumableDownload, self).setUp()
+        self.video = load_fixture(
+            'eagleeyenetworks.com', 'camera_video.flv', 'rb')
+        self.image = load_fixture(
+            'eagleeyenetworks.com', 'camera_image.jpeg', 'rb')
+        self.start = datetime(2020, 1, 31, 23, 0, 0)
+
+    def _serve(self, server):
+        server.start()
+        self.addCleanup(server.stop)
+        self.carson.http_session.mount(
+            'https://', LocalRedirectAdapter(server.base_url))
+        return server
+
+    def test_get_video_resumes_with_range(self):
+        """Interrupted downloads continue at the last written byte"""
+        server = self._serve(DroppingAssetServer(
+            self.video, drops=[40000, 1000]))
+
+        buffer = io.BytesIO()
+        self.first_camera.get_video(buffer, timedelta(seconds=2),
+                                    self.start, retries=2)
+
+        self.assertEqual(self.video, buffer.getvalue())
+        self.assertEqual([None, 'bytes=40000-', 'bytes=41000-'],
+                         server.ranges)
+
+    def test_get_video_resumes_without_range(self):
+        """Repeated full responses skip the already written bytes"""
+        server = self._serve(DroppingAssetServer(
+            self.video, drops=[40000, 70000], support_range=False))
+
+        buffer = io.BytesIO()
+        self.first_camera.get_video(buffer, timedelta(seconds=2),
+                                    self.start, retries=2)
+
+        self.assertEqual(self.video, buffer.getvalue())
+        self.assertEqual(3, len(server.ranges))
+
+    def test_get_image_resumes(self):
+        """Images are resumed the same way"""
+        self._serve(DroppingAssetServer(
+            self.image, drops=[1000], content_type='image/jpeg'))
+
+        buffer = io.BytesIO()
+        self.first_camera.get_image(buffer, self.start, retries=1)
+
+        self.assertEqual(self.image, buffer.getvalue())
+
+    def test_retries_exhausted(self):
+        """Downloads fail once all retries were used"""
+        server = self._serve(DroppingAssetServer(
+            self.video, drops=[1000, 1000]))
+
+        with self.assertRaises(CarsonCommunicationError):
+            self.first_camera.get_video(
+                io.BytesIO(), timedelta(seconds=2), self.start, retries=1)
+
+        self.assertEqual(2, len(server.ranges))
+
+    def _export_path(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        return os.path.join(directory, 'export.flv')
+
+    def test_export_video_resumes_dropped_segment(self):
+        """Dropped export segments continue at the last written byte"""
+        server = self._serve(DroppingAssetServer(
+            self.video, drops=[40000]))
+        path = self._export_path()
+
+        self.first_camera.export_video(
+            path, self.start, timedelta(seconds=2), retries=1,
+            retry_delay=0)
+
+        self.assertEqual([None, 'bytes=40000-'], server.ranges)
+        expected = io.BytesIO()
+        concat_flv(expected, [(io.BytesIO(self.video), 0)])
+        with open(path, 'rb') as file:
+            self.assertEqual(expected.getvalue(), file.read())
+
+    def test_export_video_rejects_truncated_segment(self):
+        """Truncated export segments never become part files"""
+        self._serve(DroppingAssetServer(self.video, drops=[40000]))
+        path = self._export_path()
+
+        with self.assertRaises(CarsonAggregateError) as context:
+            self.first_camera.export_video(
+                path, self.start, timedelta(seconds=2), retries=0)
+
+        self.assertIsInstance(context.exception.errors[self.start],
+                              CarsonCommunicationError)
+        self.assertEqual([], os.listdir(os.path.dirname(path)))
+
+    def test_live_video_cannot_resume(self):
+        """Live streams reject retries"""
+        with self.assertRaises(CarsonAPIError):
+            self.first_camera.get_video(
+                io.BytesIO(), timedelta(seconds=2), retries=1)
+
+
+class TestImageInto(CarsonUnitTestBase):
+    """Carson Living get_image_into test class."""
+
+    def setUp(self):
+        super(TestImageInto, self).setUp()
+        self.subdomain = self.c_mock_esession['activeBrandSubdomain']
+        self.buffer = bytearray(64 * 1024)
+
+    @requests_mock.Mocker()
+    def test_get_image_into(self, mock):
+        """The image is written to the start of the buffer"""
+        mock_image = setup_ee_image_mock(mock, self.subdomain)
+
+        size = self.first_camera.get_image_into(self.buffer)
+
+        self.assertEqual(len(mock_image), size)
+        self.assertEqual(mock_image, bytes(self.buffer[:size]))
+        self.assertEqual('identity',
+                         mock.last_request.headers['Accept-Encoding'])
+
+    @requests_mock.Mocker()
+    def test_get_image_into_memoryview(self, mock):
+        """Memoryviews (e.g. of a buffer pool) are filled as well"""
+        mock_image = setup_ee_image_mock(mock, self.subdomain)
+        view = memoryview(self.buffer)[1024:]
+
+        size = self.first_camera.get_image_into(view)
+
+        self.assertEqual(mock_image, bytes(self.buffer[1024:1024 + size]))
+
+    def test_read_into_http_body(self):
+        """Unencoded bodies are read from the http.client body"""
+        body = b'image bytes'
+
+        class _Body(io.BytesIO):
+            """http.client response body"""
+            def isclosed(self):
+                """The body was read completely"""
+                return self.tell() == len(body)
+
+        class _Raw(object):
+            """Raw stream of an old urllib3 without readinto()"""
+            decode_content = False
+
+            def __init__(self):
+                self._fp = _Body(body)
+                self.released = False
+
+            def read(self, *args):
+                """Read (and decode) from the http.client body"""
+                return self._fp.read(*args)
+
+            def release_conn(self):
+                """Return the connection to the pool"""
+                self.released = True
+
+        response = Mock(raw=_Raw(), headers={})
+
+        self.assertEqual(len(body),
+                         read_response_into(response, self.buffer))
+        self.assertEqual(body, bytes(self.buffer[:len(body)]))
+        self.assertTrue(response.raw.released)
+
+        response = Mock(raw=_Raw(), headers={'Content-Encoding': 'gzip'})
+        with self.assertRaises(CarsonError):
+            read_response_into(response, self.buffer)
+
+    @requests_mock.Mocker()
+    def test_get_image_into_too_small(self, mock):
+        """Images bigger than the buffer raise CarsonError"""
+        setup_ee_image_mock(mock, self.subdomain)
+
+        with self.assertRaises(CarsonError):
+            self.first_camera.get_image_into(bytearray(1024))
+
+    @requests_mock.Mocker()
+    def test_get_image_into_cache(self, mock):
+        """Cached images are copied into the buffer"""
+        mock_image = setup_ee_image_mock(mock, self.subdomain)
+        eagle_eye = EagleEye(
+            lambda: (self.c_mock_esession['sessionId'], self.subdomain),
+            snapshot_cache=SnapshotCache())
+        camera = EagleEyeCamera.from_list_payload(
+            eagle_eye, self.e_mock_device_list[0])
+        sample_dt = datetime(2020, 1, 31, 23, 0, 0)
+
+        camera.get_image_into(self.buffer, sample_dt)
+        other_buffer = bytearray(len(mock_image))
+        size = camera.get_image_into(other_buffer, sample_dt)
+
+        self.assertEqual(mock_image, bytes(other_buffer[:size]))
+        self.assertEqual(1, eagle_eye.snapshot_cache.hits)
+
+    def test_get_image_into_reuses_connection(self):
+        """Images are read from a real connection repeatedly"""
+        image = load_fixture('eagleeyenetworks.com', 'camera_image.jpeg',
+                             'rb')
+        server = DroppingAssetServer(image, content_type='image/jpeg')
+        server.start()
+        self.addCleanup(server.stop)
+        adapter = LocalRedirectAdapter(server.base_url)
+        self.carson.http_session.mount('https://', adapter)
+
+        for _ in range(3):
+            size = self.first_camera.get_image_into(self.buffer)
+            self.assertEqual(image, bytes(self.buffer[:size]))
+
+        pool = adapter.poolmanager.connection_from_url(server.base_url)
+        self.assertEqual(1, pool.num_connections)
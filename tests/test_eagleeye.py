@@ -1,22 +1,30 @@
 # -*- coding: utf-8 -*-
 """Authentication Module for Carson Living tests."""
 
+import io
+import json
+import threading
 import unittest
+from datetime import datetime, timedelta
 import requests_mock
 
 # 2.7 support fallback
 try:
-    from unittest.mock import Mock
+    from unittest.mock import Mock, patch
 except ImportError:
-    from mock import Mock
+    from mock import Mock, patch
 
 
 from carson_living import (EagleEye,
+                           EagleEyeCamera,
                            CarsonError)
 
 from carson_living.const import (EEN_API_URI,
+                                 EEN_DEVICE_ENDPOINT,
                                  EEN_IS_AUTH_ENDPOINT)
-from tests.helpers import setup_ee_device_list_mock
+from tests.helpers import (load_fixture,
+                           setup_ee_device_list_mock,
+                           setup_ee_image_mock)
 
 FIXTURE_SESSION_AUTH_KEY = 'sample_auth_key'
 FIXTURE_BRANDED_SUBDOMAIN = 'sd'
@@ -122,3 +130,268 @@ class TestEagleEye(unittest.TestCase):
         auth = self.eagle_eye.check_auth(refresh=False)
         self.assertEqual(False, auth)
         self.assertEqual(1, mock.call_count)
+
+    @requests_mock.Mocker()
+    def test_get_images_writes_all_files(self, mock):
+        """Bulk image download writes every camera buffer"""
+        mock_image = setup_ee_image_mock(mock, FIXTURE_BRANDED_SUBDOMAIN)
+        buffers = {c.entity_id: io.BytesIO() for c in self.eagle_eye.cameras}
+
+        errors = self.eagle_eye.get_images(buffers, max_workers=4)
+
+        self.assertEqual({}, errors)
+        self.assertEqual(len(buffers), mock.call_count)
+        for buffer in buffers.values():
+            self.assertEqual(mock_image, buffer.getvalue())
+        self.assertEqual(
+            sorted(buffers),
+            sorted(r.qs['id'][0] for r in mock.request_history))
+
+    @requests_mock.Mocker()
+    def test_get_images_reports_failures(self, mock):
+        """Failing cameras are reported without aborting the others"""
+        setup_ee_image_mock(mock, FIXTURE_BRANDED_SUBDOMAIN)
+        mock.get(
+            EEN_API_URI.format(FIXTURE_BRANDED_SUBDOMAIN)
+            + '/asset/prev/image.jpeg?id=c1', status_code=500)
+        buffers = {'c0': io.BytesIO(), 'c1': io.BytesIO(),
+                   'unknown': io.BytesIO()}
+
+        errors = self.eagle_eye.get_images(buffers, max_workers=4)
+
+        self.assertEqual(['c1', 'unknown'], list(errors))
+        self.assertIsInstance(errors['c1'], CarsonError)
+        self.assertIsInstance(errors['unknown'], CarsonError)
+        self.assertNotEqual(b'', buffers['c0'].getvalue())
+
+    def _device_mock(self, mock, failing=()):
+        payload = json.loads(load_fixture('eagleeyenetworks.com',
+                                          'device_camera.json'))
+
+        def _device(request, context):
+            camera_id = request.qs['id'][0]
+            if camera_id in failing:
+                context.status_code = 500
+                return {}
+            return dict(payload, id=camera_id)
+
+        mock.get(EEN_API_URI.format(FIXTURE_BRANDED_SUBDOMAIN)
+                 + EEN_DEVICE_ENDPOINT, json=_device)
+
+    @requests_mock.Mocker()
+    def test_update_camera_details_merges_all_cameras(self, mock):
+        """Full device payloads are merged into the existing cameras"""
+        self._device_mock(mock)
+        cameras = list(self.eagle_eye.cameras)
+
+        diff, errors = self.eagle_eye.update_camera_details(max_workers=4)
+
+        self.assertEqual({}, errors)
+        self.assertEqual([], diff.added)
+        self.assertEqual(
+            ['eagleeye_camera_c{}'.format(i) for i in range(8)],
+            list(diff.changed))
+        self.assertEqual(8, mock.call_count)
+        for camera in cameras:
+            self.assertIs(camera, self.eagle_eye.get_camera(camera.entity_id))
+            self.assertIn('camera_info', camera.entity_payload)
+
+        diff, errors = self.eagle_eye.update_camera_details(max_workers=4)
+        self.assertFalse(diff)
+
+    @requests_mock.Mocker()
+    def test_device_list_keeps_camera_details(self, mock):
+        """Device list updates do not strip the device payload fields"""
+        self._device_mock(mock)
+        self.eagle_eye.update_camera_details(['c0'])
+        setup_ee_device_list_mock(mock, FIXTURE_BRANDED_SUBDOMAIN,
+                                  'device_list_update.json')
+
+        diff = self.eagle_eye.update()
+
+        camera = self.eagle_eye.get_camera('c0')
+        self.assertIn('camera_info', camera.entity_payload)
+        self.assertNotIn('camera_info',
+                         diff.changed.get(camera.unique_entity_id, ()))
+        self.assertEqual({}, self.eagle_eye.update_camera_details(
+            ['c0'])[0].changed)
+
+    @requests_mock.Mocker()
+    def test_update_camera_details_reports_failures(self, mock):
+        """Failing cameras are reported, the others are merged"""
+        self._device_mock(mock, failing=('c1',))
+        old_payload = self.eagle_eye.get_camera('c1').entity_payload
+
+        diff, errors = self.eagle_eye.update_camera_details(
+            ['c0', 'c1', 'new'], max_workers=4)
+
+        self.assertEqual(['c1'], list(errors))
+        self.assertIsInstance(errors['c1'], CarsonError)
+        self.assertEqual(['eagleeye_camera_new'], diff.added)
+        self.assertEqual(['eagleeye_camera_c0'], list(diff.changed))
+        self.assertEqual(old_payload,
+                         self.eagle_eye.get_camera('c1').entity_payload)
+        self.assertEqual(9, len(self.eagle_eye.cameras))
+
+    @requests_mock.Mocker()
+    def test_coalesce_concurrent_identical_queries(self, mock):
+        """Concurrent identical GET queries are only sent once"""
+        query_url = 'https://test.com'
+        release = threading.Event()
+
+        def _slow_response(_request, _context):
+            release.wait(5)
+            return '{"id": 1}'
+
+        mock.get(query_url, text=_slow_response)
+        eagle_eye = EagleEye(self.mock_session_callback,
+                             coalesce_requests=True)
+        eagle_eye.update_session_auth_key()
+        results = []
+
+        threads = [threading.Thread(
+            target=lambda: results.append(
+                eagle_eye.authenticated_query(query_url)))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        while eagle_eye.single_flight.stats()['coalesced'] < 4:
+            threading.Event().wait(0.001)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(1, mock.call_count)
+        self.assertEqual([{'id': 1}] * 5, results)
+        self.assertEqual({'executed': 1, 'coalesced': 4},
+                         eagle_eye.single_flight.stats())
+
+    def test_coalescing_is_disabled_by_default(self):
+        """No single-flight layer without coalesce_requests"""
+        self.assertIsNone(self.eagle_eye.single_flight)
+
+    def test_session_renewal_fetches_missing_session(self):
+        """Session renewal fetches a session right away if none exists"""
+        eagle_eye = EagleEye(self.mock_session_callback)
+
+        renewal = eagle_eye.start_session_renewal(interval=600)
+        for _ in range(500):
+            if renewal.renewals:
+                break
+            threading.Event().wait(0.01)
+        eagle_eye.stop_session_renewal()
+
+        self.assertEqual(1, renewal.renewals)
+        self.assertEqual(FIXTURE_SESSION_AUTH_KEY,
+                         eagle_eye.session_auth_key)
+        self.assertEqual(FIXTURE_BRANDED_SUBDOMAIN,
+                         eagle_eye.session_brand_subdomain)
+
+    @requests_mock.Mocker()
+    def test_check_auth_trusts_verified_session(self, mock):
+        """Auth checks within the trust window do not query the API"""
+        is_auth = mock.get(
+            EEN_API_URI.format(FIXTURE_BRANDED_SUBDOMAIN)
+            + EEN_IS_AUTH_ENDPOINT, text='{}')
+        eagle_eye = EagleEye(self.mock_session_callback,
+                             session_trust_window=60)
+
+        with patch('carson_living.eagleeye.time') as mock_time:
+            mock_time.time.return_value = 1000.0
+            # fetching the session verifies it
+            eagle_eye.update_session_auth_key()
+            for _ in range(5):
+                self.assertTrue(eagle_eye.check_auth())
+            self.assertFalse(is_auth.called)
+
+            mock_time.time.return_value = 1060.0
+            self.assertTrue(eagle_eye.check_auth())
+            self.assertTrue(eagle_eye.check_auth())
+
+        self.assertEqual(1, is_auth.call_count)
+        self.assertEqual(1, eagle_eye.auth_checks)
+        self.assertEqual(6, eagle_eye.auth_checks_avoided)
+
+    @requests_mock.Mocker()
+    def test_401_invalidates_session_verification(self, mock):
+        """Any 401 ends the trust in the session"""
+        query_url = EEN_API_URI.format(FIXTURE_BRANDED_SUBDOMAIN) + '/g/x'
+        mock.get(query_url, status_code=401)
+        mock.get(EEN_API_URI.format(FIXTURE_BRANDED_SUBDOMAIN)
+                 + EEN_IS_AUTH_ENDPOINT, text='{}')
+        eagle_eye = EagleEye(self.mock_session_callback,
+                             session_trust_window=60)
+        eagle_eye.update_session_auth_key()
+        self.assertTrue(eagle_eye.session_verified)
+
+        with self.assertRaises(CarsonError):
+            eagle_eye.authenticated_query(EEN_API_URI + '/g/x',
+                                          retry_auth=0)
+
+        self.assertFalse(eagle_eye.session_verified)
+        self.assertTrue(eagle_eye.check_auth())
+        self.assertEqual(1, eagle_eye.auth_checks)
+        self.assertTrue(eagle_eye.session_verified)
+
+    def test_session_trust_is_disabled_by_default(self):
+        """Without a trust window every auth check queries the API"""
+        self.assertFalse(self.eagle_eye.session_verified)
+
+    def test_get_image_urls_match_per_camera_urls(self):
+        """Batch image urls equal the urls of get_image_url"""
+        start = datetime(2020, 1, 31, 23, 1, 3, 123456)
+        camera_ids = [c.entity_id for c in self.eagle_eye.cameras]
+
+        urls = self.eagle_eye.get_image_urls(
+            camera_ids, start, start + timedelta(minutes=1),
+            timedelta(seconds=10), asset_class='thumb', check_auth=False)
+
+        self.assertEqual(camera_ids, list(urls))
+        for camera_id in camera_ids:
+            camera = self.eagle_eye.get_camera(camera_id)
+            self.assertEqual(
+                [camera.get_image_url(start + i * timedelta(seconds=10),
+                                      asset_class='thumb',
+                                      check_auth=False)
+                 for i in range(6)],
+                urls[camera_id])
+
+    def test_get_image_urls_encode_like_requests(self):
+        """Special characters are encoded like a prepared request"""
+        eagle_eye = EagleEye(self.mock_session_callback,
+                             initial_session=('c000~a%/+ =b', 'c001'))
+        camera = EagleEyeCamera(eagle_eye, {'id': 'a b&c'})
+        start = datetime(2020, 1, 31, 23, 1, 3)
+
+        urls = eagle_eye.get_image_urls(
+            ['a b&c'], start, start + timedelta(seconds=1),
+            timedelta(seconds=1), check_auth=False)
+
+        self.assertEqual(
+            [camera.get_image_url(start, check_auth=False)],
+            urls['a b&c'])
+
+    def test_get_image_urls_check_auth_once(self):
+        """The auth key is checked once for all urls"""
+        eagle_eye = EagleEye(self.mock_session_callback)
+        eagle_eye.check_auth = Mock(return_value=True)
+        start = datetime(2020, 1, 31, 23, 1, 3)
+
+        urls = eagle_eye.get_image_urls(
+            ['c0', 'c1'], start, start + timedelta(hours=1),
+            timedelta(seconds=10))
+
+        eagle_eye.check_auth.assert_called_once_with()
+        self.assertEqual(360, len(urls['c1']))
+
+        eagle_eye.check_auth = Mock(return_value=False)
+        self.assertIsNone(eagle_eye.get_image_urls(
+            ['c0'], start, start + timedelta(hours=1),
+            timedelta(seconds=10)))
+
+    def test_get_image_urls_rejects_non_positive_step(self):
+        """A step of zero would never end the time range"""
+        start = datetime(2020, 1, 31, 23, 1, 3)
+        with self.assertRaises(CarsonError):
+            self.eagle_eye.get_image_urls(
+                ['c0'], start, start + timedelta(seconds=1), timedelta(0))
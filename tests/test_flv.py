@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""FLV Module for Carson Living tests."""
+
+import io
+import unittest
+
+from carson_living import CarsonError
+from carson_living.flv import (FLV_TAG_SCRIPT,
+                               FLV_TAG_VIDEO,
+                               FlvChunker,
+                               concat_flv,
+                               encode_flv_tag,
+                               iter_flv_tags,
+                               read_flv_header)
+
+from tests.helpers import load_fixture
+
+
+class TestFlv(unittest.TestCase):
+    """Carson Living FLV test class."""
+
+    def setUp(self):
+        self.video = load_fixture(
+            'eagleeyenetworks.com', 'camera_video.flv', 'rb')
+
+    def _read(self, data):
+        file = io.BytesIO(data)
+        header = read_flv_header(file)
+        return header, list(iter_flv_tags(file))
+
+    def test_read_and_encode_round_trip(self):
+        """Tags are parsed and encoded losslessly"""
+        header, tags = self._read(self.video)
+
+        self.assertEqual(13, len(header))
+        self.assertEqual(FLV_TAG_SCRIPT, tags[0].tag_type)
+        self.assertEqual(FLV_TAG_VIDEO, tags[1].tag_type)
+        self.assertEqual(
+            self.video,
+            header + b''.join(encode_flv_tag(t) for t in tags))
+
+    def test_truncated_tag_ends_iteration(self):
+        """A partially received last tag is not yielded"""
+        _, tags = self._read(self.video)
+        _, truncated_tags = self._read(self.video[:-10])
+
+        self.assertEqual(tags[:-1], truncated_tags)
+
+    def test_invalid_header_raises(self):
+        """Streams without FLV signature raise CarsonError"""
+        with self.assertRaises(CarsonError):
+            read_flv_header(io.BytesIO(b'<html></html>'))
+
+    def test_encode_extended_timestamp(self):
+        """Timestamps above 24 bit use the extended timestamp byte"""
+        _, tags = self._read(self.video)
+        tag = tags[1]._replace(timestamp=0x1234567)
+
+        _, (decoded,) = self._read(
+            self.video[:13] + encode_flv_tag(tag))
+
+        self.assertEqual(tag, decoded)
+
+    def test_concat_shifts_timestamps(self):
+        """Later segments continue after the previous segment"""
+        _, tags = self._read(self.video)
+        last_timestamp = tags[-1].timestamp
+
+        out = io.BytesIO()
+        concat_flv(out, [(io.BytesIO(self.video), 0),
+                         (io.BytesIO(self.video), 5000),
+                         (io.BytesIO(self.video), 0)])
+        header, joined = self._read(out.getvalue())
+
+        self.assertEqual(self.video[:13], header)
+        # metadata only from the first segment
+        self.assertEqual(1, len([t for t in joined
+                                 if t.tag_type == FLV_TAG_SCRIPT]))
+        self.assertEqual(3 * len(tags) - 2, len(joined))
+        self.assertEqual(tags, joined[:len(tags)])
+        self.assertEqual(5000, joined[len(tags)].timestamp)
+        self.assertEqual(5000 + last_timestamp,
+                         joined[2 * len(tags) - 2].timestamp)
+        # overlapping offsets are moved behind the previous segment
+        self.assertEqual(5000 + last_timestamp + 1,
+                         joined[2 * len(tags) - 1].timestamp)
+        timestamps = [t.timestamp for t in joined]
+        self.assertEqual(sorted(timestamps), timestamps)
+
+    def _chunk(self, chunker, data, feed_size):
+        chunks = []
+        for pos in range(0, len(data), feed_size):
+            chunks.extend(chunker.feed(data[pos:pos + feed_size]))
+        return chunks + chunker.flush()
+
+    def test_chunker_fixed_size(self):
+        """Chunks have exactly chunk_size bytes, except the last one"""
+        chunks = self._chunk(FlvChunker(4096), self.video, 1000)
+
+        self.assertEqual(self.video, b''.join(chunks))
+        self.assertEqual([4096], list(set(len(c) for c in chunks[:-1])))
+        self.assertEqual(len(self.video) % 4096, len(chunks[-1]))
+
+    def test_chunker_align_tags(self):
+        """Aligned chunks hold the header or complete tags"""
+        _, tags = self._read(self.video)
+
+        chunks = self._chunk(FlvChunker(4096, align_tags=True),
+                             self.video, 1000)
+
+        self.assertEqual(self.video, b''.join(chunks))
+        self.assertEqual(self.video[:13], chunks[0])
+        chunk_tags = []
+        for chunk in chunks[1:]:
+            file = io.BytesIO(chunk)
+            chunk_tags.extend(iter_flv_tags(file))
+            self.assertEqual(len(chunk), file.tell())
+        self.assertEqual(tags, chunk_tags)
+
+    def test_chunker_align_tags_single_tags(self):
+        """Small chunk sizes yield one tag per chunk"""
+        _, tags = self._read(self.video)
+
+        chunks = self._chunk(FlvChunker(1, align_tags=True),
+                             self.video, 7)
+
+        self.assertEqual(len(tags) + 1, len(chunks))
+
+    def test_chunker_align_tags_drops_truncated_tag(self):
+        """An incomplete last tag is not passed on"""
+        chunker = FlvChunker(4096, align_tags=True)
+
+        chunks = self._chunk(chunker, self.video[:-10], 1000)
+
+        self.assertEqual(self.video[:len(b''.join(chunks))],
+                         b''.join(chunks))
+        _, tags = self._read(b''.join(chunks))
+        self.assertEqual(self._read(self.video)[1][:-1], tags)
+
+    def test_chunker_align_tags_invalid_stream(self):
+        """Tag alignment needs an FLV stream"""
+        with self.assertRaises(CarsonError):
+            FlvChunker(4096, align_tags=True).feed(b'<html></html>')
+        with self.assertRaises(CarsonError):
+            FlvChunker(0)
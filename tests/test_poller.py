@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""Snapshot Poller Module for Carson Living tests."""
+
+import threading
+import time
+
+import requests_mock
+
+from carson_living import (CarsonError,
+                           SnapshotPoller)
+from carson_living.const import (EEN_API_URI,
+                                 EEN_GET_IMAGE_ENDPOINT)
+from carson_living.poller import _CameraPoll
+
+from tests.test_base import CarsonUnitTestBase
+from tests.helpers import setup_ee_image_mock
+
+# 2.7 support fallback
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while not predicate():
+        if time.time() > deadline:
+            raise AssertionError('Condition not met within timeout')
+        time.sleep(0.005)
+
+
+class TestSnapshotPoller(CarsonUnitTestBase):
+    """Carson Living snapshot poller test class."""
+
+    def setUp(self):
+        super(TestSnapshotPoller, self).setUp()
+        self.subdomain = self.c_mock_esession['activeBrandSubdomain']
+        self.image_url = EEN_API_URI.format(self.subdomain) \
+            + EEN_GET_IMAGE_ENDPOINT.format('prev')
+
+    def test_poller_needs_sink(self):
+        """Pollers without callback and queue are rejected"""
+        with self.assertRaises(CarsonError):
+            SnapshotPoller()
+
+    @requests_mock.Mocker()
+    def test_poll_into_queue(self, mock):
+        """Frames of a camera are put into the queue"""
+        image = setup_ee_image_mock(mock, self.subdomain)
+        frames = queue.Queue()
+
+        with SnapshotPoller(frame_queue=frames, interval=0.01) as poller:
+            poller.add_camera(self.first_camera)
+            received = [frames.get(timeout=5) for _ in range(3)]
+
+        for frame in received:
+            self.assertEqual(self.first_camera.entity_id, frame.camera_id)
+            self.assertEqual(image, frame.data)
+            self.assertGreaterEqual(frame.lag, 0)
+
+        stats = poller.stats()[self.first_camera.entity_id]
+        self.assertGreaterEqual(stats.frames, 3)
+        self.assertEqual(0, stats.errors)
+        self.assertGreater(stats.frame_rate, 0)
+        self.assertFalse(poller.running)
+
+    @requests_mock.Mocker()
+    def test_poll_into_callback(self, mock):
+        """Frames of a camera are passed to the callback"""
+        setup_ee_image_mock(mock, self.subdomain)
+        received = []
+        done = threading.Event()
+
+        def _callback(frame):
+            received.append(frame)
+            if len(received) >= 2:
+                done.set()
+
+        with SnapshotPoller(callback=_callback, interval=0.01) as poller:
+            poller.add_camera(self.first_camera)
+            self.assertTrue(done.wait(5))
+
+        self.assertEqual(self.first_camera.entity_id, received[0].camera_id)
+
+    @requests_mock.Mocker()
+    def test_poll_backs_off_on_rate_limit(self, mock):
+        """429 responses back off for at least Retry-After seconds"""
+        mock.get(self.image_url, status_code=429,
+                 headers={'Retry-After': '30'})
+        frames = queue.Queue()
+
+        with SnapshotPoller(frame_queue=frames, interval=0.01) as poller:
+            poller.add_camera(self.first_camera)
+            _wait_for(lambda: poller.stats()[
+                self.first_camera.entity_id].errors)
+            time.sleep(0.1)
+
+        stats = poller.stats()[self.first_camera.entity_id]
+        self.assertEqual(1, stats.errors)
+        self.assertEqual(1, stats.rate_limited)
+        self.assertGreaterEqual(stats.backoff, 30)
+        self.assertEqual(1, mock.call_count)
+        self.assertTrue(frames.empty())
+
+    @requests_mock.Mocker()
+    def test_poll_drops_frames_on_full_queue(self, mock):
+        """Frames that do not fit into the queue are counted as dropped"""
+        setup_ee_image_mock(mock, self.subdomain)
+        frames = queue.Queue(maxsize=1)
+
+        with SnapshotPoller(frame_queue=frames, interval=0.01) as poller:
+            poller.add_camera(self.first_camera)
+            _wait_for(lambda: poller.stats()[
+                self.first_camera.entity_id].dropped >= 2)
+
+        stats = poller.stats()[self.first_camera.entity_id]
+        self.assertEqual(1, frames.qsize())
+        self.assertEqual(stats.frames - 1, stats.dropped)
+
+    @requests_mock.Mocker()
+    def test_remove_camera(self, mock):
+        """Removed cameras are no longer polled"""
+        setup_ee_image_mock(mock, self.subdomain)
+        frames = queue.Queue()
+
+        with SnapshotPoller(frame_queue=frames, interval=0.01) as poller:
+            poller.add_camera(self.first_camera)
+            frames.get(timeout=5)
+            poller.remove_camera(self.first_camera.entity_id)
+            time.sleep(0.05)
+            count = mock.call_count
+            time.sleep(0.05)
+            self.assertEqual(count, mock.call_count)
+
+        self.assertEqual({}, poller.stats())
+
+    def test_readd_camera_in_flight(self):
+        """Re-added cameras are not polled twice at once"""
+        started = threading.Event()
+        release = threading.Event()
+        polls = []
+
+        def _get_image(file, **_kwargs):
+            polls.append(file)
+            started.set()
+            release.wait(5)
+            file.write(b'image')
+
+        camera = self.first_camera
+        camera.get_image = _get_image
+        frames = queue.Queue()
+
+        with SnapshotPoller(frame_queue=frames, interval=0.01,
+                            max_workers=4) as poller:
+            poller.add_camera(camera)
+            self.assertTrue(started.wait(5))
+            poller.add_camera(camera)
+            time.sleep(0.05)
+            self.assertEqual(1, len(polls))
+            release.set()
+            self.assertEqual(b'image', frames.get(timeout=5).data)
+
+class TestCameraPoll(CarsonUnitTestBase):
+    """Carson Living camera poll schedule test class."""
+
+    def test_backoff_is_exponential_and_capped(self):
+        """Consecutive errors double the backoff up to max_backoff"""
+        poll = _CameraPoll(self.first_camera, 1.0, 0, 10.0)
+        poll.schedule_first(100.0)
+
+        backoffs = []
+        for _ in range(5):
+            poll.record_error(100.0, CarsonError('failed'))
+            backoffs.append(poll.backoff)
+
+        self.assertEqual([2.0, 4.0, 8.0, 10.0, 10.0], backoffs)
+        self.assertEqual(110.0, poll.due)
+
+        poll.record_frame(110.5)
+        self.assertEqual(0, poll.backoff)
+        self.assertEqual(0, poll.consecutive_errors)
+
+    def test_frame_keeps_cadence(self):
+        """The next poll is due one interval after the scheduled one"""
+        poll = _CameraPoll(self.first_camera, 1.0, 0, 10.0)
+        poll.due = 100.0
+
+        self.assertEqual(0.25, poll.record_frame(100.25))
+        self.assertEqual(101.0, poll.due)
+
+        # missed slots are skipped instead of polled in a burst
+        poll.record_frame(103.5)
+        self.assertEqual(103.5, poll.due)
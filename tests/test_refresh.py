@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""Refresh Policy Module for Carson Living tests."""
+
+import json
+import threading
+
+import requests_mock
+
+# 2.7 support fallback
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+from carson_living import (Carson,
+                           CarsonAggregateError,
+                           CarsonError,
+                           RefreshPolicy)
+from carson_living.const import (C_API_URI,
+                                 C_ME_ENDPOINT,
+                                 C_EEN_SESSION_ENDPOINT,
+                                 EEN_API_URI,
+                                 EEN_DEVICE_ENDPOINT,
+                                 EEN_DEVICE_LIST_ENDPOINT,
+                                 EEN_SESSION_RENEWAL_INTERVAL)
+
+from tests.const import (USERNAME, PASSWORD)
+from tests.test_base import CarsonUnitTestBase
+from tests.helpers import (load_fixture,
+                           setup_ee_camera_mock)
+
+_DISABLED = RefreshPolicy(None, None, None, None, None, None)
+
+
+class TestRefreshScheduler(CarsonUnitTestBase):
+    """Carson Living refresh scheduler test class."""
+
+    def setUp(self):
+        super(TestRefreshScheduler, self).setUp()
+        self.now = 1000.0
+        patcher = patch('carson_living.refresh._monotonic',
+                        side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.subdomain = self.c_mock_esession['activeBrandSubdomain']
+
+    def _scheduler(self, **intervals):
+        return self.carson.create_refresh_scheduler(
+            _DISABLED._replace(**intervals))
+
+    def _calls(self, mock, url):
+        return len([r for r in mock.request_history
+                    if r.url.split('?')[0] == url])
+
+    def test_policy_disabling_everything_is_rejected(self):
+        """A scheduler needs at least one part to refresh"""
+        with self.assertRaises(CarsonError):
+            self.carson.create_refresh_scheduler(_DISABLED)
+
+    @requests_mock.Mocker()
+    def test_nothing_due(self, mock):
+        """Ticks without stale parts do not query the API"""
+        scheduler = self.carson.create_refresh_scheduler()
+
+        self.now += 60
+        self.assertFalse(scheduler.tick())
+
+        self.assertEqual(0, mock.call_count)
+        self.assertEqual(EEN_SESSION_RENEWAL_INTERVAL - 60,
+                         scheduler.next_delay())
+
+    @requests_mock.Mocker()
+    def test_doors_only(self, mock):
+        """Stale doors are applied without their building"""
+        scheduler = self._scheduler(doors=10)
+        self._init_default_mocks(mock, 'carson_me_update.json')
+        name = self.first_building.name
+
+        self.now += 10
+        diff = scheduler.tick()
+
+        self.assertEqual(1, mock.call_count)
+        self.assertEqual(['carson_door_24', 'carson_door_25'], diff.added)
+        self.assertEqual(['carson_door_23'], diff.removed)
+        self.assertEqual(4, len(self.first_building.doors))
+        self.assertEqual(name, self.first_building.name)
+        self.assertEqual(10, scheduler.next_delay())
+
+    @requests_mock.Mocker()
+    def test_buildings_refresh_doors(self, mock):
+        """Stale buildings include their doors"""
+        scheduler = self._scheduler(buildings=10, doors=15)
+        self._init_default_mocks(mock, 'carson_me_update.json')
+
+        self.now += 10
+        diff = scheduler.tick()
+
+        self.assertIn(self.first_building.unique_entity_id, diff.changed)
+        self.assertIn('carson_door_24', diff.added)
+
+        self.now += 5
+        calls = mock.call_count
+        self.assertFalse(scheduler.tick())
+        self.assertEqual(calls, mock.call_count)
+
+    @requests_mock.Mocker()
+    def test_camera_lists_and_sessions(self, mock):
+        """Camera lists and sessions are refreshed per building"""
+        scheduler = self._scheduler(camera_lists=20, sessions=10)
+        self._init_default_mocks(mock, 'carson_me.json')
+        session_url = C_API_URI + C_EEN_SESSION_ENDPOINT.format(
+            self.first_building.entity_id)
+        list_url = EEN_API_URI.format(self.subdomain) \
+            + EEN_DEVICE_LIST_ENDPOINT
+
+        self.now += 10
+        scheduler.tick()
+        self.assertEqual(1, self._calls(mock, session_url))
+        self.assertEqual(0, self._calls(mock, list_url))
+
+        self.now += 10
+        scheduler.tick()
+        self.assertEqual(2, self._calls(mock, session_url))
+        self.assertEqual(1, self._calls(mock, list_url))
+        self.assertEqual(0, self._calls(mock, C_API_URI + C_ME_ENDPOINT))
+
+    @requests_mock.Mocker()
+    def test_cameras_individually(self, mock):
+        """Every camera payload is refreshed on its own schedule"""
+        scheduler = self._scheduler(cameras=30)
+        e_mock_camera = setup_ee_camera_mock(
+            mock, self.subdomain, 'device_camera_update.json')
+        camera_url = EEN_API_URI.format(self.subdomain) \
+            + EEN_DEVICE_ENDPOINT
+
+        self.now += 10
+        scheduler.tick()
+        self.assertEqual(0, mock.call_count)
+
+        self.now += 20
+        diff = scheduler.tick()
+        self.assertEqual(2, self._calls(mock, camera_url))
+        self.assertEqual(2, len(diff.changed))
+        self.assertEqual(e_mock_camera['name'], self.first_camera.name)
+        self.assertEqual(30, scheduler.next_delay())
+
+    @requests_mock.Mocker()
+    def test_failed_parts_are_retried(self, mock):
+        """Failing parts do not block the others and stay due"""
+        scheduler = self._scheduler(user=10, sessions=10)
+        self._init_default_mocks(mock, 'carson_me.json')
+        mock.get(C_API_URI + C_ME_ENDPOINT, status_code=500)
+
+        self.now += 10
+        with self.assertRaises(CarsonAggregateError) as context:
+            scheduler.tick()
+
+        self.assertEqual(['me'], list(context.exception.errors))
+        self.assertEqual(0, scheduler.next_delay())
+
+        self._init_default_mocks(mock, 'carson_me.json')
+        scheduler.tick()
+        self.assertEqual(10, scheduler.next_delay())
+
+    @requests_mock.Mocker()
+    def test_failing_building_does_not_abort_others(self, mock):
+        """Building parts fail per building and keep the diff"""
+        self._init_default_mocks(mock, 'carson_me_update.json')
+        self.carson.update()
+        scheduler = self._scheduler(doors=10, sessions=10)
+        first, second = self.carson.buildings
+        mock.get(C_API_URI + C_EEN_SESSION_ENDPOINT.format(first.entity_id),
+                 status_code=500)
+        me_payload = json.loads(
+            load_fixture('carson.live', 'carson_me_update.json'))
+        door = me_payload['data']['properties'][0]['doors'][0]
+        door['name'] = 'Renamed'
+        mock.get(C_API_URI + C_ME_ENDPOINT, text=json.dumps(me_payload))
+
+        second_url = C_API_URI + C_EEN_SESSION_ENDPOINT.format(
+            second.entity_id)
+        calls = self._calls(mock, second_url)
+
+        self.now += 10
+        with self.assertRaises(CarsonAggregateError) as context:
+            scheduler.tick()
+
+        self.assertEqual([('sessions', first.unique_entity_id)],
+                         list(context.exception.errors))
+        self.assertEqual(calls + 1, self._calls(mock, second_url))
+        self.assertEqual(['carson_door_{}'.format(door['id'])],
+                         list(context.exception.diff.changed))
+        self.assertEqual(0, scheduler.next_delay())
+
+    @requests_mock.Mocker()
+    def test_lazy_buildings_are_not_discovered(self, mock):
+        """Buildings without discovered cameras are skipped"""
+        with requests_mock.Mocker() as init_mock:
+            self._init_default_mocks(init_mock, 'carson_me.json')
+            carson = Carson(USERNAME, PASSWORD, self.token,
+                            lazy_cameras=True)
+        scheduler = carson.create_refresh_scheduler(_DISABLED._replace(
+            camera_lists=10, sessions=10, cameras=10))
+
+        self.now += 10
+        self.assertFalse(scheduler.tick())
+
+        self.assertEqual(0, mock.call_count)
+        self.assertFalse(carson.first_building.cameras_loaded)
+
+    @requests_mock.Mocker()
+    def test_background_refresh(self, mock):
+        """The background thread ticks and reports changes"""
+        self._init_default_mocks(mock, 'carson_me_update.json')
+        changed = threading.Event()
+        scheduler = self.carson.create_refresh_scheduler(
+            _DISABLED._replace(doors=10), callback=lambda d: changed.set())
+
+        self.now += 10
+        scheduler.start()
+        self.assertTrue(changed.wait(5))
+        self.assertTrue(scheduler.running)
+
+        scheduler.stop(5)
+        self.assertFalse(scheduler.running)
+        self.assertEqual(1, scheduler.ticks)
+
+    @requests_mock.Mocker()
+    def test_background_refresh_reports_partial_diff(self, mock):
+        """Failed background ticks report the refreshed parts"""
+        self._init_default_mocks(mock, 'carson_me_update.json')
+        mock.get(C_API_URI + C_EEN_SESSION_ENDPOINT.format(
+            self.first_building.entity_id), status_code=500)
+        diffs = []
+        changed = threading.Event()
+
+        def _callback(diff):
+            diffs.append(diff)
+            changed.set()
+
+        scheduler = self.carson.create_refresh_scheduler(
+            _DISABLED._replace(doors=10, sessions=10), callback=_callback)
+
+        self.now += 10
+        scheduler.start()
+        self.assertTrue(changed.wait(5))
+        scheduler.stop(5)
+
+        self.assertIn('carson_door_24', diffs[0].added)
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""Background renewal Module for Carson Living tests."""
+
+import threading
+import unittest
+
+from carson_living import RenewalThread
+
+
+class TestRenewalThread(unittest.TestCase):
+    """Carson Living background renewal test class."""
+
+    def test_renews_when_due_and_stops(self):
+        """Renewal runs after next_delay and stops on request"""
+        renewed = threading.Event()
+
+        def _renew():
+            renewed.set()
+
+        renewal = RenewalThread(_renew, lambda: 0, 'test renewal',
+                                min_interval=60)
+        renewal.start()
+        self.assertTrue(renewed.wait(5))
+        self.assertTrue(renewal.running)
+
+        renewal.stop(5)
+
+        self.assertFalse(renewal.running)
+        self.assertEqual(1, renewal.renewals)
+        self.assertEqual(0, renewal.failures)
+
+    def test_failed_renewal_is_retried(self):
+        """Failures are counted and retried after retry_interval"""
+        attempts = []
+        renewed = threading.Event()
+
+        def _renew():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise ValueError('temporary failure')
+            renewed.set()
+
+        renewal = RenewalThread(_renew, lambda: 0, 'test renewal',
+                                retry_interval=0.01, min_interval=60)
+        renewal.start()
+        self.assertTrue(renewed.wait(5))
+        renewal.stop(5)
+
+        self.assertEqual(1, renewal.renewals)
+        self.assertEqual(2, renewal.failures)
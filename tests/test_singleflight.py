@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Single-flight Module for Carson Living tests."""
+
+import threading
+import unittest
+
+from carson_living import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Carson Living single-flight test class."""
+
+    def test_sequential_calls_are_executed(self):
+        """Calls that do not overlap are executed each time"""
+        single_flight = SingleFlight()
+
+        self.assertEqual(1, single_flight.do('k', lambda: 1))
+        self.assertEqual(2, single_flight.do('k', lambda: 2))
+        self.assertEqual({'executed': 2, 'coalesced': 0},
+                         single_flight.stats())
+
+    def test_concurrent_calls_are_coalesced(self):
+        """Concurrent calls with the same key share one execution"""
+        single_flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def _func():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return 'result'
+
+        results = []
+        leader = threading.Thread(
+            target=lambda: results.append(single_flight.do('k', _func)))
+        leader.start()
+        started.wait(5)
+
+        waiters = [threading.Thread(
+            target=lambda: results.append(single_flight.do('k', _func)))
+                   for _ in range(4)]
+        for waiter in waiters:
+            waiter.start()
+        # wait until all waiters joined the in-flight call
+        while single_flight.stats()['coalesced'] < 4:
+            threading.Event().wait(0.001)
+        release.set()
+
+        for thread in [leader] + waiters:
+            thread.join(5)
+
+        self.assertEqual(1, len(calls))
+        self.assertEqual(['result'] * 5, results)
+        self.assertEqual({'executed': 1, 'coalesced': 4},
+                         single_flight.stats())
+
+    def test_errors_are_shared_and_not_cached(self):
+        """Waiters receive the exception, later calls execute again"""
+        single_flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        errors = []
+
+        def _fail():
+            started.set()
+            release.wait(5)
+            raise ValueError('failure')
+
+        def _call():
+            try:
+                single_flight.do('k', _fail)
+            except ValueError as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=_call)]
+        threads[0].start()
+        started.wait(5)
+        threads.append(threading.Thread(target=_call))
+        threads[1].start()
+        while single_flight.stats()['coalesced'] < 1:
+            threading.Event().wait(0.001)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(2, len(errors))
+        self.assertIs(errors[0], errors[1])
+        self.assertEqual('ok', single_flight.do('k', lambda: 'ok'))
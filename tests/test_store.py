@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""Credential store Module for Carson Living tests."""
+
+import json
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from carson_living import (CredentialStore,
+                           FileCredentialStore)
+
+
+class TestCredentialStore(unittest.TestCase):
+    """Carson Living credential store test class."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'credentials.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_memory_store(self):
+        """The base store keeps credentials in memory"""
+        store = CredentialStore()
+        self.assertIsNone(store.load_token())
+        self.assertIsNone(store.load_eagleeye_session(1))
+
+        store.save_token('token')
+        store.save_eagleeye_session(1, 'auth_key', 'c001')
+
+        self.assertEqual('token', store.load_token())
+        self.assertEqual(('auth_key', 'c001'),
+                         store.load_eagleeye_session(1))
+
+    def test_file_store_round_trip(self):
+        """Credentials survive a new store instance"""
+        store = FileCredentialStore(self.path)
+        store.save_token('token')
+        store.save_eagleeye_session(1, 'auth_key_1', 'c001')
+        store.save_eagleeye_session(2, 'auth_key_2', 'c002')
+
+        restored = FileCredentialStore(self.path)
+
+        self.assertEqual('token', restored.load_token())
+        self.assertEqual(('auth_key_1', 'c001'),
+                         restored.load_eagleeye_session(1))
+        self.assertEqual(('auth_key_2', 'c002'),
+                         restored.load_eagleeye_session('2'))
+        self.assertIsNone(restored.load_eagleeye_session(3))
+
+    def test_file_store_writes_atomically(self):
+        """The file is replaced without leftovers and owner only"""
+        store = FileCredentialStore(self.path)
+        store.save_token('token_1')
+        store.save_token('token_2')
+
+        self.assertEqual(['credentials.json'], os.listdir(self.directory))
+        with open(self.path) as file:
+            self.assertEqual('token_2', json.load(file)['token'])
+        if os.name == 'posix':
+            self.assertEqual(
+                0o600, stat.S_IMODE(os.stat(self.path).st_mode))
+
+    def test_file_store_ignores_invalid_file(self):
+        """A corrupt file is treated as an empty store"""
+        with open(self.path, 'w') as file:
+            file.write('{not json')
+
+        store = FileCredentialStore(self.path)
+        self.assertIsNone(store.load_token())
+
+        store.save_token('token')
+        self.assertEqual('token',
+                         FileCredentialStore(self.path).load_token())
+
+    def test_file_store_survives_unwritable_directory(self):
+        """Failing writes keep the credentials in memory"""
+        store = FileCredentialStore(
+            os.path.join(self.directory, 'missing', 'credentials.json'))
+
+        store.save_token('token')
+
+        self.assertEqual('token', store.load_token())
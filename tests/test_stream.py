@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Video stream Module for Carson Living tests."""
+
+import io
+from datetime import datetime, timedelta
+
+import requests_mock
+
+from carson_living import (CarsonAPIError,
+                           EEN_VIDEO_FORMAT_MP4)
+from carson_living.flv import iter_flv_tags
+
+from tests.test_base import CarsonUnitTestBase
+from tests.helpers import (setup_ee_video_mock,
+                           DroppingAssetServer,
+                           LocalRedirectAdapter)
+
+
+class TestVideoStream(CarsonUnitTestBase):
+    """Carson Living video stream test class."""
+
+    def setUp(self):
+        super(TestVideoStream, self).setUp()
+        self.subdomain = self.c_mock_esession['activeBrandSubdomain']
+
+    @requests_mock.Mocker()
+    def test_stream_video_chunks(self, mock):
+        """The stream yields the video in fixed size chunks"""
+        mock_video = setup_ee_video_mock(mock, self.subdomain)
+
+        with self.first_camera.stream_video(
+                timedelta(seconds=2), chunk_size=10000) as stream:
+            chunks = list(stream)
+
+        self.assertEqual(mock_video, b''.join(chunks))
+        self.assertEqual([10000], list(set(len(c) for c in chunks[:-1])))
+        self.assertEqual(len(mock_video), stream.bytes_received)
+        self.assertEqual(len(chunks), stream.chunks_received)
+        self.assertTrue(stream.closed)
+        self.assertIn('stream_', mock.last_request.url)
+
+    @requests_mock.Mocker()
+    def test_stream_video_align_tags(self, mock):
+        """Aligned chunks hold complete FLV tags"""
+        mock_video = setup_ee_video_mock(mock, self.subdomain)
+
+        chunks = list(self.first_camera.stream_video(
+            timedelta(seconds=2), datetime(2020, 1, 31, 23, 0, 0),
+            chunk_size=10000, align_tags=True))
+
+        self.assertEqual(mock_video, b''.join(chunks))
+        for chunk in chunks[1:]:
+            file = io.BytesIO(chunk)
+            self.assertTrue(list(iter_flv_tags(file)))
+            self.assertEqual(len(chunk), file.tell())
+
+    def test_stream_video_align_tags_mp4(self):
+        """Only FLV streams can be aligned"""
+        with self.assertRaises(CarsonAPIError):
+            self.first_camera.stream_video(
+                timedelta(seconds=2), datetime(2020, 1, 31, 23, 0, 0),
+                EEN_VIDEO_FORMAT_MP4, align_tags=True)
+
+    def test_stream_video_cancel(self):
+        """Closing the stream mid-way releases the connection"""
+        server = DroppingAssetServer(b'\0' * (4 * 1024 * 1024))
+        server.start()
+        self.addCleanup(server.stop)
+        self.carson.http_session.mount(
+            'https://', LocalRedirectAdapter(server.base_url))
+
+        stream = self.first_camera.stream_video(
+            timedelta(seconds=2), chunk_size=1024)
+        self.assertEqual(1024, len(next(stream)))
+        stream.close()
+
+        self.assertTrue(stream.closed)
+        self.assertEqual([], list(stream))
+        # pylint: disable=protected-access
+        self.assertTrue(stream._response.raw.closed)
+
+        # the session serves further requests
+        buffer = io.BytesIO()
+        self.first_camera.get_video(buffer, timedelta(seconds=2))
+        self.assertEqual(server.body, buffer.getvalue())
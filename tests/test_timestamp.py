@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""EEN timestamp Module for Carson Living tests."""
+
+import unittest
+from datetime import datetime, timedelta
+
+from carson_living import CarsonError
+from carson_living.timestamp import (format_een_timestamp,
+                                     parse_een_timestamp,
+                                     utc_to_millis,
+                                     millis_to_utc,
+                                     een_timestamp_to_millis,
+                                     millis_to_een_timestamp,
+                                     millis_to_een_timestamps,
+                                     een_timestamps_to_millis)
+
+
+class TestTimestamp(unittest.TestCase):
+    """Carson Living EEN timestamp test class."""
+
+    def setUp(self):
+        self.sample_dt = datetime(2020, 1, 31, 23, 1, 3, 123456)
+        self.sample_ts = '20200131230103.123'
+        self.sample_millis = 1580511663123
+
+    def test_format_matches_strftime(self):
+        """Formatting equals the former strftime implementation"""
+        utc_dt = datetime(1999, 12, 31, 23, 59, 58, 999999)
+        for _ in range(1000):
+            self.assertEqual(utc_dt.strftime('%Y%m%d%H%M%S.%f')[:-3],
+                             format_een_timestamp(utc_dt))
+            utc_dt += timedelta(hours=7, microseconds=987654)
+
+    def test_parse(self):
+        """EEN timestamps parse to datetimes with millisecond resolution"""
+        self.assertEqual(datetime(2020, 1, 31, 23, 1, 3, 123000),
+                         parse_een_timestamp(self.sample_ts))
+
+    def test_parse_invalid_raises(self):
+        """Invalid timestamps raise CarsonError"""
+        for timestamp in ('', 'now', '20200131230103123',
+                          '2020013123010x.123', '20201331230103.123'):
+            with self.assertRaises(CarsonError):
+                parse_een_timestamp(timestamp)
+        with self.assertRaises(CarsonError):
+            een_timestamps_to_millis([self.sample_ts, '20200131230103'])
+
+    def test_fast_paths_reject_out_of_range_fields(self):
+        """The millis conversions validate like parse_een_timestamp"""
+        for timestamp in ('20200231230103.123', '20190229000000.000',
+                          '20200131240103.123', '20200131236003.123',
+                          '20200131230160.123', '20200131-10103.123'):
+            with self.assertRaises(CarsonError):
+                parse_een_timestamp(timestamp)
+            with self.assertRaises(CarsonError):
+                een_timestamp_to_millis(timestamp)
+            with self.assertRaises(CarsonError):
+                een_timestamps_to_millis([self.sample_ts, timestamp])
+
+    def test_millis_round_trip(self):
+        """Conversions between datetimes, millis and EEN timestamps"""
+        self.assertEqual(self.sample_millis, utc_to_millis(self.sample_dt))
+        self.assertEqual(self.sample_millis,
+                         een_timestamp_to_millis(self.sample_ts))
+        self.assertEqual(self.sample_ts,
+                         millis_to_een_timestamp(self.sample_millis))
+        self.assertEqual(datetime(2020, 1, 31, 23, 1, 3, 123000),
+                         millis_to_utc(self.sample_millis))
+
+    def test_batch_conversion_across_days(self):
+        """Batch conversions equal the per value conversions"""
+        millis_list = [self.sample_millis + i * 997 * 1000
+                       for i in range(500)]
+        millis_list += [0, self.sample_millis, 951782400000]
+
+        timestamps = millis_to_een_timestamps(millis_list)
+
+        self.assertEqual(
+            [format_een_timestamp(millis_to_utc(m)) for m in millis_list],
+            timestamps)
+        self.assertEqual('19700101000000.000', timestamps[-3])
+        # leap day
+        self.assertEqual('20000229000000.000', timestamps[-1])
+        self.assertEqual(millis_list, een_timestamps_to_millis(timestamps))
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""Util Module for Carson Living tests."""
+
+import threading
+import time
+import unittest
+
+from carson_living.entities import _AbstractEntity
+from carson_living.error import CarsonAggregateError
+from carson_living.util import (concurrent_map,
+                                payload_fingerprint,
+                                update_dictionary,
+                                UpdateDiff)
+
+
+class TestConcurrentMap(unittest.TestCase):
+    """Carson Living concurrent_map test class."""
+
+    def test_results_and_errors_are_ordered(self):
+        """Results and errors follow the key order, not completion"""
+        def _func(key):
+            time.sleep(0.01 * (5 - key))
+            if key % 2:
+                raise ValueError(key)
+            return key * 10
+
+        results, errors = concurrent_map(_func, range(5), max_workers=5)
+
+        self.assertEqual([0, 2, 4], list(results))
+        self.assertEqual([0, 20, 40], list(results.values()))
+        self.assertEqual([1, 3], list(errors))
+        self.assertIsInstance(errors[1], ValueError)
+
+    def test_max_workers_bounds_concurrency(self):
+        """No more than max_workers calls run at the same time"""
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+
+        def _func(_):
+            with lock:
+                state['running'] += 1
+                state['peak'] = max(state['peak'], state['running'])
+            time.sleep(0.01)
+            with lock:
+                state['running'] -= 1
+
+        concurrent_map(_func, range(12), max_workers=3)
+
+        self.assertEqual(3, state['peak'])
+
+    def test_serial_without_max_workers(self):
+        """Calls are executed in the calling thread by default"""
+        threads = set()
+        concurrent_map(lambda _: threads.add(threading.current_thread()),
+                       range(3))
+
+        self.assertEqual({threading.current_thread()}, threads)
+
+
+class _CountingEntity(_AbstractEntity):
+    """Entity that counts its internal updates"""
+
+    def __init__(self, entity_payload):
+        self.internal_updates = 0
+        super(_CountingEntity, self).__init__(entity_payload=entity_payload)
+
+    @property
+    def entity_id(self):
+        return self.entity_payload.get('id')
+
+    @property
+    def unique_entity_id(self):
+        return 'counting_{}'.format(self.entity_id)
+
+    def _internal_update(self):
+        self.internal_updates += 1
+
+
+class TestUpdateDictionary(unittest.TestCase):
+    """Carson Living change aware update_dictionary test class."""
+
+    def setUp(self):
+        self.entities = {}
+        update_dictionary(self.entities, {
+            1: {'id': 1, 'name': 'one', 'tags': ['a']},
+            2: {'id': 2, 'name': 'two'},
+        }, _CountingEntity)
+
+    def test_fingerprint_ignores_key_order(self):
+        """Equal payloads have equal fingerprints"""
+        self.assertEqual(payload_fingerprint({'a': 1, 'b': [1, 2]}),
+                         payload_fingerprint({'b': [1, 2], 'a': 1}))
+        self.assertNotEqual(payload_fingerprint({'a': 1}),
+                            payload_fingerprint({'a': 2}))
+
+    def test_unchanged_entities_are_skipped(self):
+        """Entities with an equal payload are not updated"""
+        first = self.entities[1]
+
+        diff = update_dictionary(self.entities, {
+            1: {'tags': ['a'], 'name': 'one', 'id': 1},
+            2: {'id': 2, 'name': 'two'},
+        }, _CountingEntity)
+
+        self.assertFalse(diff)
+        self.assertIs(first, self.entities[1])
+        self.assertEqual(1, first.internal_updates)
+
+    def test_diff_lists_added_removed_and_changed(self):
+        """The diff contains the changed fields of changed entities"""
+        diff = update_dictionary(self.entities, {
+            1: {'id': 1, 'name': 'one', 'tags': ['a', 'b'], 'new': 0},
+            3: {'id': 3, 'name': 'three'},
+        }, _CountingEntity)
+
+        self.assertTrue(diff)
+        self.assertEqual(['counting_3'], diff.added)
+        self.assertEqual(['counting_2'], diff.removed)
+        self.assertEqual({'counting_1': ('new', 'tags')}, diff.changed)
+        self.assertEqual(2, self.entities[1].internal_updates)
+        self.assertEqual([1, 3], sorted(self.entities))
+
+    def test_concurrent_diff_matches_serial(self):
+        """Concurrent updates return the same diff"""
+        diff = update_dictionary(self.entities, {
+            1: {'id': 1, 'name': 'uno', 'tags': ['a']},
+            3: {'id': 3},
+        }, _CountingEntity, max_workers=4)
+
+        self.assertEqual(['counting_3'], diff.added)
+        self.assertEqual(['counting_2'], diff.removed)
+        self.assertEqual({'counting_1': ('name',)}, diff.changed)
+
+    @staticmethod
+    def _failing_constructor(payload):
+        if payload['id'] == 3:
+            raise ValueError(payload['id'])
+        return _CountingEntity(payload)
+
+    def test_concurrent_failures_carry_partial_diff(self):
+        """Failing entities do not abort the others in concurrent mode"""
+        with self.assertRaises(CarsonAggregateError) as context:
+            update_dictionary(self.entities, {
+                1: {'id': 1, 'name': 'uno'},
+                3: {'id': 3},
+                4: {'id': 4},
+            }, self._failing_constructor, max_workers=4)
+
+        self.assertEqual([3], list(context.exception.errors))
+        diff = context.exception.diff
+        self.assertEqual(['counting_4'], diff.added)
+        self.assertEqual(['counting_2'], diff.removed)
+        self.assertEqual({'counting_1': ('name', 'tags')}, diff.changed)
+        self.assertEqual([1, 4], sorted(self.entities))
+
+    def test_serial_failure_propagates_with_partial_diff(self):
+        """Serially, the original exception carries the partial diff"""
+        with self.assertRaises(ValueError) as context:
+            update_dictionary(self.entities, {
+                1: {'id': 1, 'name': 'uno'},
+                3: {'id': 3},
+                4: {'id': 4},
+            }, self._failing_constructor)
+
+        diff = context.exception.diff
+        self.assertEqual([], diff.added)
+        self.assertEqual(['counting_2'], diff.removed)
+        self.assertEqual({'counting_1': ('name', 'tags')}, diff.changed)
+
+    def test_merge_combines_fields(self):
+        """Merged diffs join the changed fields of an entity"""
+        diff = UpdateDiff(added=['x'], changed={'y': ('b',)}).merge(
+            UpdateDiff(removed=['z'], changed={'y': ('a', 'b')}))
+
+        self.assertEqual(['x'], diff.added)
+        self.assertEqual(['z'], diff.removed)
+        self.assertEqual({'y': ('a', 'b')}, diff.changed)
+        self.assertFalse(UpdateDiff())